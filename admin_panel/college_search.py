@@ -0,0 +1,115 @@
+# admin_panel/college_search.py
+"""
+Database-side search over colleges and their officials.
+
+MySQL uses the FULLTEXT indexes from migration 0008 in boolean mode, so
+every word of the query must start a word of the name or email. SQLite
+uses FTS5 tables with the trigram tokenizer, kept in sync by triggers,
+which match substrings like the old Python filter did. Other databases,
+and queries too short for either index, fall back to icontains.
+"""
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, Q
+from django.db.models.expressions import RawSQL
+
+from .models import College, CollegeOfficial
+
+MIN_TERM_LENGTH = 3  # innodb_ft_min_token_size, and one trigram
+
+COLLEGE_FTS_TABLE = 'admin_panel_college_fts'
+OFFICIAL_FTS_TABLE = 'admin_panel_collegeofficial_fts'
+
+_fts5_available = None
+
+
+def search_backend():
+    """'mysql', 'fts5' or 'icontains' for the default database."""
+    global _fts5_available
+    if connection.vendor == 'mysql':
+        return 'mysql'
+    if connection.vendor == 'sqlite':
+        if _fts5_available is None:
+            _fts5_available = COLLEGE_FTS_TABLE in connection.introspection.table_names()
+        if _fts5_available:
+            return 'fts5'
+    return 'icontains'
+
+
+def _boolean_mode_query(q):
+    words = [word for word in re.findall(r'\w+', q) if len(word) >= MIN_TERM_LENGTH]
+    return ' '.join(f'+{word}*' for word in words)
+
+
+def _fts5_phrase(q):
+    return '"' + q.replace('"', '""') + '"'
+
+
+def _match(table, columns, q):
+    """A WHERE condition matching rows of `table`, or None to use icontains."""
+    backend = search_backend()
+    if backend == 'mysql':
+        query = _boolean_mode_query(q)
+        if not query:
+            return None
+        qualified = ', '.join(f'{table}.{column}' for column in columns)
+        return RawSQL(
+            f'MATCH ({qualified}) AGAINST (%s IN BOOLEAN MODE)',
+            [query],
+            output_field=BooleanField(),
+        )
+    if backend == 'fts5' and len(q) >= MIN_TERM_LENGTH:
+        fts_table = COLLEGE_FTS_TABLE if table == College._meta.db_table else OFFICIAL_FTS_TABLE
+        return Q(id__in=RawSQL(
+            f'SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s',
+            [_fts5_phrase(q)],
+        ))
+    return None
+
+
+def colleges_named(q):
+    """Colleges whose name matches q."""
+    condition = _match(College._meta.db_table, ['name'], q)
+    if condition is None:
+        condition = Q(name__icontains=q)
+    return College.objects.filter(condition)
+
+
+def officials_matching(q):
+    """Officials whose name or email matches q."""
+    condition = _match(CollegeOfficial._meta.db_table, ['name', 'email'], q)
+    if condition is None:
+        condition = Q(name__icontains=q) | Q(email__icontains=q)
+    return CollegeOfficial.objects.filter(condition)
+
+
+def search_colleges(q):
+    """Colleges matching q by name or through one of their officials."""
+    colleges = College.objects.all()
+    if q:
+        colleges = colleges.filter(
+            Q(id__in=colleges_named(q).values('id')) |
+            Q(id__in=officials_matching(q).values('college_id'))
+        )
+    return colleges
+
+
+def officials_to_show(colleges, q):
+    """
+    {college_id: [officials]} for one page of colleges: all officials of
+    colleges whose name matches, otherwise just the matching ones.
+    """
+    college_ids = [college.id for college in colleges]
+    officials = CollegeOfficial.objects.filter(college_id__in=college_ids)
+    if q:
+        named = colleges_named(q).filter(id__in=college_ids).values('id')
+        officials = officials.filter(
+            Q(college_id__in=named) |
+            Q(id__in=officials_matching(q).filter(college_id__in=college_ids).values('id'))
+        )
+
+    by_college = {college_id: [] for college_id in college_ids}
+    for official in officials.order_by('id'):
+        by_college[official.college_id].append(official)
+    return by_college
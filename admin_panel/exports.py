@@ -0,0 +1,271 @@
+# admin_panel/exports.py
+"""
+Streaming exports of registrations and results.
+
+Rows come from values_list() iterated in chunks, so no model instances
+are built and the college name is read once, not per row. XLSX files are
+written with openpyxl's write-only mode into a temporary file that is
+then streamed back. CSV is generated row by row straight into a
+StreamingHttpResponse. Memory stays flat however many rows there are.
+
+For closing a season, stream_schedules_zip() exports many schedules at
+once: each schedule's workbooks are written by a process pool worker and
+added to a ZIP that is streamed out as schedules finish (or written to
+disk by the export_schedules command).
+"""
+import csv
+import os
+import re
+import shutil
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import openpyxl
+from django.conf import settings
+from django.db import connections
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.text import get_valid_filename
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+
+from students.models import Student
+from tests.leaderboard import ensure_leaderboard, leaderboard, ranked
+from tests.models import MeritListEntry
+
+from .models import ExamScheduleHistory
+
+CHUNK_SIZE = 2000
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+REGISTRATION_HEADERS = ["ID", "Name", "Email", "College", "Contact Number"]
+RESULT_HEADERS = ["ID", "Rank", "Dense Rank", "Student Name", "Email", "Score", "Percentile", "College", "Contact Number"]
+MERIT_LIST_HEADERS = [
+    "Position", "Rank", "Hall Ticket", "Student Name", "Email", "College", "Quiz Date",
+    "Score", "Normalized Score",
+]
+
+
+def _upper(value):
+    return value.upper() if value else ""
+
+
+def registration_rows(schedule):
+    college = _upper(schedule.college.name)
+    students = (
+        Student.objects
+        .filter(exam_schedule=schedule)
+        .order_by('name')
+        .values_list('name', 'email', 'mobile_number')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for idx, (name, email, mobile_number) in enumerate(students, start=1):
+        yield [idx, _upper(name), _upper(email), college, _upper(mobile_number)]
+
+
+def result_rows(schedule):
+    # Same order and ranks as the results page
+    ensure_leaderboard(schedule)
+    college = _upper(schedule.college.name)
+    entries = (
+        leaderboard(schedule.id)
+        .values_list('student__name', 'student__email', 'score', 'student__mobile_number')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for position, rank, dense_rank, pct, (name, email, score, mobile_number) in ranked(
+        entries, schedule.submission_count, score_index=2
+    ):
+        yield [
+            position, rank, dense_rank, _upper(name), _upper(email), score,
+            round(pct, 2), college, _upper(mobile_number)
+        ]
+
+
+def merit_list_rows(merit_list):
+    entries = (
+        MeritListEntry.objects
+        .filter(merit_list=merit_list)
+        .order_by('position')
+        .values_list(
+            'position', 'rank', 'student__hall_ticket', 'student__name', 'student__email',
+            'exam_schedule__college__name', 'exam_schedule__quiz_date', 'score', 'normalized'
+        )
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    for position, rank, hall_ticket, name, email, college, quiz_date, score, normalized in entries:
+        yield [
+            position, rank, hall_ticket, _upper(name), _upper(email), _upper(college),
+            timezone.localtime(quiz_date).strftime("%Y-%m-%d"), score, normalized
+        ]
+
+
+def write_xlsx(file, title, headers, rows):
+    """Write a one-sheet workbook in write-only mode to `file`."""
+    wb = openpyxl.Workbook(write_only=True)
+    # Excel's sheet name rules: no \ / ? * [ ] : and at most 31 characters
+    ws = wb.create_sheet(title=re.sub(r'[\\/?*\[\]:]', '-', title)[:31])
+
+    header_cells = []
+    for header in headers:
+        cell = WriteOnlyCell(ws, value=header.upper())
+        cell.font = Font(bold=True)
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    for row in rows:
+        ws.append(row)
+    wb.save(file)
+
+
+def xlsx_response(filename, title, headers, rows):
+    file = tempfile.TemporaryFile()
+    write_xlsx(file, title, headers, rows)
+    file.seek(0)
+    return FileResponse(
+        file,
+        as_attachment=True,
+        filename=filename,
+        content_type=XLSX_CONTENT_TYPE,
+    )
+
+
+class _Echo:
+    """File-like object whose write() hands the line back to csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def csv_response(filename, headers, rows):
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield '\ufeff'  # BOM so Excel opens the file as UTF-8
+        yield writer.writerow([header.upper() for header in headers])
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def export_basename(name, schedule):
+    return f"{name}_{schedule.college.name}_{schedule.quiz_date.date()}"
+
+
+def export_response(export_format, name, schedule, headers, rows):
+    """CSV or XLSX download named like "<name>_<college>_<date>"."""
+    basename = export_basename(name, schedule)
+    if export_format == 'csv':
+        return csv_response(f"{basename}.csv", headers, rows)
+    return xlsx_response(f"{basename}.xlsx", f"{name}_{schedule.college.name}", headers, rows)
+
+
+# -----------------------------
+# Multi-schedule ZIP export
+# -----------------------------
+EXPORTS = [
+    ("Registrations", REGISTRATION_HEADERS, registration_rows),
+    ("Results", RESULT_HEADERS, result_rows),
+]
+ZIP_COPY_CHUNK = 64 * 1024
+
+
+def export_workers():
+    return getattr(settings, 'EXPORT_WORKERS', None)  # None: one per CPU
+
+
+def schedules_matching(college=None, from_date=None, to_date=None):
+    """The dashboard's schedule filter: college name part, date strings."""
+    schedules = ExamScheduleHistory.objects.all()
+
+    if college:
+        schedules = schedules.filter(college__name__icontains=college)
+
+    from_date = parse_date(from_date) if from_date else None
+    if from_date:
+        from_dt = timezone.make_aware(datetime.combine(from_date, datetime.min.time()))
+        schedules = schedules.filter(quiz_date__gte=from_dt)
+
+    to_date = parse_date(to_date) if to_date else None
+    if to_date:
+        to_dt = timezone.make_aware(datetime.combine(to_date, datetime.max.time()))
+        schedules = schedules.filter(quiz_date__lte=to_dt)
+
+    return schedules
+
+
+def _init_worker():
+    # No-op under fork; sets Django up where workers are spawned
+    import django
+    django.setup()
+
+
+def _write_schedule(schedule_id, directory):
+    # Runs in a worker process; returns [(path, name in the zip)]
+    schedule = ExamScheduleHistory.objects.select_related('college').get(pk=schedule_id)
+    folder = get_valid_filename(
+        f"{schedule.id}_{schedule.college.name}_{schedule.quiz_date.date()}"
+    )
+    files = []
+    for name, headers, rows in EXPORTS:
+        path = os.path.join(directory, f"{schedule.id}_{name}.xlsx")
+        with open(path, 'wb') as file:
+            write_xlsx(file, f"{name}_{schedule.college.name}", headers, rows(schedule))
+        files.append((path, f"{folder}/{name}.xlsx"))
+    return files
+
+
+class _ZipStream:
+    """Write-only stream that zipfile writes into; drain() hands out the bytes."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_schedules_zip(schedule_ids, workers=None):
+    """
+    Yield a ZIP holding the registrations and results workbooks of every
+    schedule, in the order the workers finish them.
+    """
+    directory = tempfile.mkdtemp(prefix='schedule-export-')
+    # Forked workers must not share the parent's database sockets
+    connections.close_all()
+    executor = ProcessPoolExecutor(
+        max_workers=workers or export_workers(),
+        initializer=_init_worker,
+    )
+    try:
+        futures = [executor.submit(_write_schedule, pk, directory) for pk in schedule_ids]
+        stream = _ZipStream()
+        # Workbooks are already deflated, so store them as they are
+        with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_STORED) as archive:
+            for future in as_completed(futures):
+                for path, arcname in future.result():
+                    info = zipfile.ZipInfo(arcname, timezone.localtime().timetuple()[:6])
+                    with open(path, 'rb') as src, archive.open(info, 'w') as dest:
+                        while chunk := src.read(ZIP_COPY_CHUNK):
+                            dest.write(chunk)
+                            yield stream.drain()
+                    os.remove(path)
+                yield stream.drain()
+        yield stream.drain()  # central directory
+    finally:
+        executor.shutdown(cancel_futures=True)
+        shutil.rmtree(directory, ignore_errors=True)
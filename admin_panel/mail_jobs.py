@@ -0,0 +1,315 @@
+# admin_panel/mail_jobs.py
+"""
+Fan-out mail jobs: one template sent to many recipients.
+
+create_mail_job() stores the job and one MailJobRecipient row per address.
+The drain_outbox worker then sends it in batches of MAIL_JOB_BATCH_SIZE
+over MAIL_JOB_CONNECTIONS SMTP connections kept open for the whole run.
+
+The template is rendered once per job, with a placeholder for each
+per-recipient field; sending a message only swaps the recipient's values
+in (HTML-escaped for the HTML part). Per-recipient values are therefore
+inserted as-is: templates shouldn't run them through filters.
+
+A batch is claimed first (status "sending", committed) and each
+recipient's state is saved as soon as its message has gone, so an
+interrupted job resumes where it stopped, resending at most the messages
+that were in flight, and the admin progress page can show who got the
+mail. A claim not finished within OUTBOX_CLAIM_SECONDS is picked up
+again. A failed send keeps its claim for the outbox's retry delay, so it
+is retried the same way, until MAIL_JOB_MAX_ATTEMPTS sends have failed
+and it is marked failed. Failed recipients can be put back in the queue
+with retry_failed().
+
+Each step() works on the oldest job with rows it can claim: a job whose
+remaining rows are all claimed (in flight elsewhere, or waiting for a
+retry) doesn't hold up the jobs after it. Nor does a job whose template
+can't be rendered: it is marked failed and skipped.
+"""
+import logging
+import queue
+import smtplib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import escape
+
+from .models import MailJob, MailJobRecipient
+from .outbox import claim_seconds, retry_delay
+
+logger = logging.getLogger(__name__)
+
+
+def connection_count():
+    return getattr(settings, 'MAIL_JOB_CONNECTIONS', 3)
+
+
+def job_batch_size():
+    return getattr(settings, 'MAIL_JOB_BATCH_SIZE', 100)
+
+
+def max_send_attempts():
+    return getattr(settings, 'MAIL_JOB_MAX_ATTEMPTS', 3)
+
+
+def claimable(now):
+    """Recipients a worker may claim: pending, or claimed but the claim ran out."""
+    return (
+        Q(status=MailJobRecipient.PENDING) |
+        Q(status=MailJobRecipient.SENDING, claimed_until__lte=now)
+    )
+
+
+def placeholder(field):
+    # Left untouched by autoescaping, and unlikely to appear in a template
+    return f"[[mailjob:{field}]]"
+
+
+def create_mail_job(kind, subject, body, recipients, html_template='',
+                    context=None, recipient_fields=(), exam_schedule=None, from_email=None):
+    """
+    Queue a fan-out job. `recipients` is an iterable of (email, {field: value})
+    pairs, the fields being `recipient_fields`.
+    """
+    with transaction.atomic():
+        job = MailJob.objects.create(
+            exam_schedule=exam_schedule,
+            kind=kind,
+            subject=subject,
+            body=body,
+            html_template=html_template,
+            context=context or {},
+            recipient_fields=list(recipient_fields),
+            from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        )
+        MailJobRecipient.objects.bulk_create(
+            (
+                MailJobRecipient(job=job, email=email, context=values)
+                for email, values in recipients
+            ),
+            batch_size=1000,
+        )
+    return job
+
+
+def job_progress(job):
+    """{'total', 'pending', 'sent', 'failed', 'percent'} for the progress page."""
+    counts = job.recipients.aggregate(
+        total=Count('id'),
+        pending=Count('id', filter=Q(status__in=[MailJobRecipient.PENDING, MailJobRecipient.SENDING])),
+        sent=Count('id', filter=Q(status=MailJobRecipient.SENT)),
+        failed=Count('id', filter=Q(status=MailJobRecipient.FAILED)),
+    )
+    done = counts['sent'] + counts['failed']
+    counts['percent'] = round(100 * done / counts['total']) if counts['total'] else 100
+    return counts
+
+
+def retry_failed(job):
+    """Queue the job's failed recipients again; returns how many."""
+    with transaction.atomic():
+        count = job.recipients.filter(status=MailJobRecipient.FAILED).update(
+            status=MailJobRecipient.PENDING, attempts=0
+        )
+        if count:
+            MailJob.objects.filter(pk=job.pk).update(status=MailJob.QUEUED, finished_at=None)
+    return count
+
+
+class RenderedJob:
+    """The job's subject, text and HTML rendered once, with placeholders."""
+
+    def __init__(self, job):
+        self.job = job
+        context = dict(job.context)
+        context.update({field: placeholder(field) for field in job.recipient_fields})
+        self.html = render_to_string(job.html_template, context) if job.html_template else ''
+
+    def _fill(self, text, values, html=False):
+        for field in self.job.recipient_fields:
+            value = str(values.get(field, ''))
+            text = text.replace(placeholder(field), escape(value) if html else value)
+        return text
+
+    def message(self, recipient):
+        message = EmailMultiAlternatives(
+            subject=self._fill(self.job.subject, recipient.context),
+            body=self._fill(self.job.body, recipient.context),
+            from_email=self.job.from_email,
+            to=[recipient.email],
+        )
+        if self.html:
+            message.attach_alternative(self._fill(self.html, recipient.context, html=True), "text/html")
+        return message
+
+
+class ConnectionPool:
+    """A few open SMTP connections shared by the sending threads."""
+
+    def __init__(self, size):
+        self.connections = []
+        self.free = queue.Queue()
+        try:
+            for _ in range(size):
+                connection = get_connection(fail_silently=False)
+                connection.open()
+                self.connections.append(connection)
+                self.free.put(connection)
+        except Exception:
+            self.close()
+            raise
+
+    def send(self, message):
+        """Send one message; returns None or the error text."""
+        connection = self.free.get()
+        try:
+            try:
+                connection.send_messages([message])
+            except smtplib.SMTPServerDisconnected:
+                connection.close()
+                connection.open()
+                connection.send_messages([message])
+        except Exception as e:
+            return str(e)[:1000] or type(e).__name__
+        finally:
+            self.free.put(connection)
+        return None
+
+    def close(self):
+        for connection in self.connections:
+            try:
+                connection.close()
+            except Exception:
+                pass
+        self.connections = []
+
+
+class MailJobRunner:
+    """
+    Sends mail jobs one batch per step(), so a long job can be interleaved
+    with other work (drain_outbox alternates it with the outbox).
+    """
+
+    def __init__(self, connections=None, batch_size=None):
+        self.size = connections or connection_count()
+        self.batch_size = batch_size or job_batch_size()
+        self.pool = None
+        self.executor = None
+        self.rendered = {}  # job id -> RenderedJob
+
+    def open(self):
+        if self.pool is None:
+            self.pool = ConnectionPool(self.size)
+            self.executor = ThreadPoolExecutor(max_workers=self.size)
+        return self.pool
+
+    def close(self):
+        if self.pool is not None:
+            self.executor.shutdown()
+            self.pool.close()
+            self.pool = self.executor = None
+        self.rendered = {}
+
+    def claim(self, job):
+        """Mark the job's next batch as sending, committed; returns it."""
+        now = timezone.now()
+        with transaction.atomic():
+            batch = list(
+                job.recipients
+                .select_for_update(skip_locked=True)
+                .filter(claimable(now))
+                .order_by('id')[:self.batch_size]
+            )
+            MailJobRecipient.objects.filter(id__in=[r.id for r in batch]).update(
+                status=MailJobRecipient.SENDING,
+                claimed_until=now + timedelta(seconds=claim_seconds()),
+            )
+        return batch
+
+    def record(self, job, recipient, error):
+        recipient.attempts += 1
+        recipient.claimed_until = None
+        if error is None:
+            recipient.status = MailJobRecipient.SENT
+            recipient.sent_at = timezone.now()
+        else:
+            logger.warning("Mail job %s to %s failed: %s", job.id, recipient.email, error)
+            recipient.last_error = error
+            if recipient.attempts >= max_send_attempts():
+                recipient.status = MailJobRecipient.FAILED
+            else:
+                # Held like a claim: picked up again once the retry delay is over
+                recipient.status = MailJobRecipient.SENDING
+                recipient.claimed_until = timezone.now() + retry_delay(recipient.attempts)
+        recipient.save(update_fields=['status', 'attempts', 'last_error', 'claimed_until', 'sent_at'])
+
+    def step(self):
+        """
+        Send one batch of the oldest unfinished job that has recipients to
+        claim, or finish one that has none left. Returns the number of
+        recipients handled, 0 when there was nothing to do.
+        """
+        recipients = MailJobRecipient.objects.filter(job=OuterRef('pk'))
+        unfinished = [MailJobRecipient.PENDING, MailJobRecipient.SENDING]
+        job = (
+            MailJob.objects
+            .filter(status__in=[MailJob.QUEUED, MailJob.RUNNING])
+            .filter(
+                Exists(recipients.filter(claimable(timezone.now()))) |
+                ~Exists(recipients.filter(status__in=unfinished))
+            )
+            .order_by('id')
+            .first()
+        )
+        if job is None:
+            return 0
+
+        if job.status == MailJob.QUEUED:
+            MailJob.objects.filter(pk=job.pk, status=MailJob.QUEUED).update(
+                status=MailJob.RUNNING, started_at=timezone.now()
+            )
+
+        if job.id not in self.rendered:
+            try:
+                self.rendered[job.id] = RenderedJob(job)
+            except Exception as e:
+                # Would fail the same way on every pass: give up on this job
+                logger.exception("Mail job %s can't be rendered", job.id)
+                MailJob.objects.filter(pk=job.pk).update(
+                    status=MailJob.FAILED,
+                    last_error=str(e)[:1000] or type(e).__name__,
+                    finished_at=timezone.now(),
+                )
+                return self.step()  # next job, if any
+        rendered = self.rendered[job.id]
+
+        batch = self.claim(job)
+        if batch:
+            try:
+                pool = self.open()
+            except Exception:
+                # Server unreachable: hand the batch back for the next pass
+                MailJobRecipient.objects.filter(id__in=[r.id for r in batch]).update(
+                    status=MailJobRecipient.PENDING, claimed_until=None
+                )
+                raise
+            sends = {self.executor.submit(pool.send, rendered.message(r)): r for r in batch}
+            for future in as_completed(sends):
+                self.record(job, sends[future], future.result())
+            return len(batch)
+
+        # Nothing left to claim. Rows another worker is sending aren't
+        # finished, so only the worker that sees none finishes the job.
+        if not job.recipients.filter(status__in=unfinished).exists():
+            MailJob.objects.filter(pk=job.pk).exclude(status=MailJob.DONE).update(
+                status=MailJob.DONE, finished_at=timezone.now()
+            )
+            self.rendered.pop(job.id, None)
+            return self.step()  # next job, if any
+        return 0
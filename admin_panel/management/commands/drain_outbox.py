@@ -0,0 +1,59 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from admin_panel.mail_jobs import MailJobRunner
+from admin_panel.outbox import OutboxSender
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Send queued outbox emails and mail jobs over persistent SMTP connections'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--loop', type=float, metavar='SECONDS', default=0,
+            help='Keep draining, polling every SECONDS when the outbox is empty'
+        )
+
+    def handle(self, *args, **options):
+        sender = OutboxSender()
+        runner = MailJobRunner()
+        total_sent = total_failed = total_job_mail = 0
+        try:
+            while True:
+                # One outbox batch, then one mail job batch, so OTPs aren't
+                # stuck behind a big fan-out
+                sent, failed = sender.drain(options['batch_size'])
+                total_sent += sent
+                total_failed += failed
+                try:
+                    job_mail = runner.step()
+                except Exception:
+                    logger.exception("Mail job batch failed")
+                    runner.close()
+                    job_mail = 0
+                total_job_mail += job_mail
+                if sent or failed or job_mail:
+                    if options['loop']:
+                        self.stdout.write(f'{sent} sent, {failed} failed, {job_mail} mail job recipients.')
+                    continue  # more may be due right away
+
+                if not options['loop']:
+                    break
+                # Idle: let the SMTP server forget us rather than time us out
+                sender.close()
+                runner.close()
+                close_old_connections()
+                time.sleep(options['loop'])
+        finally:
+            sender.close()
+            runner.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{total_sent} sent, {total_failed} failed, {total_job_mail} mail job recipients.'
+        ))
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from admin_panel.exports import schedules_matching, stream_schedules_zip
+
+
+class Command(BaseCommand):
+    help = 'Write registrations and results of many schedules to one ZIP file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help='Path of the ZIP file to write')
+        parser.add_argument('--college', help='Part of the college name')
+        parser.add_argument('--from-date', help='YYYY-MM-DD')
+        parser.add_argument('--to-date', help='YYYY-MM-DD')
+        parser.add_argument('--workers', type=int, help='Worker processes (default: one per CPU)')
+
+    def handle(self, *args, **options):
+        schedule_ids = list(
+            schedules_matching(options['college'], options['from_date'], options['to_date'])
+            .order_by('quiz_date')
+            .values_list('id', flat=True)
+        )
+        if not schedule_ids:
+            raise CommandError('No schedules match these filters.')
+
+        started = time.monotonic()
+        with open(options['output'], 'wb') as output:
+            for chunk in stream_schedules_zip(schedule_ids, workers=options['workers']):
+                output.write(chunk)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Exported {len(schedule_ids)} schedules to {options['output']} "
+            f"in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from admin_panel.schedule_counters import refresh_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute registration and result counters on ExamScheduleHistory'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'schedule_ids', nargs='*', type=int,
+            help='ExamScheduleHistory ids (default: all)'
+        )
+
+    def handle(self, *args, **options):
+        updated = refresh_counters(options['schedule_ids'] or None)
+        self.stdout.write(self.style.SUCCESS(f'Counters refreshed for {updated} schedules.'))
@@ -0,0 +1,73 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:53
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Min, Sum
+
+
+def fill_counters(apps, schema_editor):
+    ExamScheduleHistory = apps.get_model('admin_panel', 'ExamScheduleHistory')
+    Student = apps.get_model('students', 'Student')
+    Result = apps.get_model('tests', 'Result')
+
+    registrations = dict(
+        Student.objects.filter(exam_schedule__isnull=False)
+        .values_list('exam_schedule').annotate(Count('id')).order_by()
+    )
+    results = {
+        row['exam_schedule']: row
+        for row in Result.objects.filter(exam_schedule__isnull=False)
+        .values('exam_schedule')
+        .annotate(count=Count('id'), total=Sum('score'), high=Max('score'), low=Min('score'))
+        .order_by()
+    }
+    schedules = list(ExamScheduleHistory.objects.all())
+    for schedule in schedules:
+        row = results.get(schedule.id, {})
+        schedule.registration_count = registrations.get(schedule.id, 0)
+        schedule.submission_count = row.get('count', 0)
+        schedule.score_total = row.get('total') or 0
+        schedule.max_score = row.get('high')
+        schedule.min_score = row.get('low')
+    ExamScheduleHistory.objects.bulk_update(
+        schedules,
+        ['registration_count', 'submission_count', 'score_total', 'max_score', 'min_score'],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0006_mailjob'),
+        ('students', '0009_hallticketsequence'),
+        ('tests', '0010_meritlist'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examschedulehistory',
+            name='max_score',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='examschedulehistory',
+            name='min_score',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='examschedulehistory',
+            name='registration_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='examschedulehistory',
+            name='score_total',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='examschedulehistory',
+            name='submission_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 4.2.23 on 2026-10-18 14:05
+
+from django.db import migrations
+
+# MySQL: FULLTEXT indexes used by MATCH ... AGAINST in college_search.py
+MYSQL_FORWARD = [
+    "CREATE FULLTEXT INDEX admin_panel_college_name_ft ON admin_panel_college (name)",
+    "CREATE FULLTEXT INDEX admin_panel_official_name_email_ft"
+    " ON admin_panel_collegeofficial (name, email)",
+]
+MYSQL_REVERSE = [
+    "DROP INDEX admin_panel_college_name_ft ON admin_panel_college",
+    "DROP INDEX admin_panel_official_name_email_ft ON admin_panel_collegeofficial",
+]
+
+
+def _fts5_statements(table, columns):
+    # External-content FTS5 table over `table`, kept in sync by triggers.
+    # Note: SQLite table rebuilds in later migrations drop the triggers.
+    fts = f'{table}_fts'
+    cols = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, content='{table}',"
+        f" content_rowid='id', tokenize='trigram')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN"
+        f" INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN"
+        f" INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN"
+        f" INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+        f" INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new}); END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+FTS5_TABLES = [
+    ('admin_panel_college', ['name']),
+    ('admin_panel_collegeofficial', ['name', 'email']),
+]
+
+
+def _fts5_supported(cursor):
+    try:
+        cursor.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x, tokenize='trigram')")
+        cursor.execute("DROP TABLE temp.fts5_probe")
+    except Exception:
+        return False
+    return True
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'mysql':
+            for sql in MYSQL_FORWARD:
+                cursor.execute(sql)
+        elif vendor == 'sqlite' and _fts5_supported(cursor):
+            # Without FTS5 (or trigram, SQLite < 3.34) search uses icontains
+            for table, columns in FTS5_TABLES:
+                for sql in _fts5_statements(table, columns):
+                    cursor.execute(sql)
+
+
+def drop_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    with schema_editor.connection.cursor() as cursor:
+        if vendor == 'mysql':
+            for sql in MYSQL_REVERSE:
+                cursor.execute(sql)
+        elif vendor == 'sqlite':
+            for table, _ in FTS5_TABLES:
+                for suffix in ('ai', 'ad', 'au'):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+                cursor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0007_schedule_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0008_college_search'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='examschedulehistory',
+            index=models.Index(fields=['quiz_date', 'id'], name='schedule_history_date_idx'),
+        ),
+    ]
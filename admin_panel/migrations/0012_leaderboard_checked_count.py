@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0011_mail_job_claims'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examschedulehistory',
+            name='leaderboard_checked_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
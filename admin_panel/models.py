@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 
 # --------------------------
 # 1️⃣ College - master table
@@ -50,8 +51,131 @@ class ExamScheduleHistory(models.Model):
     quiz_date = models.DateTimeField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Kept up to date by admin_panel/schedule_counters.py so the dashboard
+    # needs no aggregation; refresh_schedule_counters rebuilds them
+    registration_count = models.PositiveIntegerField(default=0)
+    submission_count = models.PositiveIntegerField(default=0)
+    score_total = models.PositiveIntegerField(default=0)
+    max_score = models.IntegerField(null=True, blank=True)
+    min_score = models.IntegerField(null=True, blank=True)
+    # submission_count when the leaderboard was last found complete, so
+    # results pages only count its entries after new submissions
+    leaderboard_checked_count = models.PositiveIntegerField(default=0)
+
     class Meta:
         ordering = ['-quiz_date']
+        indexes = [
+            # Dashboard cursor: (-quiz_date, -id)
+            models.Index(fields=['quiz_date', 'id'], name='schedule_history_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.college.name} - {self.quiz_date.strftime('%Y-%m-%d %H:%M')}"
+
+    @property
+    def average_score(self):
+        if not self.submission_count:
+            return None
+        return self.score_total / self.submission_count
+
+
+# --------------------------
+# 4️⃣ EmailOutbox - mail waiting for the drain_outbox worker
+# --------------------------
+class EmailOutbox(models.Model):
+    PENDING = 'pending'
+    SENDING = 'sending'   # claimed by a worker until next_attempt_at
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()                                 # plain text part
+    html_template = models.CharField(max_length=255, blank=True)  # rendered by the worker
+    context = models.JSONField(default=dict, blank=True)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+# --------------------------
+# 5️⃣ MailJob - one template sent to many recipients
+# --------------------------
+class MailJob(models.Model):
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'     # the template couldn't be rendered
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    exam_schedule = models.ForeignKey(
+        ExamSchedule, on_delete=models.SET_NULL, null=True, blank=True, related_name='mail_jobs'
+    )
+    kind = models.CharField(max_length=50)                    # e.g. "quiz_link", "registration_link"
+    subject = models.CharField(max_length=255)
+    body = models.TextField()                                 # plain text part
+    html_template = models.CharField(max_length=255, blank=True)
+    context = models.JSONField(default=dict, blank=True)      # same for every recipient
+    recipient_fields = models.JSONField(default=list, blank=True)  # per-recipient context keys
+    from_email = models.CharField(max_length=255)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.kind} #{self.id} ({self.status})"
+
+
+class MailJobRecipient(models.Model):
+    PENDING = 'pending'
+    SENDING = 'sending'   # claimed by a worker until claimed_until
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    job = models.ForeignKey(MailJob, on_delete=models.CASCADE, related_name='recipients')
+    email = models.EmailField()
+    context = models.JSONField(default=dict, blank=True)      # values for job.recipient_fields
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    claimed_until = models.DateTimeField(null=True, blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['job', 'status'], name='mailjob_recipient_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.email} ({self.status})"
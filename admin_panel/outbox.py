@@ -0,0 +1,157 @@
+# admin_panel/outbox.py
+"""
+Database-backed email outbox.
+
+Views call enqueue_email(), which is a single INSERT; the HTML template
+is rendered later by the worker. The drain_outbox management command
+claims a batch of due rows (status "sending", committed), then sends them
+over one SMTP connection that stays open between messages, recording
+each row as it goes. Failures are retried with exponential backoff until
+OUTBOX_MAX_ATTEMPTS.
+
+Point EMAIL_HOST/EMAIL_PORT/EMAIL_USE_SSL at a local SMTP stand-in
+(e.g. ``python -m aiosmtpd -n -l localhost:1025`` with EMAIL_USE_SSL=False)
+to exercise the whole path without the real mail server.
+"""
+import logging
+import smtplib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def max_attempts():
+    return getattr(settings, 'OUTBOX_MAX_ATTEMPTS', 5)
+
+
+def claim_seconds():
+    return getattr(settings, 'OUTBOX_CLAIM_SECONDS', 600)
+
+
+def retry_delay(attempts):
+    """Backoff after the given number of failed attempts: 30s, 1m, 2m, ... capped at 1h."""
+    base = getattr(settings, 'OUTBOX_RETRY_BASE_SECONDS', 30)
+    return timedelta(seconds=min(base * 2 ** (attempts - 1), 3600))
+
+
+def outbox_message(subject, to, body, html_template='', context=None, from_email=None):
+    """An unsaved EmailOutbox row, for bulk_create."""
+    return EmailOutbox(
+        subject=subject,
+        body=body,
+        html_template=html_template,
+        context=context or {},
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+    )
+
+
+def enqueue_email(subject, to, body, html_template='', context=None, from_email=None):
+    """Queue one email; returns the EmailOutbox row."""
+    message = outbox_message(subject, to, body, html_template, context, from_email)
+    message.save()
+    return message
+
+
+def build_message(item, connection=None):
+    message = EmailMultiAlternatives(
+        subject=item.subject,
+        body=item.body,
+        from_email=item.from_email,
+        to=item.to,
+        connection=connection,
+    )
+    if item.html_template:
+        message.attach_alternative(
+            render_to_string(item.html_template, item.context),
+            "text/html"
+        )
+    return message
+
+
+class OutboxSender:
+    """Keeps one SMTP connection open across drain passes."""
+
+    def __init__(self):
+        self.connection = None
+
+    def open(self):
+        if self.connection is None:
+            self.connection = get_connection(fail_silently=False)
+            self.connection.open()
+        return self.connection
+
+    def close(self):
+        if self.connection is not None:
+            try:
+                self.connection.close()
+            except Exception:
+                pass
+            self.connection = None
+
+    def send(self, item):
+        try:
+            build_message(item, self.open()).send()
+        except smtplib.SMTPServerDisconnected:
+            # Server dropped an idle connection: reconnect once and retry
+            self.close()
+            build_message(item, self.open()).send()
+
+    def claim(self, batch_size):
+        """
+        Mark a batch of due messages as sending, committed before anything
+        is sent, and return them. A claim that outlives
+        OUTBOX_CLAIM_SECONDS (the worker died) is due again.
+        """
+        now = timezone.now()
+        with transaction.atomic():
+            due = list(
+                EmailOutbox.objects
+                .select_for_update(skip_locked=True)
+                .filter(
+                    status__in=[EmailOutbox.PENDING, EmailOutbox.SENDING],
+                    next_attempt_at__lte=now,
+                )
+                .order_by('next_attempt_at', 'id')[:batch_size]
+            )
+            EmailOutbox.objects.filter(id__in=[item.id for item in due]).update(
+                status=EmailOutbox.SENDING,
+                next_attempt_at=now + timedelta(seconds=claim_seconds()),
+            )
+        return due
+
+    def drain(self, batch_size=100):
+        """Send one batch of due messages. Returns (sent, failed)."""
+        sent = failed = 0
+        # Each row is marked as soon as it is sent, so a crash mid-batch
+        # resends at most the message that was in flight
+        for item in self.claim(batch_size):
+            try:
+                self.send(item)
+            except Exception as e:
+                logger.warning("Outbox email %s failed: %s", item.id, e)
+                self.close()  # don't reuse a connection in an unknown state
+                item.attempts += 1
+                item.last_error = str(e)[:1000]
+                if item.attempts >= max_attempts():
+                    item.status = EmailOutbox.FAILED
+                else:
+                    item.status = EmailOutbox.PENDING
+                    item.next_attempt_at = timezone.now() + retry_delay(item.attempts)
+                item.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+                failed += 1
+            else:
+                item.status = EmailOutbox.SENT
+                item.sent_at = timezone.now()
+                item.attempts += 1
+                item.save(update_fields=['status', 'sent_at', 'attempts'])
+                sent += 1
+        return sent, failed
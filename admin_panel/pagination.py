@@ -0,0 +1,246 @@
+# admin_panel/pagination.py
+"""
+Keyset (seek) pagination for the admin list views.
+
+Django's Paginator reads a page with OFFSET and sizes the list with
+COUNT(*), and both get slower the deeper the page and the bigger the
+table. KeysetPaginator instead asks for the rows just after the last row
+(or just before the first row) of the current page, by their sort key,
+which an index on that key answers at the same cost on any page.
+
+The cursor travels as a signed, opaque token in the usual `page`
+parameter: previous_page_number() and next_page_number() return tokens,
+so the templates' Previous/Next links keep working as they are. Numbered
+links (?page=7) still work, with OFFSET.
+
+The total comes from the caller when it is known (a stored counter).
+Otherwise it is counted up to KEYSET_COUNT_LIMIT rows, or, for a whole
+table on MySQL, read from the table statistics. count_label shows when
+it is approximate.
+"""
+import json
+import math
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+SALT = 'admin_panel.pagination'
+
+EXACT = 'exact'
+ESTIMATE = 'estimate'  # MySQL table statistics
+AT_LEAST = 'at_least'  # counting stopped at KEYSET_COUNT_LIMIT
+
+
+def count_limit():
+    return getattr(settings, 'KEYSET_COUNT_LIMIT', 10000)
+
+
+class _CursorSerializer:
+    """JSON, with datetimes kept to the microsecond (DjangoJSONEncoder drops them)."""
+
+    def dumps(self, obj):
+        return json.dumps(
+            obj, separators=(',', ':'), default=lambda value: value.isoformat()
+        ).encode('latin-1')
+
+    def loads(self, data):
+        return json.loads(data.decode('latin-1'))
+
+
+def _table_estimate(queryset):
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            "SELECT TABLE_ROWS FROM information_schema.TABLES"
+            " WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    return row[0] if row and row[0] else 0
+
+
+class KeysetPaginator:
+    """
+    Paginate `queryset` by `ordering`, e.g. ['-id'] or ['name', 'id'].
+    The fields must be non-null model fields, the last one unique, and
+    ideally indexed together with the queryset's filters.
+    """
+
+    def __init__(self, queryset, per_page, ordering, count=None):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        self._count = count
+        self.count_kind = EXACT
+
+    @cached_property
+    def count(self):
+        if self._count is not None:
+            return self._count
+
+        limit = count_limit()
+        if connections[self.queryset.db].vendor == 'mysql' and not self.queryset.query.where:
+            estimate = _table_estimate(self.queryset)
+            if estimate > limit:
+                self.count_kind = ESTIMATE
+                return estimate
+
+        # COUNT(*) over a LIMITed subquery: stops reading at the limit
+        counted = self.queryset.order_by()[:limit + 1].count()
+        if counted > limit:
+            self.count_kind = AT_LEAST
+            return limit
+        return counted
+
+    @property
+    def count_label(self):
+        count = self.count
+        if self.count_kind == ESTIMATE:
+            return f"about {count:,}"
+        if self.count_kind == AT_LEAST:
+            return f"{count:,}+"
+        return f"{count:,}"
+
+    @property
+    def num_pages(self):
+        return max(1, math.ceil(self.count / self.per_page))
+
+    @property
+    def page_range(self):
+        return range(1, self.num_pages + 1)
+
+    # -----------------------------
+    # Queries
+    # -----------------------------
+    def _ordered(self, reverse=False):
+        return self.queryset.order_by(*[
+            f"{'-' if descending != reverse else ''}{name}"
+            for name, descending in self.ordering
+        ])
+
+    def _beyond(self, values, reverse=False):
+        """Rows after `values` in the ordering, or before them if reverse."""
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.ordering, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    # -----------------------------
+    # Cursor tokens
+    # -----------------------------
+    def token(self, obj, direction, number):
+        values = [getattr(obj, name) for name, _ in self.ordering]
+        return signing.dumps(
+            [direction, number, values], salt=SALT, serializer=_CursorSerializer, compress=True
+        )
+
+    def _decode(self, token):
+        direction, number, values = signing.loads(token, salt=SALT, serializer=_CursorSerializer)
+        meta = self.queryset.model._meta
+        values = [
+            meta.get_field(name).to_python(value)
+            for (name, _), value in zip(self.ordering, values)
+        ]
+        return direction, int(number), values
+
+    # -----------------------------
+    # Pages
+    # -----------------------------
+    def get_page(self, value):
+        """Page for a `page` parameter: a cursor token, a page number, or nothing."""
+        value = str(value or '').strip()
+        if not value or value.isdigit():
+            return self._numbered_page(int(value or 1))
+
+        try:
+            direction, number, values = self._decode(value)
+        except (signing.BadSignature, ValidationError, TypeError, ValueError):
+            return self._numbered_page(1)
+
+        if direction == 'next':
+            rows = list(self._ordered().filter(self._beyond(values))[:self.per_page + 1])
+            if not rows:  # the rows after the cursor were deleted
+                return self._last_page()
+            return KeysetPage(
+                rows[:self.per_page], number, self,
+                has_previous=True, has_next=len(rows) > self.per_page,
+            )
+
+        rows = list(
+            self._ordered(reverse=True).filter(self._beyond(values, reverse=True))[:self.per_page + 1]
+        )
+        if len(rows) <= self.per_page:  # reached the start: show a full first page
+            return self._numbered_page(1)
+        return KeysetPage(
+            rows[:self.per_page][::-1], number, self,
+            has_previous=True, has_next=True,
+        )
+
+    def _numbered_page(self, number):
+        number = max(number, 1)
+        offset = (number - 1) * self.per_page
+        rows = list(self._ordered()[offset:offset + self.per_page + 1])
+        if not rows and number > 1:
+            return self._last_page()
+        return KeysetPage(
+            rows[:self.per_page], number, self,
+            has_previous=number > 1, has_next=len(rows) > self.per_page,
+        )
+
+    def _last_page(self):
+        number = self.num_pages
+        size = self.per_page
+        if self.count_kind == EXACT:
+            size = max(self.count - (number - 1) * self.per_page, 0)
+        rows = list(self._ordered(reverse=True)[:size])[::-1]
+        return KeysetPage(rows, number, self, has_previous=number > 1, has_next=False)
+
+
+class KeysetPage(Sequence):
+    """Quacks like django.core.paginator.Page for the admin templates."""
+
+    def __init__(self, object_list, number, paginator, has_previous, has_next):
+        self.object_list = object_list
+        self.number = number
+        self.paginator = paginator
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __repr__(self):
+        return f"<Page {self.number}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_previous or self._has_next
+
+    def next_page_number(self):
+        return self.paginator.token(self.object_list[-1], 'next', self.number + 1)
+
+    def previous_page_number(self):
+        return self.paginator.token(self.object_list[0], 'previous', self.number - 1)
+
+    def start_index(self):
+        if not self.object_list:
+            return 0
+        return (self.number - 1) * self.paginator.per_page + 1
+
+    def end_index(self):
+        return self.start_index() + len(self.object_list) - 1 if self.object_list else 0
@@ -0,0 +1,73 @@
+# admin_panel/schedule_counters.py
+"""
+Registration and result counters stored on ExamScheduleHistory.
+
+Registrations and submits bump them with a single UPDATE using F()
+expressions, inside the transaction that creates the Student or Result,
+so the dashboard reads live numbers without aggregating. Registration
+takes its hall ticket before that transaction, so it still comes from
+the worker's reserved block (see students.hall_tickets). Bulk paths
+(roster import, the expiry sweeper) and repairs call refresh_counters(),
+which recomputes them with one GROUP BY per table.
+"""
+from django.db.models import Count, F, Max, Min, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from .models import ExamScheduleHistory
+
+COUNTER_FIELDS = ['registration_count', 'submission_count', 'score_total', 'max_score', 'min_score']
+
+
+def count_registrations(schedule_id, count=1):
+    if schedule_id is None or not count:
+        return
+    ExamScheduleHistory.objects.filter(pk=schedule_id).update(
+        registration_count=F('registration_count') + count
+    )
+
+
+def count_submission(schedule_id, score):
+    if schedule_id is None:
+        return
+    # Coalesce: GREATEST/LEAST return NULL if any argument is NULL on MySQL
+    ExamScheduleHistory.objects.filter(pk=schedule_id).update(
+        submission_count=F('submission_count') + 1,
+        score_total=F('score_total') + score,
+        max_score=Greatest(Coalesce(F('max_score'), Value(score)), Value(score)),
+        min_score=Least(Coalesce(F('min_score'), Value(score)), Value(score)),
+    )
+
+
+def refresh_counters(schedule_ids=None):
+    """Recompute the counters (of the given schedules, or all). Returns rows updated."""
+    from students.models import Student
+    from tests.models import Result
+
+    schedules = ExamScheduleHistory.objects.all()
+    students = Student.objects.filter(exam_schedule__isnull=False)
+    results = Result.objects.filter(exam_schedule__isnull=False)
+    if schedule_ids is not None:
+        schedules = schedules.filter(pk__in=schedule_ids)
+        students = students.filter(exam_schedule_id__in=schedule_ids)
+        results = results.filter(exam_schedule_id__in=schedule_ids)
+
+    registrations = dict(
+        students.values_list('exam_schedule_id').annotate(Count('id')).order_by()
+    )
+    submissions = {
+        row['exam_schedule_id']: row
+        for row in results.values('exam_schedule_id').annotate(
+            count=Count('id'), total=Sum('score'), high=Max('score'), low=Min('score')
+        ).order_by()
+    }
+
+    schedules = list(schedules.only('id', *COUNTER_FIELDS))
+    for schedule in schedules:
+        row = submissions.get(schedule.id, {})
+        schedule.registration_count = registrations.get(schedule.id, 0)
+        schedule.submission_count = row.get('count', 0)
+        schedule.score_total = row.get('total') or 0
+        schedule.max_score = row.get('high')
+        schedule.min_score = row.get('low')
+    ExamScheduleHistory.objects.bulk_update(schedules, COUNTER_FIELDS, batch_size=500)
+    return len(schedules)
@@ -0,0 +1,46 @@
+# admin_panel/schedule_state.py
+"""
+Cached per-college exam schedule state.
+
+Students poll this while they wait for the quiz to open, so it is served
+from the shared cache and dropped whenever an admin view changes the
+college's ExamSchedule.
+"""
+from django.core.cache import cache
+
+from .models import ExamSchedule
+
+SCHEDULE_STATE_TIMEOUT = 300  # seconds; admin changes invalidate sooner
+
+
+def _cache_key(college_id):
+    return f'schedule_state:{college_id}'
+
+
+def get_schedule_state(college_id):
+    """
+    Return {'id', 'quiz_date', 'quiz_enabled', 'registration_enabled'} for
+    the college's schedule, or None if it has none.
+    """
+    if college_id is None:
+        return None
+
+    key = _cache_key(college_id)
+    state = cache.get(key)
+    if state is None:
+        schedule = (
+            ExamSchedule.objects
+            .filter(college_id=college_id)
+            .values('id', 'quiz_date', 'quiz_enabled', 'registration_enabled')
+            .order_by('-quiz_date')
+            .first()
+        )
+        # Cache "no schedule" too so waiting students don't hit the DB
+        state = schedule or {}
+        cache.set(key, state, timeout=SCHEDULE_STATE_TIMEOUT)
+
+    return state or None
+
+
+def invalidate_schedule_state(college_id):
+    cache.delete(_cache_key(college_id))
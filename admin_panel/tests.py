@@ -1,3 +1,122 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .mail_jobs import ConnectionPool, MailJobRunner, create_mail_job, retry_failed
+from .models import College, ExamSchedule, MailJob, MailJobRecipient
+
+
+class ScheduleManagementQueryTests(TestCase):
+    COLLEGES = 2000
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser('admin', 'admin@example.com', '!')
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def add_colleges(self, start, stop):
+        now = timezone.now()
+        colleges = College.objects.bulk_create(
+            [College(name=f'College {i:04d}') for i in range(start, stop)],
+            batch_size=1000,
+        )
+        # Two thirds get a schedule, so pages mix both kinds of row
+        ExamSchedule.objects.bulk_create(
+            [
+                ExamSchedule(college=college, quiz_date=now + timedelta(minutes=i))
+                for i, college in enumerate(colleges)
+                if i % 3
+            ],
+            batch_size=1000,
+        )
+
+    def assert_page_queries(self, num, params):
+        # session, user, count, page rows, its colleges and (if any) schedules
+        with self.assertNumQueries(num):
+            response = self.client.get(reverse('quiz_management'), params)
+        self.assertEqual(response.status_code, 200)
+
+    def test_query_count_does_not_grow_with_colleges(self):
+        self.add_colleges(0, 10)
+        self.assert_page_queries(6, {})
+        self.assert_page_queries(6, {'q': 'college 00'})
+
+        self.add_colleges(10, self.COLLEGES)
+        self.assert_page_queries(6, {})
+        self.assert_page_queries(6, {'page': self.COLLEGES // 20})
+        self.assert_page_queries(6, {'q': 'college 00'})
+        # Out of range, so the last page: only colleges without a schedule
+        self.assert_page_queries(5, {'page': self.COLLEGES})
+
+
+class MailJobRunnerTests(TestCase):
+    def make_job(self, kind, *emails):
+        return create_mail_job(kind, 'Subject', 'Body', [(email, {}) for email in emails])
+
+    def step(self):
+        runner = MailJobRunner(connections=1)
+        try:
+            return runner.step()
+        finally:
+            runner.close()
+
+    def test_job_with_only_live_claims_does_not_hold_up_newer_jobs(self):
+        stuck = self.make_job('stuck', 'a@example.com')
+        stuck.recipients.update(
+            status=MailJobRecipient.SENDING,
+            claimed_until=timezone.now() + timedelta(minutes=10),
+        )
+        newer = self.make_job('newer', 'b@example.com')
+
+        self.assertEqual(self.step(), 1)
+
+        self.assertEqual([m.to for m in mail.outbox], [['b@example.com']])
+        self.assertEqual(newer.recipients.get().status, MailJobRecipient.SENT)
+        self.assertEqual(stuck.recipients.get().status, MailJobRecipient.SENDING)
+
+    def test_expired_claim_is_sent_again(self):
+        job = self.make_job('crashed', 'a@example.com')
+        job.recipients.update(
+            status=MailJobRecipient.SENDING,
+            claimed_until=timezone.now() - timedelta(seconds=1),
+        )
+
+        self.assertEqual(self.step(), 1)
+        self.assertEqual(job.recipients.get().status, MailJobRecipient.SENT)
+
+    @override_settings(MAIL_JOB_MAX_ATTEMPTS=2)
+    def test_failed_send_is_retried_then_marked_failed(self):
+        job = self.make_job('flaky', 'a@example.com')
+
+        with mock.patch.object(ConnectionPool, 'send', return_value='550 mailbox unavailable'):
+            self.assertEqual(self.step(), 1)
+            recipient = job.recipients.get()
+            self.assertEqual(recipient.status, MailJobRecipient.SENDING)
+            self.assertEqual(recipient.attempts, 1)
+            self.assertGreater(recipient.claimed_until, timezone.now())
+
+            # Waiting out the retry delay: nothing to claim yet
+            self.assertEqual(self.step(), 0)
+
+            job.recipients.update(claimed_until=timezone.now() - timedelta(seconds=1))
+            self.assertEqual(self.step(), 1)
+
+        recipient = job.recipients.get()
+        self.assertEqual(recipient.status, MailJobRecipient.FAILED)
+        self.assertEqual(recipient.attempts, 2)
+        self.assertEqual(recipient.last_error, '550 mailbox unavailable')
+
+        # Only a failed row left: the job finishes
+        self.assertEqual(self.step(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, MailJob.DONE)
+
+        self.assertEqual(retry_failed(job), 1)
+        self.assertEqual(job.recipients.get().attempts, 0)
@@ -33,14 +33,22 @@ urlpatterns = [
     path('quiz/toggle_registration/<int:pk>/', views.toggle_registration, name='toggle_registration'),
     path('quiz/share_registration/<int:schedule_id>/', views.share_registration_link, name='share_registration_link'),
     path('quiz/share_quiz/<int:schedule_id>/', views.share_quiz_link, name='share_quiz_link'),
+    path('mail_jobs/<int:job_id>/', views.mail_job_progress, name='mail_job_progress'),
+    path('mail_jobs/<int:job_id>/retry/', views.retry_mail_job, name='retry_mail_job'),
 
     # College Results
     path("results/<int:schedule_id>/", views.college_results, name="college_results"),
+    path('merit_list/', views.merit_list, name='merit_list'),
+    path('merit_list/<int:pk>/', views.merit_list, name='merit_list_detail'),
     path('registrations/<int:schedule_id>/', views.college_registrations, name='college_registrations'),
+    path('registrations/<int:schedule_id>/generate_papers/', views.generate_question_papers, name='generate_question_papers'),
+    path('registrations/<int:schedule_id>/import/', views.import_students, name='import_students'),
+    path('roster_imports/<int:import_id>/', views.roster_import_progress, name='roster_import_progress'),
 
     # Export Results
 
     path('export/registrations/<int:schedule_id>/', views.export_registrations, name='export_registrations'),
     path('export/results/<int:schedule_id>/', views.export_results, name='export_results'),
+    path('export/all/', views.export_all_schedules, name='export_all_schedules'),
 
 ]
@@ -6,9 +6,23 @@ from django.conf import settings
 from django.core.paginator import Paginator
 from django.forms import modelformset_factory
 from .forms import QuestionForm, CollegeForm, ExamScheduleForm, CollegeOfficialForm,CollegeOfficialEditForm
-from tests.models import Result, Question
-from admin_panel.models import College, CollegeOfficial, ExamSchedule, ExamScheduleHistory
-from students.models import Student
+from tests.models import LeaderboardEntry, MeritList, MeritListEntry, Result, Question
+from tests.leaderboard import LEADERBOARD_ORDERING, ensure_leaderboard, rank_page, within_top
+from tests.question_pool import bump_question_bank_version
+from tests.broadcast import publish_schedule_event
+from tests.papers import NotEnoughQuestions, generate_papers
+from admin_panel.models import College, CollegeOfficial, ExamSchedule, ExamScheduleHistory, MailJob, MailJobRecipient
+from admin_panel.exports import (
+    MERIT_LIST_HEADERS, REGISTRATION_HEADERS, RESULT_HEADERS, csv_response, export_response,
+    merit_list_rows, registration_rows, result_rows,
+    schedules_matching, stream_schedules_zip,
+)
+from admin_panel.college_search import officials_to_show, search_colleges
+from admin_panel.mail_jobs import create_mail_job, job_progress, retry_failed
+from admin_panel.pagination import KeysetPaginator
+from admin_panel.schedule_state import invalidate_schedule_state
+from students.models import RosterImport, Student
+from students.roster import ROSTER_COLUMNS, ROSTER_EXTENSIONS, queue_roster_import
 import datetime
 from django.utils.timezone import make_aware, get_default_timezone
 from django.contrib.auth import logout as auth_logout
@@ -16,7 +30,7 @@ import json
 from django.views.decorators.http import require_http_methods
 from django.contrib.auth.decorators import user_passes_test
 import openpyxl
-from django.http import HttpResponse
+from django.http import HttpResponse, StreamingHttpResponse
 from openpyxl.styles import Font
 from django.views.decorators.cache import never_cache
 from django.utils.dateparse import parse_date
@@ -28,7 +42,8 @@ from django.db.models import Q, Prefetch
 from collections import defaultdict
 from django.template.loader import render_to_string
 from django.core.mail import EmailMultiAlternatives
-from django.db.models import Count
+from django.db.models import BooleanField, Count, ExpressionWrapper, F
+from django.db.models.functions import Lower
 # -----------------------------
 # Decorators
 # -----------------------------
@@ -69,27 +84,12 @@ def dashboard(request):
     from_date_str = request.GET.get('from_date')
     to_date_str = request.GET.get('to_date')
 
-    schedules = ExamScheduleHistory.objects.all()
+    schedules = schedules_matching(college_query, from_date_str, to_date_str)
 
-    if college_query:
-        schedules = schedules.filter(college__name__icontains=college_query)
+    schedules = schedules.select_related('college')
 
-    if from_date_str:
-        from_date = parse_date(from_date_str)
-        if from_date:
-            from_dt = timezone.make_aware(datetime.combine(from_date, datetime.min.time()))
-            schedules = schedules.filter(quiz_date__gte=from_dt)
-
-    if to_date_str:
-        to_date = parse_date(to_date_str)
-        if to_date:
-            to_dt = timezone.make_aware(datetime.combine(to_date, datetime.max.time()))
-            schedules = schedules.filter(quiz_date__lte=to_dt)
-
-    schedules = schedules.select_related('college').order_by('-quiz_date')
-    
-     # Pagination
-    paginator = Paginator(schedules, 5)  # 10 rows per page
+    # ✅ Keyset pagination on (-quiz_date, -id)
+    paginator = KeysetPaginator(schedules, 5, ['-quiz_date', '-id'])
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
@@ -101,6 +101,30 @@ def dashboard(request):
     })
 
 
+@superuser_required
+def export_all_schedules(request):
+    # ✅ Same filters as the dashboard; one ZIP with every schedule's workbooks
+    schedule_ids = list(
+        schedules_matching(
+            request.GET.get('college'),
+            request.GET.get('from_date'),
+            request.GET.get('to_date'),
+        ).order_by('quiz_date').values_list('id', flat=True)
+    )
+
+    if not schedule_ids:
+        messages.error(request, "No schedules match these filters.")
+        return redirect('dashboard')
+
+    response = StreamingHttpResponse(
+        stream_schedules_zip(schedule_ids),
+        content_type='application/zip'
+    )
+    filename = f"Exports_{timezone.localdate()}.zip"
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
 # -----------------------------
 # College Management
 # -----------------------------
@@ -108,45 +132,17 @@ def dashboard(request):
 @superuser_required
 def college_management(request):
     q = request.GET.get("q", "").strip().lower()
-    colleges = College.objects.prefetch_related("officials").order_by("name")
-
-    # Filter colleges based on search
-    filtered_colleges = []
-    for college in colleges:
-        # College matches?
-        college_matches = q in college.name.lower() if q else True
-
-        # Filter officials
-        matching_officials = []
-        for off in college.officials.all():
-            if (
-                (q in off.name.lower() if off.name else False) or
-                (q in off.email.lower() if off.email else False) or
-                college_matches
-            ):
-                matching_officials.append(off)
-
-        if matching_officials or college_matches:
-            # Add a dummy official if no real officials
-            if not matching_officials:
-                class DummyOfficial:
-                    def __init__(self, college):
-                        self.college = college
-                        self.name = None
-                        self.email = None
-                        self.is_active = None
-                        self.id = None
-                matching_officials.append(DummyOfficial(college))
-
-            # Attach matching officials to college for template
-            college.matching_officials = matching_officials
-            filtered_colleges.append(college)
-
-    # Pagination on colleges
-    paginator = Paginator(filtered_colleges, 10)
+
+    # ✅ Search and paginate in the database; officials only for this page
+    colleges = search_colleges(q).order_by("name")
+    paginator = Paginator(colleges, 10)
     page_number = request.GET.get("page")
     page_obj = paginator.get_page(page_number)
 
+    officials = officials_to_show(page_obj, q)
+    for college in page_obj:
+        college.matching_officials = officials[college.id]
+
     return render(request, "admin_panel/college_management.html", {
         "colleges": page_obj,  # template loops over colleges
         "q": q
@@ -236,53 +232,43 @@ def toggle_college_official(request, pk):
 # -----------------------------
 @superuser_required
 def exam_schedule_management(request):
-    now = timezone.now()
-    colleges = (
-        College.objects
-        .prefetch_related('exam_schedules')
-        .annotate(
-            active_schedule_count=Count(
-                'exam_schedules',
-                filter=Q(exam_schedules__quiz_date__gte=now)
-            )
-        )
-        .order_by('-active_schedule_count', 'name')
-    )
-    
-    
-    # Prepare rows: one per college per schedule, or dummy if no schedule
     q = request.GET.get("q", "").strip().lower()
 
-    
-    if q:
-        colleges = [c for c in colleges if q in c.name.lower()]
-    rows = []
-    for college in colleges:
-        schedules = college.exam_schedules.all()
-        if schedules.exists():
-            for schedule in schedules:
-                rows.append({
-                    "college": college,
-                    "schedule": schedule
-                })
-        else:
-            rows.append({
-                "college": college,
-                "schedule": None
-            })
-    max_date = timezone.make_aware(datetime.max) 
-    rows.sort(
-        key=lambda r: (
-            r["schedule"] is None,
-            r["schedule"].quiz_date if r["schedule"] and r["schedule"].quiz_date else max_date,
-            r["college"].name.lower(),
+    # ✅ One row per college per schedule (LEFT JOIN), sorted and paginated
+    # in SQL: dated schedules first, then undated, then colleges without one
+    rows = (
+        College.objects
+        .filter(name__icontains=q)
+        .alias(no_schedule=ExpressionWrapper(
+            Q(exam_schedules__isnull=True), output_field=BooleanField()
+        ))
+        .order_by(
+            'no_schedule',
+            F('exam_schedules__quiz_date').asc(nulls_last=True),
+            Lower('name'),
+            'id',
+            'exam_schedules__id',
         )
+        .values('id', 'exam_schedules__id')
     )
-            
+
     paginator = Paginator(rows, 10)   # 10 rows per page
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
+    # ✅ Load only the colleges and schedules on this page
+    colleges = College.objects.in_bulk({row['id'] for row in page_obj})
+    schedules = ExamSchedule.objects.in_bulk(
+        {row['exam_schedules__id'] for row in page_obj} - {None}
+    )
+    page_obj.object_list = [
+        {
+            "college": colleges[row['id']],
+            "schedule": schedules.get(row['exam_schedules__id']),
+        }
+        for row in page_obj
+    ]
+
     return render(request, 'admin_panel/quiz_management.html', {
         "rows": page_obj,      # use page_obj for template loop
         "page_obj": page_obj,  # use for pagination links
@@ -336,6 +322,8 @@ def add_exam_schedule(request):
             messages.success(request, f"Exam schedule updated for {college.name}.")
         else:
             messages.success(request, f"Exam schedule created for {college.name}.")
+        invalidate_schedule_state(college.id)
+        publish_schedule_event(college.id, "schedule_changed")
          # ✅ always log in history
         
         ExamScheduleHistory.objects.create(college=college, quiz_date=aware_dt)
@@ -356,6 +344,8 @@ def edit_exam_schedule(request, pk):
         form = ExamScheduleForm(request.POST, instance=schedule)
         if form.is_valid():
             form.save()
+            invalidate_schedule_state(schedule.college_id)
+            publish_schedule_event(schedule.college_id, "schedule_changed")
             messages.success(request, "Exam schedule updated successfully.")
             return redirect('quiz_management')
     else:
@@ -377,6 +367,11 @@ def toggle_quiz_status(request, pk):
         schedule.quiz_enabled = True
         
     schedule.save(update_fields=['quiz_enabled', 'quiz_date','registration_enabled'])
+    invalidate_schedule_state(schedule.college_id)
+    publish_schedule_event(
+        schedule.college_id,
+        "quiz_enabled" if schedule.quiz_enabled else "quiz_disabled"
+    )
     
     status = "enabled" if schedule.quiz_enabled else "disabled"
     messages.success(request, f"Quiz {status} for {schedule.college.name}.")
@@ -424,41 +419,25 @@ def share_registration_link(request, schedule_id):
         ),
     }
 
-    html_content = render_to_string(
-        "emails/register_email.html",
-        context
-    )
-
-    email = EmailMultiAlternatives(
+    job = create_mail_job(
+        kind="registration_link",
+        exam_schedule=schedule,
         subject=(
             f"BTES Scholarship Test Registration - "
             f"{schedule.college.name}"
         ),
         body="Please view this email in HTML format.",
-        from_email=settings.DEFAULT_FROM_EMAIL,
-        to=emails,
+        html_template="emails/register_email.html",
+        context=context,
+        recipients=((email, {}) for email in emails),
     )
 
-    email.attach_alternative(
-        html_content,
-        "text/html"
+    messages.success(
+        request,
+        f"Sending the registration link to {schedule.college.name} officials."
     )
 
-    try:
-        email.send()
-
-        messages.success(
-            request,
-            f"Registration link sent to {schedule.college.name} officials."
-        )
-
-    except Exception as e:
-        messages.error(
-            request,
-            f"Failed to send email: {e}"
-        )
-
-    return redirect("quiz_management")
+    return redirect("mail_job_progress", job_id=job.id)
 
 
 
@@ -502,64 +481,84 @@ def share_quiz_link(request, schedule_id):
 
         return redirect("quiz_management")
 
-    success_count = 0
+    # ✅ Don't send twice if the button is clicked again mid-run
+    running = schedule.mail_jobs.filter(
+        kind="quiz_link",
+        status__in=[MailJob.QUEUED, MailJob.RUNNING],
+    ).first()
+    if running:
+        messages.info(request, "Quiz links are already being sent.")
+        return redirect("mail_job_progress", job_id=running.id)
+
+    # ✅ Rendered once by the worker; these fields are filled per student
+    job = create_mail_job(
+        kind="quiz_link",
+        exam_schedule=schedule,
+        subject=(
+            "Your Quiz Link & Hall Ticket "
+            "- Scholarship Test"
+        ),
+        body=(
+            "Please view this email "
+            "in HTML format."
+        ),
+        html_template="emails/quiz_link.html",
+        context={
+            "college_name": schedule.college.name,
+            "quiz_link": link,
+            "quiz_date": local_quiz_time.strftime(
+                "%d-%m-%Y %I:%M %p"
+            ),
+            "access_time": "10 minutes before the test",
+        },
+        recipient_fields=["student_name", "hall_ticket"],
+        recipients=(
+            (email, {"student_name": name, "hall_ticket": hall_ticket})
+            for name, email, hall_ticket in students.values_list(
+                "name", "email", "hall_ticket"
+            ).iterator()
+        ),
+    )
 
-    try:
+    messages.success(
+        request,
+        "Sending quiz links to registered students."
+    )
 
-        for student in students:
-
-            context = {
-                "student_name": student.name,
-                "college_name": schedule.college.name,
-                "hall_ticket": student.hall_ticket,
-                "quiz_link": link,
-                "quiz_date": local_quiz_time.strftime(
-                    "%d-%m-%Y %I:%M %p"
-                ),
-                "access_time": "10 minutes before the test",
-            }
+    return redirect("mail_job_progress", job_id=job.id)
 
-            html_content = render_to_string(
-                "emails/quiz_link.html",
-                context
-            )
-
-            email = EmailMultiAlternatives(
-                subject=(
-                    "Your Quiz Link & Hall Ticket "
-                    "- Scholarship Test"
-                ),
-                body=(
-                    "Please view this email "
-                    "in HTML format."
-                ),
-                from_email=settings.DEFAULT_FROM_EMAIL,
-                to=[student.email],
-            )
-
-            email.attach_alternative(
-                html_content,
-                "text/html"
-            )
-
-            email.send()
-
-            success_count += 1
-
-        messages.success(
-            request,
-            f"Quiz links sent successfully "
-            f"to {success_count} students."
-        )
 
-    except Exception as e:
+@superuser_required
+def mail_job_progress(request, job_id):
+    job = get_object_or_404(
+        MailJob.objects.select_related("exam_schedule__college"),
+        pk=job_id
+    )
 
-        messages.error(
-            request,
-            f"Failed to send quiz emails: {e}"
-        )
+    failed = job.recipients.filter(
+        status=MailJobRecipient.FAILED
+    ).order_by("id")[:100]
+
+    return render(request, "admin_panel/mail_job_progress.html", {
+        "job": job,
+        "progress": job_progress(job),
+        "failed": failed,
+        "finished": job.status in (MailJob.DONE, MailJob.FAILED),
+    })
+
+
+@superuser_required
+@require_http_methods(["POST"])
+def retry_mail_job(request, job_id):
+    job = get_object_or_404(MailJob, pk=job_id)
 
-    return redirect("quiz_management")
+    count = retry_failed(job)
+    if count:
+        messages.success(request, f"Retrying {count} failed recipients.")
+    else:
+        messages.info(request, "No failed recipients to retry.")
+
+    return redirect("mail_job_progress", job_id=job.id)
 
 
 @superuser_required
@@ -570,6 +569,8 @@ def update_quiz_date(request, pk):
         if quiz_date:
             schedule.quiz_date = quiz_date
             schedule.save(update_fields=['quiz_date'])
+            invalidate_schedule_state(schedule.college_id)
+            publish_schedule_event(schedule.college_id, "schedule_changed")
             messages.success(request, f"Quiz date updated for {schedule.college.name}.")
     return redirect('quiz_management')
 
@@ -579,6 +580,7 @@ def toggle_registration(request, pk):
     schedule = get_object_or_404(ExamSchedule, pk=pk)
     schedule.registration_enabled = not schedule.registration_enabled
     schedule.save(update_fields=['registration_enabled'])
+    invalidate_schedule_state(schedule.college_id)
     status = "opened" if schedule.registration_enabled else "closed"
     messages.success(request, f"Registration {status} for {schedule.college.name}.")
     return redirect('quiz_management')
@@ -592,8 +594,13 @@ def college_results(request, schedule_id):
     schedule = get_object_or_404(ExamScheduleHistory, pk=schedule_id)
     college = schedule.college
 
-    # Get results only for this exam schedule
-    results = Result.objects.filter(exam_schedule=schedule).order_by("-score")
+    # ✅ Leaderboard order: filters are index range reads on it
+    ensure_leaderboard(schedule)
+    results = (
+        LeaderboardEntry.objects
+        .filter(exam_schedule=schedule)
+        .select_related("student", "result")
+    )
 
     # Apply optional filters
     cutoff = request.GET.get("cutoff")
@@ -603,12 +610,17 @@ def college_results(request, schedule_id):
     if cutoff:
         filtered_results = filtered_results.filter(score__gte=int(cutoff))
     if top_n:
-        filtered_results = filtered_results[:int(top_n)]
+        filtered_results = within_top(filtered_results, schedule.id, int(top_n))
 
-    # Pagination: 10 results per page
-    paginator = Paginator(filtered_results, 10)
+    # ✅ Keyset pagination on (-score, submitted_at, result id)
+    paginator = KeysetPaginator(
+        filtered_results, 10, LEADERBOARD_ORDERING,
+        count=None if cutoff or top_n else schedule.submission_count,  # ✅ stored counter
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    # ✅ Position, rank and percentile of this page only
+    rank_page(page_obj.object_list, schedule.submission_count)
 
     return render(request, "admin_panel/results.html", {
         "college": college,
@@ -619,6 +631,40 @@ def college_results(request, schedule_id):
     })
 
 
+@superuser_required
+def merit_list(request, pk=None):
+    # ✅ Built offline by `manage.py build_merit_list`; this page only reads it
+    merit_lists = MeritList.objects.order_by('-to_date', '-id')
+    selected = (
+        get_object_or_404(MeritList, pk=pk) if pk
+        else merit_lists.first()
+    )
+
+    entries = MeritListEntry.objects.none()
+    if selected:
+        entries = (
+            selected.entries
+            .select_related('student', 'exam_schedule__college')
+            .order_by('position')
+        )
+
+    if selected and request.GET.get('format') == 'csv':
+        return csv_response(
+            f"Merit_List_{selected.name}.csv",
+            MERIT_LIST_HEADERS,
+            merit_list_rows(selected),
+        )
+
+    paginator = Paginator(entries, 50)
+    page_obj = paginator.get_page(request.GET.get('page'))
+
+    return render(request, 'admin_panel/merit_list.html', {
+        'merit_lists': merit_lists,
+        'selected': selected,
+        'page_obj': page_obj,
+    })
+
+
 @superuser_required
 def college_registrations(request, schedule_id):
     # Get the quiz schedule
@@ -626,10 +672,12 @@ def college_registrations(request, schedule_id):
     college = schedule.college
 
     # Fetch all students registered for this quiz schedule
-    registered_students = Student.objects.filter(exam_schedule=schedule).order_by('name')
+    registered_students = Student.objects.filter(exam_schedule=schedule)
 
-    # Pagination: 10 students per page
-    paginator = Paginator(registered_students, 10)
+    # ✅ Keyset pagination on (name, id); stored counter, no COUNT(*)
+    paginator = KeysetPaginator(
+        registered_students, 10, ['name', 'id'], count=schedule.registration_count
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
@@ -639,13 +687,65 @@ def college_registrations(request, schedule_id):
         "page_obj": page_obj
     })
 
+@superuser_required
+@require_http_methods(["POST"])
+def generate_question_papers(request, schedule_id):
+    schedule = get_object_or_404(ExamScheduleHistory, pk=schedule_id)
+    try:
+        created = generate_papers(schedule)
+    except NotEnoughQuestions as e:
+        messages.error(request, str(e))
+    else:
+        messages.success(request, f"{created} question papers generated for {schedule.college.name}.")
+    return redirect('college_registrations', schedule_id=schedule.id)
+
+@superuser_required
+def import_students(request, schedule_id):
+    schedule = get_object_or_404(ExamScheduleHistory.objects.select_related('college'), pk=schedule_id)
+
+    if request.method == 'POST':
+        file = request.FILES.get('file')
+        if not file:
+            messages.error(request, "Please select a file to upload.")
+            return redirect('import_students', schedule_id=schedule.id)
+
+        if os.path.splitext(file.name)[1].lower() not in ROSTER_EXTENSIONS:
+            messages.error(request, "Invalid file type. Only .xlsx or .csv files are allowed.")
+            return redirect('import_students', schedule_id=schedule.id)
+
+        # ✅ Hashing thousands of passwords takes minutes: the
+        # process_roster_imports worker does it, this page follows along
+        roster_import = queue_roster_import(file, schedule)
+        return redirect('roster_import_progress', import_id=roster_import.id)
+
+    return render(request, 'admin_panel/import_students.html', {
+        'college': schedule.college,
+        'schedule': schedule,
+        'columns': ROSTER_COLUMNS,
+        'imports': schedule.roster_imports.order_by('-id')[:5],
+    })
+
+
+@superuser_required
+def roster_import_progress(request, import_id):
+    roster_import = get_object_or_404(
+        RosterImport.objects.select_related('exam_schedule__college'),
+        pk=import_id
+    )
+    return render(request, 'admin_panel/roster_import.html', {
+        'roster_import': roster_import,
+        'schedule': roster_import.exam_schedule,
+        'college': roster_import.exam_schedule.college,
+        'finished': roster_import.status in (RosterImport.DONE, RosterImport.FAILED),
+    })
+
 # -----------------------------
 # Question Management
 # -----------------------------
 @superuser_required
 def manage_questions(request):
-    questions = Question.objects.all().order_by('-id')
-    paginator = Paginator(questions, 10)  # paginate by 10
+    questions = Question.objects.all()
+    paginator = KeysetPaginator(questions, 10, ['-id'])  # ✅ keyset on -id
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     return render(request, 'admin_panel/manage_questions.html', {'page_obj': page_obj})
@@ -657,6 +757,7 @@ def add_question(request):
         form = QuestionForm(request.POST)
         if form.is_valid():
             form.save()
+            bump_question_bank_version()
             messages.success(request, "Question added successfully.")
             return redirect('manage_questions')
     else:
@@ -671,6 +772,7 @@ def edit_question(request, pk):
         form = QuestionForm(request.POST, instance=question)
         if form.is_valid():
             form.save()
+            bump_question_bank_version()
             messages.success(request, "Question updated successfully.")
             return redirect('manage_questions')
     else:
@@ -683,6 +785,7 @@ def toggle_question(request, pk):
     question = get_object_or_404(Question, pk=pk)
     question.is_active = not question.is_active
     question.save(update_fields=['is_active'])
+    bump_question_bank_version()
     status = "enabled" if question.is_active else "disabled"
     messages.success(request, f"Question #{question.id} has been {status}.")
     return redirect('manage_questions')
@@ -695,6 +798,7 @@ def toggle_all_questions(request, action):
     elif action == 'disable':
         Question.objects.update(is_active=False)
         messages.success(request, "All questions have been disabled.")
+    bump_question_bank_version()
     return redirect('manage_questions')
 
 @superuser_required
@@ -774,6 +878,8 @@ def upload_questions(request):
 
                 count += 1
 
+            if count:
+                bump_question_bank_version()
             messages.success(request, f"{count} questions uploaded successfully!")
             return redirect('manage_questions')
 
@@ -791,76 +897,30 @@ def upload_questions(request):
 
 @superuser_required
 def export_registrations(request, schedule_id):
-    schedule = get_object_or_404(ExamScheduleHistory, pk=schedule_id)
-    students = Student.objects.filter(exam_schedule=schedule).order_by('name')
-
-    # Create Excel workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = f"Registrations_{schedule.college.name}"
-
-    # Header row
-    headers = ["ID", "Name", "Email", "College", "Contact Number"]
-    for col_index, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col_index, value=header.upper())
-        cell.font = Font(bold=True)
-
-    # Data rows
-    for idx, student in enumerate(students, start=1):
-        row = [
-            idx,
-            student.name.upper() if student.name else "",
-            student.email.upper() if student.email else "",
-            student.exam_schedule.college.name.upper() if student.exam_schedule.college.name else "",
-            student.mobile_number.upper() if student.mobile_number else ""
-        ]
-        for col_index, value in enumerate(row, start=1):
-            ws.cell(row=idx+1, column=col_index, value=value)
-
-    # Prepare response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    schedule = get_object_or_404(
+        ExamScheduleHistory.objects.select_related('college'),
+        pk=schedule_id
+    )
+    # ✅ ?format=csv streams a CSV; default is a write-only XLSX
+    return export_response(
+        request.GET.get('format'),
+        "Registrations",
+        schedule,
+        REGISTRATION_HEADERS,
+        registration_rows(schedule),
     )
-    filename = f"Registrations_{schedule.college.name}_{schedule.quiz_date.date()}.xlsx"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    wb.save(response)
-    return response
 
 
 @superuser_required
 def export_results(request, schedule_id):
-    schedule = get_object_or_404(ExamScheduleHistory, pk=schedule_id)
-    results = Result.objects.filter(exam_schedule=schedule).order_by('-score')
-
-    # Create Excel workbook
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    ws.title = f"Results_{schedule.college.name}"
-
-    # Header row
-    headers = ["ID", "Student Name", "Email", "Score","College", "Contact Number"]
-    for col_index, header in enumerate(headers, start=1):
-        cell = ws.cell(row=1, column=col_index, value=header.upper())
-        cell.font = Font(bold=True)
-
-    # Data rows
-    for idx, result in enumerate(results, start=1):
-        row = [
-            idx,
-            result.student.name.upper() if result.student.name else "",
-            result.student.email.upper() if result.student.email else "",
-            result.score,
-            result.exam_schedule.college.name.upper() if result.exam_schedule.college.name else "",
-            result.student.mobile_number.upper() if result.student.mobile_number else ""
-        ]
-        for col_index, value in enumerate(row, start=1):
-            ws.cell(row=idx+1, column=col_index, value=value)
-
-    # Prepare response
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    schedule = get_object_or_404(
+        ExamScheduleHistory.objects.select_related('college'),
+        pk=schedule_id
+    )
+    return export_response(
+        request.GET.get('format'),
+        "Results",
+        schedule,
+        RESULT_HEADERS,
+        result_rows(schedule),
     )
-    filename = f"Results_{schedule.college.name}_{schedule.quiz_date.date()}.xlsx"
-    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-    wb.save(response)
-    return response
@@ -3,6 +3,11 @@ ASGI config for college_test_portal project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Needed for the async student endpoints such as the quiz start event
+stream (tests.views.quiz_events), e.g.:
+
+    gunicorn college_test_portal.asgi:application -k uvicorn.workers.UvicornWorker
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
@@ -93,6 +93,59 @@ DATABASES = {
         'PORT': '3306',
     }
 }
+# Cache shared by all gunicorn workers on the host (question bank version,
+# exam state). Point CACHE_BACKEND at Redis/Memcached when running multi-host.
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': config('CACHE_LOCATION', default=os.path.join(BASE_DIR, 'cache')),
+        # One lease and principal per student plus fragments, pools and
+        # schedule state: Django's default of 300 entries culls live keys
+        # within minutes. Sized for a few thousand concurrent students;
+        # when full, a tenth of the entries is dropped. Anything that must
+        # not be lost (leases, the question bank version) also has a DB copy.
+        'OPTIONS': {
+            'MAX_ENTRIES': config('CACHE_MAX_ENTRIES', default=50000, cast=int),
+            'CULL_FREQUENCY': 10,
+        },
+    }
+}
+
+# One-browser rule: a student's login lease lasts this long without a heartbeat
+STUDENT_LEASE_SECONDS = 300
+
+# Spread exam-page loads at quiz start over this many seconds
+EXAM_ADMISSION_WINDOW_SECONDS = 30
+
+# Autosaved answers are written once a worker buffers this many, or after
+# this many seconds, whichever comes first
+AUTOSAVE_BATCH_SIZE = 200
+AUTOSAVE_FLUSH_SECONDS = 5
+
+# Submits later than this after the exam clock ends are refused; run
+# `manage.py sweep_expired_exams --loop 30` to grade those attempts
+EXAM_SUBMIT_GRACE_SECONDS = 60
+
+# Hall tickets are <prefix><number>; change the prefix for each exam cycle.
+# Workers reserve numbers in blocks, so tickets are unique but may have gaps.
+HALL_TICKET_PREFIX = config('HALL_TICKET_PREFIX', default='CH0125')
+HALL_TICKET_START = 1000
+HALL_TICKET_BLOCK_SIZE = 20
+
+# Exam page downloads the paper once and submits bit-packed answers
+EXAM_OFFLINE_MODE = config('EXAM_OFFLINE_MODE', default=False, cast=bool)
+
+# Serve login/quiz/start-exam/submit from the async views. Only useful when
+# running under asgi.py; the async variants are also mounted under async/.
+ASYNC_STUDENT_VIEWS = config('ASYNC_STUDENT_VIEWS', default=False, cast=bool)
+
+# Push quiz start to the countdown page over Server-Sent Events. Enable only
+# when served by asgi.py: under WSGI (gunicorn) a stream ties up a worker and
+# sends nothing, so the page polls the waiting room instead. A stream closes
+# after its first status event or QUIZ_EVENTS_MAX_SECONDS; the browser reconnects.
+QUIZ_EVENTS_ENABLED = config('QUIZ_EVENTS_ENABLED', default=False, cast=bool)
+QUIZ_EVENTS_MAX_SECONDS = 300
+
 # Trusted origins for CSRF protection (required for POST/admin forms)
 CSRF_TRUSTED_ORIGINS = [
     'http://182.76.176.205:5142',
@@ -152,11 +205,42 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = '/'
 
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
-EMAIL_HOST = "mail.btes.co.in"         # Outgoing SMTP server
-EMAIL_PORT = 465                        # SSL port
-EMAIL_USE_SSL = True                     # Use SSL for port 465
-EMAIL_USE_TLS = False                    # TLS only for port 587
+EMAIL_HOST = config("EMAIL_HOST", default="mail.btes.co.in")        # Outgoing SMTP server
+EMAIL_PORT = config("EMAIL_PORT", default=465, cast=int)              # SSL port
+EMAIL_USE_SSL = config("EMAIL_USE_SSL", default=True, cast=bool)      # Use SSL for port 465
+EMAIL_USE_TLS = config("EMAIL_USE_TLS", default=False, cast=bool)     # TLS only for port 587
 EMAIL_HOST_USER = config("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = config("EMAIL_HOST_PASSWORD")
 DEFAULT_FROM_EMAIL = EMAIL_HOST_USER
-SITE_URL = config("SITE_URL")
\ No newline at end of file
+SITE_URL = config("SITE_URL")
+
+# Mail is queued in admin_panel.EmailOutbox and sent by
+# `manage.py drain_outbox --loop 5` (deploy/systemd/scholarshipbtes-outbox.service);
+# failures are retried with exponential backoff (base seconds, doubling,
+# capped at an hour). A batch a worker claimed but didn't finish within
+# OUTBOX_CLAIM_SECONDS is picked up again.
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_BASE_SECONDS = 30
+OUTBOX_CLAIM_SECONDS = 600
+
+# Bulk notifications (quiz/registration links) run as mail jobs in the same
+# worker: recipients per batch and SMTP connections kept open while sending
+MAIL_JOB_BATCH_SIZE = 100
+MAIL_JOB_CONNECTIONS = 3
+# A recipient whose send fails is retried after the outbox backoff above and
+# marked failed after this many sends
+MAIL_JOB_MAX_ATTEMPTS = 3
+
+# Roster uploads are imported by `manage.py process_roster_imports --loop 5`
+# (deploy/systemd/scholarshipbtes-roster.service); the files are kept in
+# ROSTER_UPLOAD_ROOT/roster_imports/ until imported. They hold plain-text
+# passwords, so this must not be MEDIA_ROOT or anything else that is served
+ROSTER_UPLOAD_ROOT = config('ROSTER_UPLOAD_ROOT', default=os.path.join(BASE_DIR, 'private'))
+
+# Processes building workbooks for "Export All" / export_schedules
+# (None = one per CPU)
+EXPORT_WORKERS = config("EXPORT_WORKERS", default=None, cast=lambda v: int(v) if v else None)
+
+# Admin lists page by cursor; without a stored counter their totals are
+# counted up to this many rows and shown as "N+" beyond it
+KEYSET_COUNT_LIMIT = 10000
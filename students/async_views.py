@@ -0,0 +1,79 @@
+# students/async_views.py
+"""
+Async version of the student login view, served through asgi.py.
+
+Password hashing is CPU bound, so it runs on a worker thread outside the
+thread-sensitive executor and does not hold up other requests' ORM calls.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth.hashers import check_password
+from django.http import Http404
+from django.shortcuts import redirect, render
+
+from admin_panel.models import College
+from tests.models import Result
+
+from .leases import acquire_lease
+from .models import Student
+
+
+async def login_view(request):
+    college_id = request.GET.get('college_id')
+    college = None
+    if college_id:
+        try:
+            college = await College.objects.aget(id=college_id)
+        except (College.DoesNotExist, ValueError):
+            raise Http404("College not found.")
+
+    retry_url = request.path + (f"?college_id={college_id}" if college_id else "")
+
+    if request.method == "POST":
+        email = request.POST.get("email")
+        password = request.POST.get("password")
+
+        try:
+            student = await Student.objects.select_related('exam_schedule').aget(email=email)
+        except Student.DoesNotExist:
+            messages.error(request, "Invalid credentials")
+            return redirect(retry_url)
+
+        # 1️⃣ Check password
+        password_ok = await sync_to_async(check_password, thread_sensitive=False)(
+            password,
+            student.password
+        )
+        if not password_ok:
+            messages.error(request, "Invalid credentials")
+            return redirect(retry_url)
+
+        # 2️⃣ Check student belongs to this college
+        if college and student.exam_schedule.college_id != college.id:
+            messages.error(request, "This account does not belong to the selected college.")
+            return redirect(retry_url)
+
+        # 3️⃣ Check if student already attempted the quiz
+        already_attempted = await Result.objects.filter(
+            student_id=student.id,
+            exam_schedule_id=student.exam_schedule_id
+        ).aexists()
+
+        if already_attempted:
+            messages.warning(request, "You have already attempted this quiz.")
+            return redirect(retry_url)
+
+        # ✅ Prevent multiple logins
+        if not request.session.session_key:
+            await sync_to_async(request.session.save)()
+        if not await sync_to_async(acquire_lease)(student.id, request.session.session_key):
+            messages.error(request, "You are already logged in from another device/browser.")
+            return redirect(retry_url)
+
+        # 4️⃣ Log in. Writing a key loads an existing session from the
+        # database, which can't run on the event loop
+        await sync_to_async(request.session.__setitem__)('student_id', student.id)
+        next_url = request.GET.get('next', '/quiz/start_quiz/')
+        return redirect(next_url)
+
+    return render(request, "students/login.html", {"college": college})
@@ -0,0 +1,108 @@
+# students/hall_tickets.py
+"""
+Hall ticket numbers from a counter row per prefix.
+
+Each worker reserves HALL_TICKET_BLOCK_SIZE numbers at a time with one
+locked UPDATE of HallTicketSequence and hands them out from memory, so a
+registration doesn't need a MAX lookup and concurrent registrations can't
+pick the same number. Bulk operations reserve exactly the block they need
+with allocate_hall_tickets(). Numbers left in a block when a worker exits
+are skipped, so tickets are unique and increasing per worker but not
+gapless. Inside an outer transaction numbers are reserved one at a time,
+so a rollback can't leave a worker holding numbers the counter gave back.
+
+The prefix comes from HALL_TICKET_PREFIX (one per exam cycle). A new
+prefix starts at HALL_TICKET_START, or after the highest existing ticket
+with that prefix.
+"""
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+
+from .models import HallTicketSequence
+
+
+def hall_ticket_prefix():
+    return getattr(settings, 'HALL_TICKET_PREFIX', 'CH0125')
+
+
+def hall_ticket_start():
+    return getattr(settings, 'HALL_TICKET_START', 1000)
+
+
+def block_size():
+    return getattr(settings, 'HALL_TICKET_BLOCK_SIZE', 20)
+
+
+def _first_free_number(prefix):
+    # Only runs once per prefix, when its sequence row is created
+    from .models import Student
+
+    last_number = hall_ticket_start() - 1
+    for ticket in Student.objects.filter(hall_ticket__startswith=prefix).values_list('hall_ticket', flat=True):
+        try:
+            last_number = max(last_number, int(ticket[len(prefix):]))
+        except ValueError:
+            continue
+    return last_number + 1
+
+
+def reserve_block(prefix, size):
+    """Reserve `size` consecutive numbers for `prefix`; returns a range."""
+    with transaction.atomic():
+        try:
+            sequence = HallTicketSequence.objects.select_for_update().get(prefix=prefix)
+        except HallTicketSequence.DoesNotExist:
+            try:
+                with transaction.atomic():
+                    HallTicketSequence.objects.create(
+                        prefix=prefix,
+                        next_number=_first_free_number(prefix)
+                    )
+            except IntegrityError:
+                pass  # another worker created it first
+            sequence = HallTicketSequence.objects.select_for_update().get(prefix=prefix)
+
+        start = sequence.next_number
+        sequence.next_number = start + size
+        sequence.save(update_fields=['next_number'])
+    return range(start, start + size)
+
+
+def format_hall_ticket(prefix, number):
+    return f"{prefix}{number}"
+
+
+class HallTicketAllocator:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.blocks = {}  # prefix -> iterator over the reserved range
+
+    def allocate(self, prefix=None):
+        prefix = prefix or hall_ticket_prefix()
+        if connection.in_atomic_block:
+            # An outer rollback would undo the reservation but not our
+            # in-memory block, so don't keep spare numbers around
+            return format_hall_ticket(prefix, reserve_block(prefix, 1)[0])
+        with self.lock:
+            number = next(self.blocks.get(prefix, iter(())), None)
+            if number is None:
+                block = iter(reserve_block(prefix, block_size()))
+                number = next(block)
+                self.blocks[prefix] = block
+        return format_hall_ticket(prefix, number)
+
+
+allocator = HallTicketAllocator()
+
+
+def next_hall_ticket(prefix=None):
+    """One hall ticket from this worker's reserved block."""
+    return allocator.allocate(prefix)
+
+
+def allocate_hall_tickets(count, prefix=None):
+    """`count` hall tickets reserved in one go, for bulk imports."""
+    prefix = prefix or hall_ticket_prefix()
+    return [format_hall_ticket(prefix, number) for number in reserve_block(prefix, count)]
@@ -0,0 +1,120 @@
+# students/leases.py
+"""
+Single-device login leases.
+
+A student may be logged in from one browser at a time. The live lease
+(session key + expiry) sits in the shared cache and is extended by
+heartbeats, so enforcing the rule never touches the Student table. A
+StudentSessionLease row mirrors the lease for when the cache entry is
+lost; it is written on acquire and at most once per half lease period
+after that. A browser that crashes simply stops heartbeating and its
+lease expires.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import StudentSessionLease
+
+
+def lease_seconds():
+    return getattr(settings, 'STUDENT_LEASE_SECONDS', 300)
+
+
+def _cache_key(student_id):
+    return f'student_lease:{student_id}'
+
+
+def _store(student_id, session_key, now, db_expires_at=None):
+    expires_at = now + timedelta(seconds=lease_seconds())
+
+    # Only refresh the durable copy once it is half way to expiring
+    if db_expires_at is None or db_expires_at - now < timedelta(seconds=lease_seconds() / 2):
+        StudentSessionLease.objects.update_or_create(
+            student_id=student_id,
+            defaults={'session_key': session_key, 'expires_at': expires_at},
+        )
+        db_expires_at = expires_at
+
+    cache.set(
+        _cache_key(student_id),
+        {
+            'session_key': session_key,
+            'expires_at': expires_at,
+            'db_expires_at': db_expires_at,
+        },
+        timeout=lease_seconds(),
+    )
+
+
+def _current_lease(student_id):
+    lease = cache.get(_cache_key(student_id))
+    if lease is not None:
+        return lease
+
+    # Cache lost the entry (restart, eviction): fall back to the table
+    row = (
+        StudentSessionLease.objects
+        .filter(student_id=student_id)
+        .values('session_key', 'expires_at')
+        .first()
+    )
+    if row is None:
+        return None
+
+    lease = dict(row, db_expires_at=row['expires_at'])
+    remaining = (row['expires_at'] - timezone.now()).total_seconds()
+    if remaining > 0:
+        cache.set(_cache_key(student_id), lease, timeout=int(remaining) + 1)
+    return lease
+
+
+def acquire_lease(student_id, session_key):
+    """
+    Take the lease for this session. Returns False if another session
+    holds a lease that has not expired yet.
+    """
+    now = timezone.now()
+    lease = _current_lease(student_id)
+    if lease and lease['session_key'] != session_key and lease['expires_at'] > now:
+        return False
+    _store(student_id, session_key, now)
+    return True
+
+
+def heartbeat_lease(student_id, session_key):
+    """
+    Extend the lease held by this session, re-taking it if it lapsed and
+    nobody else claimed it. Returns False if another session owns it.
+    """
+    now = timezone.now()
+    lease = _current_lease(student_id)
+
+    if lease and lease['session_key'] != session_key:
+        if lease['expires_at'] > now:
+            return False
+        lease = None
+
+    # Skip the cache write while most of the lease is still left
+    if lease and lease['expires_at'] - now > timedelta(seconds=lease_seconds() / 2):
+        return True
+
+    _store(
+        student_id,
+        session_key,
+        now,
+        db_expires_at=lease['db_expires_at'] if lease else None,
+    )
+    return True
+
+
+def release_lease(student_id, session_key=None):
+    lease = cache.get(_cache_key(student_id))
+    if session_key is None or lease is None or lease['session_key'] == session_key:
+        cache.delete(_cache_key(student_id))
+    leases = StudentSessionLease.objects.filter(student_id=student_id)
+    if session_key is not None:
+        leases = leases.filter(session_key=session_key)
+    leases.delete()
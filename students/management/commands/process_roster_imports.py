@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from students.roster import run_next_roster_import
+
+
+class Command(BaseCommand):
+    help = 'Import the roster files uploaded in the admin panel'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--loop', type=float, metavar='SECONDS', default=0,
+            help='Keep running, polling every SECONDS when nothing is queued'
+        )
+
+    def handle(self, *args, **options):
+        imported = 0
+        while True:
+            roster_import = run_next_roster_import()
+            if roster_import is not None:
+                imported += 1
+                if options['loop']:
+                    self.stdout.write(f'{roster_import.file_name}: {roster_import.status}.')
+                continue
+
+            if not options['loop']:
+                break
+            close_old_connections()
+            time.sleep(options['loop'])
+
+        self.stdout.write(self.style.SUCCESS(f'{imported} roster imports processed.'))
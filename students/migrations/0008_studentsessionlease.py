@@ -0,0 +1,23 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:16
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0006_alter_student_mobile_number'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentSessionLease',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('session_key', models.CharField(max_length=40)),
+                ('expires_at', models.DateTimeField()),
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='session_lease', to='students.student')),
+            ],
+        ),
+    ]
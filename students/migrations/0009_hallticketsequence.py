@@ -0,0 +1,21 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0008_studentsessionlease'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HallTicketSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('prefix', models.CharField(max_length=12, unique=True)),
+                ('next_number', models.PositiveIntegerField()),
+            ],
+        ),
+    ]
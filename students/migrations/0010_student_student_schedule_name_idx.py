@@ -0,0 +1,17 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0009_hallticketsequence'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['exam_schedule', 'name', 'id'], name='student_schedule_name_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.23 on 2026-10-18 13:05
+
+# Catches the migrations up with the model: Student.mobile_number got its
+# length and digits validators without a migration. Validators aren't part
+# of the schema, so this changes nothing in the database.
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0011_rosterimport'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='student',
+            name='mobile_number',
+            field=models.CharField(max_length=10, validators=[django.core.validators.MinLengthValidator(10), django.core.validators.RegexValidator('^\\d{10}$', 'Mobile number must be exactly 10 digits.')]),
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:37
+
+import os
+import shutil
+
+from django.conf import settings
+from django.db import migrations, models
+import students.models
+
+
+def move_pending_files(apps, schema_editor):
+    """Move rosters not imported yet out of MEDIA_ROOT into the private storage."""
+    RosterImport = apps.get_model('students', 'RosterImport')
+    storage = students.models.roster_storage()
+    for name in RosterImport.objects.exclude(file='').values_list('file', flat=True):
+        public_path = os.path.join(settings.MEDIA_ROOT, name)
+        if os.path.exists(public_path):
+            os.makedirs(os.path.dirname(storage.path(name)), exist_ok=True)
+            shutil.move(public_path, storage.path(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0012_student_mobile_number_validators'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='rosterimport',
+            name='file',
+            field=models.FileField(blank=True, storage=students.models.roster_storage, upload_to='roster_imports/'),
+        ),
+        migrations.RunPython(move_pending_files, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,9 @@
 from django.db import models
 
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
 from django.core.validators import MinLengthValidator, RegexValidator
 from django.db import models
 
@@ -36,21 +40,80 @@ class Student(models.Model):
 
     REQUIRED_FIELDS = ['name', 'email', 'password', 'stream', 'exam_schedule', 'mobile_number']
 
+    class Meta:
+        indexes = [
+            # Registrations page cursor: (name, id) within a schedule
+            models.Index(fields=['exam_schedule', 'name', 'id'], name='student_schedule_name_idx'),
+        ]
+
     def __str__(self):
         return f"{self.name} ({self.email})"
 
     def save(self, *args, **kwargs):
         if not self.hall_ticket:
-            prefix = "CH0125"
-            start_number = 1000
-            last_student = Student.objects.filter(hall_ticket__startswith=prefix).order_by('-id').first()
-            if last_student and last_student.hall_ticket:
-                try:
-                    last_number = int(last_student.hall_ticket.replace(prefix, ''))
-                except ValueError:
-                    last_number = start_number
-                new_number = last_number + 1
-            else:
-                new_number = start_number
-            self.hall_ticket = f"{prefix}{new_number}"
+            from .hall_tickets import next_hall_ticket
+            self.hall_ticket = next_hall_ticket()
         super().save(*args, **kwargs)
+
+
+class HallTicketSequence(models.Model):
+    """Next unreserved hall ticket number for a prefix (see students.hall_tickets)."""
+    prefix = models.CharField(max_length=12, unique=True)
+    next_number = models.PositiveIntegerField()
+
+    def __str__(self):
+        return f"{self.prefix}: next {self.next_number}"
+
+
+class StudentSessionLease(models.Model):
+    """
+    Durable copy of the single-device lease. The cache holds the live lease;
+    this row is only consulted when the cache entry is missing.
+    """
+    student = models.OneToOneField(Student, on_delete=models.CASCADE, related_name='session_lease')
+    session_key = models.CharField(max_length=40)
+    expires_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.student_id} until {self.expires_at}"
+
+
+def roster_storage():
+    # Outside MEDIA_ROOT, so the uploads are never served
+    return FileSystemStorage(
+        location=getattr(settings, 'ROSTER_UPLOAD_ROOT', os.path.join(settings.BASE_DIR, 'private'))
+    )
+
+
+class RosterImport(models.Model):
+    """
+    An uploaded roster waiting for the process_roster_imports worker (see
+    students.roster). The file holds the students' passwords in plain
+    text, so it is kept in a private storage and deleted once imported.
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, 'Queued'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    exam_schedule = models.ForeignKey(
+        'admin_panel.ExamScheduleHistory', on_delete=models.CASCADE, related_name='roster_imports'
+    )
+    file = models.FileField(upload_to='roster_imports/', storage=roster_storage, blank=True)
+    file_name = models.CharField(max_length=255)                # as uploaded
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    created_count = models.PositiveIntegerField(default=0)
+    row_errors = models.JSONField(default=list, blank=True)     # [{'row', 'email', 'message'}]
+    error = models.TextField(blank=True)                        # the file as a whole failed
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.file_name} -> {self.exam_schedule_id} ({self.status})"
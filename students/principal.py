@@ -0,0 +1,84 @@
+# students/principal.py
+"""
+Authenticated student context kept in the session.
+
+The exam views only need a handful of ids and names, so they are loaded
+once with select_related and cached in the session. A per-student
+version in the shared cache is bumped whenever the Student row changes,
+which makes every session holding an older copy reload it.
+"""
+import time
+from collections import namedtuple
+
+from django.core.cache import cache
+from django.utils.dateparse import parse_datetime
+
+from .models import Student
+
+PRINCIPAL_SESSION_KEY = 'student_principal'
+
+StudentPrincipal = namedtuple(
+    'StudentPrincipal',
+    [
+        'id',
+        'name',
+        'email',
+        'hall_ticket',
+        'exam_schedule_id',
+        'quiz_date',
+        'college_id',
+        'college_name',
+        'version',
+    ],
+)
+
+
+def _version_key(student_id):
+    return f'student_principal_version:{student_id}'
+
+
+def get_principal_version(student_id):
+    return cache.get(_version_key(student_id), 0)
+
+
+def bump_principal_version(student_id):
+    cache.set(_version_key(student_id), time.time_ns(), timeout=None)
+
+
+def load_principal(student_id):
+    """Build the principal from the database. Raises Student.DoesNotExist."""
+    version = get_principal_version(student_id)
+    student = Student.objects.select_related('exam_schedule__college').get(id=student_id)
+    history = student.exam_schedule
+    return StudentPrincipal(
+        id=student.id,
+        name=student.name,
+        email=student.email,
+        hall_ticket=student.hall_ticket,
+        exam_schedule_id=history.id if history else None,
+        quiz_date=history.quiz_date if history else None,
+        college_id=history.college_id if history else None,
+        college_name=history.college.name if history else None,
+        version=version,
+    )
+
+
+def get_principal(session, student_id):
+    """
+    Return the cached principal for the logged in student, reloading it
+    when the session copy is missing, belongs to someone else or is stale.
+    """
+    data = session.get(PRINCIPAL_SESSION_KEY)
+    if (
+        data and
+        data['id'] == student_id and
+        data['version'] == get_principal_version(student_id)
+    ):
+        return StudentPrincipal(**dict(data, quiz_date=parse_datetime(data['quiz_date'] or '')))
+
+    principal = load_principal(student_id)
+    session[PRINCIPAL_SESSION_KEY] = dict(
+        principal._asdict(),
+        quiz_date=principal.quiz_date.isoformat() if principal.quiz_date else None,
+    )
+    return principal
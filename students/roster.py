@@ -0,0 +1,256 @@
+# students/roster.py
+"""
+Bulk student import from a college roster (XLSX or CSV).
+
+The admin upload only stores the file as a RosterImport with
+queue_roster_import(); the process_roster_imports worker runs it with
+run_roster_import() and the admin page shows its progress and report.
+
+Rows are streamed (openpyxl read-only mode / csv reader) and validated
+with StudentImportForm. Email clashes are checked with one query per
+batch and every password is hashed with its own salt in a process pool.
+Hall tickets are reserved as one block and students inserted with
+bulk_create. Rows that fail come back in the report with their row
+number, so the file can be fixed and re-uploaded; rows already imported
+are then reported as duplicates.
+"""
+import csv
+import io
+import logging
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from importlib import import_module
+
+from django.contrib.auth.hashers import get_hasher
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from admin_panel.schedule_counters import count_registrations
+
+from .forms import StudentImportForm
+from .hall_tickets import allocate_hall_tickets
+from .models import RosterImport, Student
+
+logger = logging.getLogger(__name__)
+
+ROSTER_COLUMNS = ['name', 'email', 'password', 'mobile_number', 'stream']
+ROSTER_EXTENSIONS = ['.xlsx', '.csv']
+HASH_CHUNK_SIZE = 50  # PBKDF2 is slow: small chunks keep every worker busy
+
+RowError = namedtuple('RowError', ['row', 'email', 'message'])
+ImportReport = namedtuple('ImportReport', ['created', 'errors'])
+
+
+class RosterError(Exception):
+    """The file as a whole can't be read (bad type or missing columns)."""
+
+
+def _column_name(header):
+    return str(header or '').strip().lower().replace(' ', '_')
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Excel stores mobile numbers as numbers
+    return str(value).strip()
+
+
+def read_roster(file):
+    """Yield (row_number, {column: value}) from an uploaded XLSX or CSV."""
+    ext = os.path.splitext(file.name)[1].lower()
+    if ext == '.xlsx':
+        import openpyxl
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+        rows = workbook.active.iter_rows(values_only=True)
+    elif ext == '.csv':
+        rows = csv.reader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''))
+    else:
+        raise RosterError("Invalid file type. Only .xlsx or .csv files are allowed.")
+
+    try:
+        header = [_column_name(h) for h in next(rows)]
+    except StopIteration:
+        raise RosterError("The file is empty.")
+
+    missing = [column for column in ROSTER_COLUMNS if column not in header]
+    if missing:
+        raise RosterError(f"Missing columns: {', '.join(missing)}.")
+
+    for row_number, row in enumerate(rows, start=2):
+        values = dict(zip(header, (_cell(v) for v in row)))
+        if not any(values.get(column) for column in ROSTER_COLUMNS):
+            continue  # blank line
+        yield row_number, {column: values.get(column, '') for column in ROSTER_COLUMNS}
+
+
+def _hash_chunk(hasher_path, passwords):
+    # Runs in a worker process: uses the hasher class directly so it needs
+    # no Django settings
+    module, name = hasher_path.rsplit('.', 1)
+    hasher = getattr(import_module(module), name)()
+    return [hasher.encode(password, hasher.salt()) for password in passwords]
+
+
+def hash_passwords(passwords, max_workers=None):
+    """make_password() for many passwords, spread over a process pool."""
+    passwords = list(passwords)
+    hasher = get_hasher('default')
+    hasher_path = f'{type(hasher).__module__}.{type(hasher).__name__}'
+    chunks = [
+        passwords[i:i + HASH_CHUNK_SIZE]
+        for i in range(0, len(passwords), HASH_CHUNK_SIZE)
+    ]
+    if len(chunks) <= 1:
+        return _hash_chunk(hasher_path, passwords) if passwords else []
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return [
+            h
+            for chunk in executor.map(_hash_chunk, [hasher_path] * len(chunks), chunks)
+            for h in chunk
+        ]
+
+
+def _validate(rows, errors):
+    """StudentImportForm on each row; returns [(row_number, cleaned_data)]."""
+    valid = []
+    seen = set()
+    for row_number, data in rows:
+        form = StudentImportForm(data)
+        if not form.is_valid():
+            message = '; '.join(
+                f"{field}: {' '.join(field_errors)}"
+                for field, field_errors in form.errors.items()
+            )
+            errors.append(RowError(row_number, data.get('email', ''), message))
+            continue
+
+        email = form.cleaned_data['email'].lower()
+        if email in seen:
+            errors.append(RowError(row_number, email, "email: Appears more than once in the file."))
+            continue
+        seen.add(email)
+        valid.append((row_number, form.cleaned_data))
+    return valid
+
+
+def _drop_registered(valid, errors, batch_size):
+    """Remove rows whose email is already registered (one query per batch)."""
+    registered = set()
+    for i in range(0, len(valid), batch_size):
+        emails = [data['email'] for _, data in valid[i:i + batch_size]]
+        registered.update(
+            email.lower()
+            for email in Student.objects.filter(email__in=emails).values_list('email', flat=True)
+        )
+    kept = []
+    for row_number, data in valid:
+        if data['email'].lower() in registered:
+            errors.append(RowError(row_number, data['email'], "email: Already registered."))
+        else:
+            kept.append((row_number, data))
+    return kept
+
+
+def import_roster(file, exam_schedule, batch_size=1000):
+    """Import a roster into exam_schedule; returns an ImportReport."""
+    errors = []
+    valid = _validate(read_roster(file), errors)
+    valid = _drop_registered(valid, errors, batch_size)
+
+    passwords = hash_passwords([data['password'] for _, data in valid])
+    hall_tickets = allocate_hall_tickets(len(valid)) if valid else []
+
+    students = [
+        (row_number, Student(
+            name=data['name'],
+            email=data['email'],
+            password=password,
+            mobile_number=data['mobile_number'],
+            stream=data['stream'],
+            exam_schedule=exam_schedule,
+            hall_ticket=hall_ticket,
+            is_active=True,
+        ))
+        for (row_number, data), password, hall_ticket in zip(valid, passwords, hall_tickets)
+    ]
+
+    created = 0
+    for i in range(0, len(students), batch_size):
+        batch = students[i:i + batch_size]
+        try:
+            with transaction.atomic():
+                Student.objects.bulk_create([student for _, student in batch])
+                count_registrations(exam_schedule.id, len(batch))
+            created += len(batch)
+        except IntegrityError:
+            # Someone registered one of these emails meanwhile: retry the
+            # batch row by row to find it
+            for row_number, student in batch:
+                try:
+                    with transaction.atomic():
+                        student.save(force_insert=True)
+                        count_registrations(exam_schedule.id)
+                    created += 1
+                except IntegrityError:
+                    errors.append(RowError(row_number, student.email, "email: Already registered."))
+
+    errors.sort()
+    return ImportReport(created, errors)
+
+
+def queue_roster_import(file, exam_schedule):
+    """Store an uploaded roster for the worker; returns the RosterImport."""
+    return RosterImport.objects.create(
+        exam_schedule=exam_schedule,
+        file=file,
+        file_name=os.path.basename(file.name),
+    )
+
+
+def run_roster_import(roster_import):
+    """Import a queued roster and record the outcome on it. Returns False if already taken."""
+    claimed = RosterImport.objects.filter(
+        pk=roster_import.pk, status=RosterImport.QUEUED
+    ).update(status=RosterImport.RUNNING, started_at=timezone.now())
+    if not claimed:
+        return False  # another worker got it
+
+    try:
+        with roster_import.file.open('rb') as file:
+            report = import_roster(file, roster_import.exam_schedule)
+    except RosterError as e:
+        roster_import.status = RosterImport.FAILED
+        roster_import.error = str(e)
+    except Exception as e:
+        logger.exception("Roster import %s failed", roster_import.id)
+        roster_import.status = RosterImport.FAILED
+        roster_import.error = f"Import failed: {e}"[:1000]
+    else:
+        roster_import.status = RosterImport.DONE
+        roster_import.created_count = report.created
+        roster_import.row_errors = [error._asdict() for error in report.errors]
+
+    # Plain-text passwords: keep the file no longer than needed
+    roster_import.file.delete(save=False)
+    roster_import.finished_at = timezone.now()
+    roster_import.save(update_fields=[
+        'file', 'status', 'created_count', 'row_errors', 'error', 'finished_at'
+    ])
+    return True
+
+
+def run_next_roster_import():
+    """Run the oldest queued import, if any. Returns it, or None."""
+    roster_import = (
+        RosterImport.objects
+        .filter(status=RosterImport.QUEUED)
+        .select_related('exam_schedule')
+        .order_by('id')
+        .first()
+    )
+    if roster_import is not None:
+        run_roster_import(roster_import)
+    return roster_import
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Student
+from .principal import bump_principal_version
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_student_principal(sender, instance, **kwargs):
+    bump_principal_version(instance.pk)
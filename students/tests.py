@@ -1,3 +1,158 @@
-from django.test import TestCase
+import threading
+from importlib import import_module
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings, skipUnlessDBFeature
+from django.urls import reverse
+from django.utils import timezone
+
+from admin_panel.models import College, ExamScheduleHistory
+from admin_panel.schedule_counters import count_registrations
+
+from .hall_tickets import HallTicketAllocator, allocator, block_size, hall_ticket_prefix
+from .models import HallTicketSequence, Student
+
+SessionStore = import_module(settings.SESSION_ENGINE).SessionStore
+
+
+class AsyncLoginTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        college = College.objects.create(name='Async login college')
+        schedule = ExamScheduleHistory.objects.create(college=college, quiz_date=timezone.now())
+        cls.student = Student.objects.create(
+            name='Async Student',
+            email='async@example.com',
+            password=make_password('Passw0rd!'),
+            exam_schedule=schedule,
+            mobile_number='9000000000',
+            is_active=True,
+        )
+
+    def setUp(self):
+        cache.clear()  # login leases from other tests
+
+    def login(self):
+        return self.async_client.post(
+            reverse('async_login'), {'email': 'async@example.com', 'password': 'Passw0rd!'}
+        )
+
+    async def test_login_with_existing_session(self):
+        # A returning browser: its session is in the database, not yet loaded
+        session = SessionStore()
+        session['seen'] = True
+        await sync_to_async(session.save)()
+        self.async_client.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+        response = await self.login()
+
+        self.assertRedirects(response, '/quiz/start_quiz/', fetch_redirect_response=False)
+        stored = await sync_to_async(SessionStore(session.session_key).load)()
+        self.assertEqual(stored['student_id'], self.student.id)
+        self.assertTrue(stored['seen'])
+
+    async def test_login_with_new_session(self):
+        response = await self.login()
+
+        self.assertRedirects(response, '/quiz/start_quiz/', fetch_redirect_response=False)
+        session_key = response.cookies[settings.SESSION_COOKIE_NAME].value
+        stored = await sync_to_async(SessionStore(session_key).load)()
+        self.assertEqual(stored['student_id'], self.student.id)
+
+
+class VerifyEmailTests(TransactionTestCase):
+    # Not TestCase: its wrapping transaction would send the allocator down
+    # the one-number-at-a-time path that verify_email must avoid
+
+    def setUp(self):
+        allocator.blocks.clear()
+        college = College.objects.create(name='Registration college')
+        self.schedule = ExamScheduleHistory.objects.create(college=college, quiz_date=timezone.now())
+
+    def verify(self, email):
+        session = self.client.session
+        session['email_otp'] = '123456'
+        session['pending_registration'] = {
+            'name': 'New Student',
+            'email': email,
+            'password': make_password('Passw0rd!'),
+            'stream': 'MCA',
+            'mobile_number': '9000000000',
+            'exam_schedule_id': self.schedule.id,
+        }
+        session.save()
+        return self.client.post(reverse('verify_email'), {'otp': '123456'})
+
+    def test_registration_uses_a_reserved_block_and_counts(self):
+        self.assertEqual(self.verify('first@example.com').status_code, 200)
+        self.assertEqual(self.verify('second@example.com').status_code, 200)
+
+        tickets = sorted(Student.objects.values_list('hall_ticket', flat=True))
+        self.assertEqual(len(set(tickets)), 2)
+        # One block reserved for both registrations, not a locked UPDATE each
+        sequence = HallTicketSequence.objects.get(prefix=hall_ticket_prefix())
+        first = int(tickets[0][len(hall_ticket_prefix()):])
+        self.assertEqual(sequence.next_number, first + block_size())
+
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.registration_count, 2)
+
+
+# SQLite has no SELECT ... FOR UPDATE and takes one writer at a time
+@skipUnlessDBFeature('has_select_for_update', 'test_db_allows_multiple_connections')
+@override_settings(HALL_TICKET_BLOCK_SIZE=5)
+class ConcurrentRegistrationTests(TransactionTestCase):
+    WORKERS = 8
+    REGISTRATIONS = 25
+
+    def setUp(self):
+        college = College.objects.create(name='Hall ticket college')
+        self.schedule = ExamScheduleHistory.objects.create(college=college, quiz_date=timezone.now())
+
+    def register(self, worker, start, errors):
+        # Its own allocator, like a gunicorn worker process; same steps as verify_email
+        worker_allocator = HallTicketAllocator()
+        try:
+            start.wait()
+            for i in range(self.REGISTRATIONS):
+                hall_ticket = worker_allocator.allocate()
+                with transaction.atomic():
+                    Student.objects.create(
+                        name=f'Worker {worker} student {i}',
+                        email=f'w{worker}s{i}@example.com',
+                        password='!',
+                        exam_schedule=self.schedule,
+                        stream='BTECH',
+                        mobile_number='9000000000',
+                        hall_ticket=hall_ticket,
+                        is_active=True,
+                    )
+                    count_registrations(self.schedule.id)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    def test_hall_tickets_are_unique_across_workers(self):
+        start = threading.Barrier(self.WORKERS)
+        errors = []
+        threads = [
+            threading.Thread(target=self.register, args=(worker, start, errors))
+            for worker in range(self.WORKERS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        expected = self.WORKERS * self.REGISTRATIONS
+        tickets = list(Student.objects.values_list('hall_ticket', flat=True))
+        self.assertEqual(len(tickets), expected)
+        self.assertEqual(len(set(tickets)), expected)
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.registration_count, expected)
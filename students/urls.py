@@ -1,9 +1,15 @@
 # students/urls.py
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import views, async_views
 
 urlpatterns = [
     path("register/", views.student_register, name="register"),
     path("verify-email/", views.verify_email, name="verify_email"),
-    path("login/", views.login_view, name="login")
+    path(
+        "login/",
+        async_views.login_view if settings.ASYNC_STUDENT_VIEWS else views.login_view,
+        name="login"
+    ),
+    path("async/login/", async_views.login_view, name="async_login"),
 ]
@@ -4,9 +4,14 @@ from django.core.mail import send_mail
 from django.conf import settings
 from django.contrib.auth.hashers import make_password, check_password
 from django.contrib.sessions.models import Session
+from django.db import transaction
 from .forms import StudentRegistrationForm
 from .models import Student
+from .hall_tickets import next_hall_ticket
+from .leases import acquire_lease
 from admin_panel.models import College, ExamSchedule, ExamScheduleHistory
+from admin_panel.outbox import enqueue_email
+from admin_panel.schedule_counters import count_registrations
 from tests.models import Result
 import random, string
 from django.template.loader import render_to_string
@@ -64,29 +69,19 @@ def student_register(request):
             request.session['email_otp'] = otp
 
             
+            # ✅ Queued: the drain_outbox worker talks to the mail server
             try:
-                html_message = render_to_string(
-                    "students/emails/otp_email.html",
-                    {
-                        "name": form.cleaned_data["name"],
-                        "otp": otp,
-                    }
-                )
-
-                email_message = EmailMultiAlternatives(
+                enqueue_email(
                     subject="Verify Your Email – BTES Scholarship Test Registration",
-                    body=f"Your OTP is {otp}",  # Plain text fallback
-                    from_email=settings.DEFAULT_FROM_EMAIL,
                     to=[email],
+                    body=f"Your OTP is {otp}",  # Plain text fallback
+                    html_template="students/emails/otp_email.html",
+                    context={
+                        "name": form.cleaned_data["name"],
+                        "otp": otp,
+                    },
                 )
 
-                email_message.attach_alternative(
-                    html_message,
-                    "text/html"
-                )
-
-                email_message.send()
-
                 messages.info(request, f"An OTP has been sent to {email}.{otp} Please verify to complete registration.")
             except Exception as e:
                 messages.error(request, f"❌ Failed to send OTP to {email}. Please try again later.")
@@ -118,15 +113,22 @@ def verify_email(request):
             # ✅ Create the student only after OTP verification
             exam_schedule = ExamScheduleHistory.objects.get(id=pending_data['exam_schedule_id'])
 
-            student = Student.objects.create(
-                name=pending_data['name'],
-                email=pending_data['email'],
-                password=pending_data['password'],
-                exam_schedule=exam_schedule,
-                stream=pending_data['stream'],
-                mobile_number=pending_data['mobile_number'],
-                is_active=True
-            )
+            # Hall ticket first, outside the transaction: it comes from this
+            # worker's reserved block instead of holding the sequence row
+            # lock until commit
+            hall_ticket = next_hall_ticket()
+            with transaction.atomic():
+                student = Student.objects.create(
+                    name=pending_data['name'],
+                    email=pending_data['email'],
+                    password=pending_data['password'],
+                    exam_schedule=exam_schedule,
+                    stream=pending_data['stream'],
+                    mobile_number=pending_data['mobile_number'],
+                    hall_ticket=hall_ticket,
+                    is_active=True
+                )
+                count_registrations(exam_schedule.id)
 
             # Cleanup session data
             for key in ['email_otp', 'pending_registration']:
@@ -170,11 +172,6 @@ def login_view(request):
                 messages.error(request, "This account does not belong to the selected college.")
                 return redirect(request.path + f"?college_id={college_id}")
 
-            # ✅ Prevent multiple logins
-            if student.current_session:
-                messages.error(request, "You are already logged in from another device/browser.")
-                return redirect(request.path + (f"?college_id={college_id}" if college_id else ""))
-
             # 3️⃣ Check if student already attempted the quiz
             already_attempted = Result.objects.filter(
                 student_id=student.id,
@@ -185,10 +182,15 @@ def login_view(request):
                 messages.warning(request, "You have already attempted this quiz.")
                 return redirect(request.path + (f"?college_id={college_id}" if college_id else ""))
 
+            # ✅ Prevent multiple logins
+            if not request.session.session_key:
+                request.session.save()
+            if not acquire_lease(student.id, request.session.session_key):
+                messages.error(request, "You are already logged in from another device/browser.")
+                return redirect(request.path + (f"?college_id={college_id}" if college_id else ""))
+
             # 4️⃣ Log in
             request.session['student_id'] = student.id
-            student.current_session = request.session.session_key
-            student.save()
             next_url = request.GET.get('next', '/quiz/start_quiz/')
             return redirect(next_url)
 
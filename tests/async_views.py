@@ -0,0 +1,245 @@
+# tests/async_views.py
+"""
+Async versions of the student exam endpoints, served through asgi.py.
+
+They share session keys, templates and helpers with tests.views, so a
+student can move between the sync and async implementations from one
+request to the next. Queries issued here use the async ORM; helpers that
+are shared with the sync views run through sync_to_async.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth import logout as auth_logout
+from django.db import IntegrityError
+from django.http import Http404, JsonResponse
+from django.shortcuts import redirect, render
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+
+from admin_panel.schedule_state import get_schedule_state
+from students.leases import heartbeat_lease, release_lease
+from students.models import Student
+from students.principal import get_principal
+
+from .autosave import saved_answers, seal_answers
+from .exam_clock import deadline_passed, exam_end_time, start_attempt
+from .compact import COMPACT_CONTENT_TYPE, PaperChanged, score_compact_submission
+from .fragments import render_paper
+from .models import Result
+from .papers import QUESTIONS_PER_CATEGORY, NotEnoughQuestions, build_paper
+from .question_pool import get_question_pool
+from .views import (
+    EXAM_DURATION_MINUTES,
+    LATE_SUBMIT_MESSAGE,
+    NOT_STARTED_MESSAGE,
+    answers_on_paper,
+    create_result,
+    grade_answers,
+    parse_submitted_answers,
+    schedule_gate,
+)
+
+
+def async_student_login_required(view_func):
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        # Loads the session once; later reads in the view hit the cached dict
+        student_id = await sync_to_async(request.session.get)('student_id')
+        if not student_id:
+            return redirect('/login/')  # redirect if not logged in
+
+        try:
+            request.student = await sync_to_async(get_principal)(request.session, student_id)
+        except Student.DoesNotExist:
+            raise Http404("Student not found.")
+
+        if not await sync_to_async(heartbeat_lease)(student_id, request.session.session_key):
+            await sync_to_async(request.session.flush)()
+            messages.error(request, "You are already logged in from another device/browser.")
+            return redirect('/login/')
+        return await view_func(request, *args, **kwargs)
+    return wrapper
+
+
+def async_no_cache(view_func):
+    # django.views.decorators.cache.cache_control only learns async views in Django 5.0
+    @wraps(view_func)
+    async def wrapper(request, *args, **kwargs):
+        response = await view_func(request, *args, **kwargs)
+        patch_cache_control(response, no_cache=True, must_revalidate=True, no_store=True)
+        return response
+    return wrapper
+
+
+@async_student_login_required
+@async_no_cache
+async def quiz_view(request):
+    student = request.student
+    now = timezone.now()
+    guidelines_accepted = request.session.get(
+        "guidelines_accepted",
+        False
+    )
+
+    if not guidelines_accepted:
+        request.session.pop("exam_end_time", None)
+
+    schedule = await sync_to_async(get_schedule_state)(student.college_id)
+    gate = schedule_gate(
+        student,
+        schedule,
+        now,
+        request.GET.get('admission')
+    )
+    if gate is not None:
+        return render(request, 'tests/message.html', gate)
+
+    # Prevent multiple attempts
+    if await Result.objects.filter(student_id=student.id).aexists():
+        return render(
+            request,
+            'tests/message.html',
+            {'message': 'You have already attempted the test.'}
+        )
+
+    if settings.EXAM_OFFLINE_MODE:
+        return render(
+            request,
+            "tests/exam.html",
+            {
+                "student": student,
+                "questions": [],
+                "offline_mode": True,
+                "total_questions": 2 * QUESTIONS_PER_CATEGORY,
+                "duration": EXAM_DURATION_MINUTES,
+                "exam_end_time": request.session.get("exam_end_time", ""),
+                "schedule": schedule,
+                "guidelines_accepted": guidelines_accepted,
+                "saved_answers": {}
+            }
+        )
+
+    pool = await sync_to_async(get_question_pool)()
+    try:
+        selected_questions = await sync_to_async(build_paper)(
+            student,
+            pool,
+            request.session.get('paper_version')
+        )
+    except NotEnoughQuestions as e:
+        return render(
+            request,
+            'tests/message.html',
+            {'message': str(e)}
+        )
+
+    saved = {}
+    if guidelines_accepted:
+        saved = {
+            str(qid): option
+            for qid, option in (
+                await sync_to_async(saved_answers)(student.id, student.exam_schedule_id)
+            ).items()
+        }
+
+    return render(
+        request,
+        "tests/exam.html",
+        {
+            "student": student,
+            "questions": render_paper(selected_questions, pool.version),
+            "duration": EXAM_DURATION_MINUTES,
+            "exam_end_time": request.session.get(
+                "exam_end_time",
+                ""
+            ),
+            "schedule": schedule,
+            "guidelines_accepted": guidelines_accepted,
+            "saved_answers": saved if guidelines_accepted else {}
+        }
+    )
+
+
+@async_student_login_required
+async def start_exam(request):
+    pool = await sync_to_async(get_question_pool)()
+    ends_at, paper_version = await sync_to_async(start_attempt)(
+        request.student,
+        pool
+    )
+    request.session['exam_end_time'] = ends_at.isoformat()
+
+    request.session['guidelines_accepted'] = True
+    request.session['paper_version'] = paper_version
+
+    return JsonResponse({
+        "success": True
+    })
+
+
+@async_student_login_required
+@async_no_cache
+async def submit_quiz(request):
+    if request.method != "POST":
+        return redirect("exam")  # fallback
+
+    student = request.student
+
+    ends_at = await sync_to_async(exam_end_time)(request.session, student)
+    if ends_at is None:
+        return render(request, "tests/message.html", {"message": NOT_STARTED_MESSAGE})
+    if deadline_passed(ends_at):
+        await sync_to_async(release_lease)(student.id, request.session.session_key)
+        await sync_to_async(auth_logout)(request)
+        await sync_to_async(request.session.flush)()
+        return render(request, "tests/message.html", {"message": LATE_SUBMIT_MESSAGE})
+
+    pool = await sync_to_async(get_question_pool)()
+
+    if request.content_type == COMPACT_CONTENT_TYPE:
+        try:
+            score = await sync_to_async(score_compact_submission)(
+                student,
+                request.body,
+                pool,
+                request.session.get('paper_version')
+            )
+        except PaperChanged:
+            return JsonResponse({"success": False, "error": "paper_changed"}, status=409)
+        except ValueError:
+            return JsonResponse({"success": False, "error": "Invalid payload."}, status=400)
+    else:
+        answers = await sync_to_async(seal_answers)(
+            student.id,
+            student.exam_schedule_id,
+            parse_submitted_answers(request.POST)
+        )
+        answers = await sync_to_async(answers_on_paper)(
+            student,
+            answers,
+            pool,
+            request.session.get('paper_version')
+        )
+        score = await sync_to_async(grade_answers)(answers, pool)
+
+    if student.exam_schedule_id is None:
+        return render(request, "tests/message.html", {
+            "message": "No active exam schedule found for your college."
+        })
+
+    # ✅ unique (student, exam_schedule) makes double submits a no-op
+    try:
+        result = await sync_to_async(create_result)(student, score, request.session.session_key)
+    except IntegrityError:
+        return render(request, "tests/message.html", {"message": "You have already attempted the test."})
+
+    # ✅ Clear session info (logout); create_result released the lease
+    await sync_to_async(auth_logout)(request)
+    await sync_to_async(request.session.flush)()
+
+    return render(request, "tests/submitted.html", {
+        "result": result
+    })
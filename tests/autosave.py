@@ -0,0 +1,163 @@
+# tests/autosave.py
+"""
+Batched persistence for exam answer autosaves.
+
+The exam page posts small answer deltas as the student works. Each worker
+keeps them in an AnswerBuffer and writes them to ExamAnswer with one
+bulk upsert once the buffer holds AUTOSAVE_BATCH_SIZE answers or its oldest
+entry is AUTOSAVE_FLUSH_SECONDS old (a timer covers idle workers), so
+writes are spread over the whole exam instead of arriving together at the
+deadline.
+
+At submit the worker handling the request flushes that student's pending
+deltas and grades from the persisted rows overlaid with the posted form.
+Deltas still buffered on another worker are covered by the form, which
+always carries the full answer set.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+
+from .models import ExamAnswer
+
+logger = logging.getLogger(__name__)
+
+
+def batch_size():
+    return getattr(settings, 'AUTOSAVE_BATCH_SIZE', 200)
+
+
+def flush_seconds():
+    return getattr(settings, 'AUTOSAVE_FLUSH_SECONDS', 5)
+
+
+class AnswerBuffer:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = {}   # (student_id, exam_schedule_id, question_id) -> option
+        self.oldest = None  # monotonic time of the oldest pending delta
+
+    def add(self, student_id, exam_schedule_id, answers):
+        with self.lock:
+            for question_id, option in answers.items():
+                self.pending[(student_id, exam_schedule_id, question_id)] = option
+            if self.oldest is None:
+                self.oldest = time.monotonic()
+                self._schedule_flush()
+            due = (
+                len(self.pending) >= batch_size() or
+                time.monotonic() - self.oldest >= flush_seconds()
+            )
+        if due:
+            self.flush()
+
+    def _schedule_flush(self):
+        # Idle workers still write their last deltas in time for the sweeper
+        timer = threading.Timer(flush_seconds(), self._timed_flush)
+        timer.daemon = True
+        timer.start()
+
+    def _timed_flush(self):
+        try:
+            self.flush()
+        finally:
+            connection.close()  # the timer thread's own connection
+
+    def peek(self, student_id, exam_schedule_id):
+        """This worker's unflushed answers for one attempt."""
+        with self.lock:
+            return {
+                question_id: option
+                for (s, e, question_id), option in self.pending.items()
+                if s == student_id and e == exam_schedule_id
+            }
+
+    def take(self, student_id=None):
+        with self.lock:
+            if student_id is None:
+                taken, self.pending = self.pending, {}
+            else:
+                taken = {
+                    key: self.pending.pop(key)
+                    for key in [key for key in self.pending if key[0] == student_id]
+                }
+            if not self.pending:
+                self.oldest = None
+            return taken
+
+    def restore(self, taken):
+        # Put back deltas from a failed flush unless newer ones arrived meanwhile
+        with self.lock:
+            for key, option in taken.items():
+                self.pending.setdefault(key, option)
+            if self.pending and self.oldest is None:
+                self.oldest = time.monotonic()
+                self._schedule_flush()
+
+    def flush(self, student_id=None):
+        """Upsert pending answers (all, or one student's). Returns rows written."""
+        taken = self.take(student_id)
+        if not taken:
+            return 0
+
+        rows = [
+            ExamAnswer(
+                student_id=s,
+                exam_schedule_id=e,
+                question_id=question_id,
+                selected_option=option,
+            )
+            for (s, e, question_id), option in taken.items()
+        ]
+        # MySQL upserts on any unique key (ON DUPLICATE KEY UPDATE) and
+        # rejects an explicit conflict target
+        unique_fields = None
+        if connection.features.supports_update_conflicts_with_target:
+            unique_fields = ['student', 'exam_schedule', 'question']
+        try:
+            ExamAnswer.objects.bulk_create(
+                rows,
+                batch_size=batch_size(),
+                update_conflicts=True,
+                unique_fields=unique_fields,
+                update_fields=['selected_option', 'updated_at'],
+            )
+        except DatabaseError:
+            logger.exception("Autosave flush of %d answers failed", len(rows))
+            self.restore(taken)
+            return 0
+        return len(rows)
+
+
+answer_buffer = AnswerBuffer()
+atexit.register(answer_buffer.flush)
+
+
+def saved_answers(student_id, exam_schedule_id):
+    """Persisted answers with this worker's pending deltas on top."""
+    answers = dict(
+        ExamAnswer.objects
+        .filter(student_id=student_id, exam_schedule_id=exam_schedule_id)
+        .values_list('question_id', 'selected_option')
+    )
+    answers.update(answer_buffer.peek(student_id, exam_schedule_id))
+    return answers
+
+
+def seal_answers(student_id, exam_schedule_id, posted):
+    """
+    Final answer set for grading: flush this student's pending deltas,
+    then overlay the submitted form on the persisted answers.
+    """
+    answer_buffer.flush(student_id)
+    answers = dict(
+        ExamAnswer.objects
+        .filter(student_id=student_id, exam_schedule_id=exam_schedule_id)
+        .values_list('question_id', 'selected_option')
+    )
+    answers.update(posted)
+    return answers
@@ -0,0 +1,122 @@
+# tests/broadcast.py
+"""
+Quiz start notifications for the countdown page.
+
+Students waiting for the quiz hold a Server-Sent Events connection
+(tests.views.quiz_events, served through asgi.py, only with
+QUIZ_EVENTS_ENABLED; otherwise the page polls the waiting room). Each
+worker runs one
+ScheduleBroadcaster that fans events out to its local subscribers, so a
+worker polls the shared cache once per interval no matter how many
+students it is serving.
+
+Admin views publish events with publish_schedule_event(); the event log
+lives in the shared cache, which stands in for a cross-worker pub/sub
+channel. The broadcaster also announces "quiz_starting" itself once the
+cached schedule says the quiz is enabled and quiz_date has passed.
+"""
+import asyncio
+import json
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from admin_panel.schedule_state import get_schedule_state
+
+POLL_INTERVAL_SECONDS = 1
+EVENT_TIMEOUT = 3600
+
+
+def quiz_events_enabled():
+    return getattr(settings, 'QUIZ_EVENTS_ENABLED', False)
+
+
+def quiz_events_max_seconds():
+    return getattr(settings, 'QUIZ_EVENTS_MAX_SECONDS', 300)
+
+
+def _event_key(college_id):
+    return f'schedule_event:{college_id}'
+
+
+def publish_schedule_event(college_id, event, **data):
+    """Record the latest schedule event for a college (sync, for admin views)."""
+    cache.set(
+        _event_key(college_id),
+        {'id': time.time_ns(), 'event': event, 'data': data},
+        timeout=EVENT_TIMEOUT,
+    )
+
+
+def format_sse(event, data, event_id=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+class ScheduleBroadcaster:
+    def __init__(self):
+        self.subscribers = {}   # college_id -> set of asyncio.Queue
+        self.last_event_ids = {}
+        self.announced = {}     # college_id -> quiz_date already announced
+        self.task = None
+
+    def subscribe(self, college_id):
+        queue = asyncio.Queue()
+        self.subscribers.setdefault(college_id, set()).add(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return queue
+
+    def unsubscribe(self, college_id, queue):
+        queues = self.subscribers.get(college_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self.subscribers[college_id]
+            self.last_event_ids.pop(college_id, None)
+            self.announced.pop(college_id, None)
+
+    def fan_out(self, college_id, message):
+        for queue in self.subscribers.get(college_id, ()):
+            queue.put_nowait(message)
+
+    async def poll(self, college_id):
+        event = await cache.aget(_event_key(college_id))
+        event_id = event['id'] if event else None
+        first_poll = college_id not in self.last_event_ids
+        last_id = self.last_event_ids.get(college_id)
+        self.last_event_ids[college_id] = event_id
+        # Events already in the log when we started are not news
+        if event and not first_poll and event_id != last_id:
+            self.fan_out(college_id, (event['event'], event['data'], event_id))
+
+        state = await sync_to_async(get_schedule_state)(college_id)
+        if (
+            state and
+            state['quiz_enabled'] and
+            state['quiz_date'] and
+            state['quiz_date'] <= timezone.now() and
+            self.announced.get(college_id) != state['quiz_date']
+        ):
+            self.announced[college_id] = state['quiz_date']
+            self.fan_out(
+                college_id,
+                ('quiz_starting', {'quiz_date': state['quiz_date'].isoformat()}, None),
+            )
+
+    async def run(self):
+        while self.subscribers:
+            for college_id in list(self.subscribers):
+                await self.poll(college_id)
+            await asyncio.sleep(POLL_INTERVAL_SECONDS)
+
+
+broadcaster = ScheduleBroadcaster()
@@ -0,0 +1,130 @@
+# tests/compact.py
+"""
+Compact paper payload and bit-packed submissions for the offline exam page.
+
+With EXAM_OFFLINE_MODE on, the exam page downloads the whole paper once
+from tests.views.exam_paper as
+
+    {"hash": "<sha256 prefix>", "questions": [[id, text, [[option, text], ...]], ...]}
+
+and keeps it (and the student's picks) in localStorage, so navigation and
+answering work without the network. The hash covers the questions list;
+the browser revalidates with If-None-Match and gets a 304 while it holds.
+
+The final submit is one request with content type COMPACT_CONTENT_TYPE
+and body "<hash>.<answered>.<choices>":
+
+    answered  bit i set if the question at paper position i was answered
+    choices   2 bits per position, lane i at bits 2i..2i+1, holding option - 1
+
+Both are little-endian byte strings in unpadded base64url. Two bits alone
+can't tell "unanswered" from option 1, hence the separate answered mask
+(one extra bit per question).
+"""
+import base64
+import hashlib
+import json
+
+from .papers import NotEnoughQuestions, build_paper
+from .question_pool import load_answer_key
+
+COMPACT_CONTENT_TYPE = 'application/x-exam-answers'
+HASH_LENGTH = 16
+
+
+class PaperChanged(Exception):
+    """The submission was packed against a different paper than the server's."""
+
+
+def paper_payload(paper):
+    """Return (hash, JSON bytes) for a built paper."""
+    questions = json.dumps(
+        [
+            [q.id, q.question_text, [[number, text] for number, text in q.options]]
+            for q in paper
+        ],
+        separators=(',', ':'),
+        ensure_ascii=False,
+    )
+    paper_hash = hashlib.sha256(questions.encode()).hexdigest()[:HASH_LENGTH]
+    body = '{"hash":"%s","questions":%s}' % (paper_hash, questions)
+    return paper_hash, body.encode()
+
+
+def _b64_int(value):
+    raw = base64.urlsafe_b64decode(value + '=' * (-len(value) % 4))
+    return int.from_bytes(raw, 'little')
+
+
+def parse_compact_submission(body):
+    """Split a compact body into (hash, answered, choices). Raises ValueError."""
+    try:
+        paper_hash, answered, choices = body.decode('ascii').strip().split('.')
+        return paper_hash, _b64_int(answered), _b64_int(choices)
+    except (UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError("Malformed compact submission.")
+
+
+def low_lanes(n):
+    """0b0101...01 with n lanes: the low bit of every 2-bit lane."""
+    return ((1 << 2 * n) - 1) // 3
+
+
+def spread_bits(x):
+    """Move bit i of x to bit 2i (Morton part-1-by-1), 32 bits at a time."""
+    result = 0
+    shift = 0
+    while x:
+        c = x & 0xFFFFFFFF
+        c = (c | (c << 16)) & 0x0000FFFF0000FFFF
+        c = (c | (c << 8)) & 0x00FF00FF00FF00FF
+        c = (c | (c << 4)) & 0x0F0F0F0F0F0F0F0F
+        c = (c | (c << 2)) & 0x3333333333333333
+        c = (c | (c << 1)) & 0x5555555555555555
+        result |= c << shift
+        shift += 64
+        x >>= 32
+    return result
+
+
+def pack_answer_key(paper, answer_key):
+    """Return (key lanes, known mask) in the same layout as the choices."""
+    key = 0
+    known = 0
+    for position, question in enumerate(paper):
+        correct = answer_key.get(question.id)
+        if correct:
+            key |= (correct - 1) << (2 * position)
+            known |= 1 << position
+    return key, known
+
+
+def score_packed(answered, choices, key, known, n):
+    """
+    Count lanes where the choice equals the key, for answered positions
+    with a known key, using whole-int XOR and masks instead of a loop.
+    """
+    lanes = low_lanes(n)
+    diff = (choices ^ key) & (lanes | lanes << 1)
+    wrong = (diff | (diff >> 1)) & lanes
+    counted = spread_bits(answered & known & ((1 << n) - 1))
+    return bin(counted & ~wrong).count('1')
+
+
+def score_compact_submission(student, body, pool, paper_version):
+    """
+    Grade a compact body against the student's paper. Raises ValueError
+    for a malformed body and PaperChanged if the hash doesn't match.
+    """
+    paper_hash, answered, choices = parse_compact_submission(body)
+
+    try:
+        paper = build_paper(student, pool, paper_version)
+    except NotEnoughQuestions:
+        raise PaperChanged()
+    if paper_payload(paper)[0] != paper_hash:
+        raise PaperChanged()
+
+    answer_key = load_answer_key([q.id for q in paper], pool)
+    key, known = pack_answer_key(paper, answer_key)
+    return score_packed(answered, choices, key, known, len(paper))
@@ -0,0 +1,191 @@
+# tests/exam_clock.py
+"""
+Server-authoritative exam clock.
+
+start_exam records an ExamAttempt with its end time and stores the
+student's paper (see tests.papers). Repeated starts reuse the attempt, so
+reloading can't buy extra time. Submits and autosaves that arrive more
+than EXAM_SUBMIT_GRACE_SECONDS after the end are refused. The end time
+comes from the session without touching the database; a session without
+one falls back to the ExamAttempt, and with no attempt either the exam
+was never started and nothing is accepted. sweep_expired_attempts()
+grades the attempts that ran out without a submit: it reads their
+autosaved answers in bulk and writes the Results with one bulk_create per
+batch, then adds them to the affected leaderboards and refreshes their
+counters.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from admin_panel.schedule_counters import refresh_counters
+
+from .leaderboard import rebuild_leaderboard
+from .models import ExamAnswer, ExamAttempt, QuestionPaper, Result
+from .papers import NotEnoughQuestions, derive_paper, store_paper
+from .question_pool import get_question_pool, load_answer_key
+
+EXAM_DURATION_MINUTES = 20
+TOTAL_QUESTIONS = 20
+
+
+def submit_grace():
+    return getattr(settings, 'EXAM_SUBMIT_GRACE_SECONDS', 60)
+
+
+def start_attempt(student, pool, now=None):
+    """
+    Return (ends_at, paper_version) for the student's attempt, creating it
+    on the first start with the paper drawn from `pool`.
+    """
+    now = now or timezone.now()
+    ends_at = now + timedelta(minutes=EXAM_DURATION_MINUTES)
+    if student.exam_schedule_id is None:
+        return ends_at, pool.version
+
+    attempt = ExamAttempt.objects.filter(
+        student_id=student.id,
+        exam_schedule_id=student.exam_schedule_id,
+    ).first()
+    if attempt is None:
+        store_paper(student, pool)
+        attempt, _ = ExamAttempt.objects.get_or_create(
+            student_id=student.id,
+            exam_schedule_id=student.exam_schedule_id,
+            defaults={
+                'paper_version': pool.version,
+                'started_at': now,
+                'ends_at': ends_at,
+            }
+        )
+    return attempt.ends_at, attempt.paper_version
+
+
+def exam_end_time(session, student):
+    """
+    When the student's attempt ends: the exam_end_time start_exam put in
+    the session, else the stored ExamAttempt's (a session that never got or
+    lost it), else None - the exam was never started.
+    """
+    if session.get('exam_end_time'):
+        return datetime.fromisoformat(session['exam_end_time'])
+    if student.exam_schedule_id is None:
+        return None
+    return (
+        ExamAttempt.objects
+        .filter(student_id=student.id, exam_schedule_id=student.exam_schedule_id)
+        .values_list('ends_at', flat=True)
+        .first()
+    )
+
+
+def deadline_passed(ends_at, now=None):
+    """True once ends_at (from exam_end_time()) plus the grace period is over."""
+    now = now or timezone.now()
+    return now > ends_at + timedelta(seconds=submit_grace())
+
+
+def _paper_ids(attempts, pool):
+    """{(student_id, schedule_id): set of question ids} for attempts whose paper is known."""
+    stored = {
+        (student_id, schedule_id): question_ids
+        for student_id, schedule_id, question_ids in QuestionPaper.objects.filter(
+            student_id__in={a.student_id for a in attempts},
+            exam_schedule_id__in={a.exam_schedule_id for a in attempts},
+        ).values_list('student_id', 'exam_schedule_id', 'question_ids')
+    }
+
+    papers = {}
+    for attempt in attempts:
+        key = (attempt.student_id, attempt.exam_schedule_id)
+        if key in stored:
+            papers[key] = set(stored[key])
+        elif attempt.paper_version in (None, pool.version):
+            try:
+                papers[key] = set(derive_paper(pool, *key, attempt.paper_version))
+            except NotEnoughQuestions:
+                pass
+        # Otherwise the paper is unknown and nothing is graded, as in submit_quiz
+    return papers
+
+
+def sweep_expired_attempts(now=None, batch_size=500):
+    """
+    Grade attempts whose clock (plus grace) ran out without a Result, from
+    their saved answers. Returns the number of Results created.
+    """
+    now = now or timezone.now()
+    cutoff = now - timedelta(seconds=submit_grace())
+    pool = get_question_pool()
+
+    submitted = Result.objects.filter(
+        student_id=OuterRef('student_id'),
+        exam_schedule_id=OuterRef('exam_schedule_id'),
+    )
+    created = 0
+    last_id = 0
+
+    while True:
+        attempts = list(
+            ExamAttempt.objects
+            .filter(closed_at__isnull=True, ends_at__lt=cutoff, id__gt=last_id)
+            .select_related('exam_schedule')
+            .order_by('id')[:batch_size]
+        )
+        if not attempts:
+            return created
+        last_id = attempts[-1].id
+
+        # Attempts already submitted just get closed
+        open_ids = set(
+            ExamAttempt.objects
+            .filter(id__in=[a.id for a in attempts])
+            .exclude(Exists(submitted))
+            .values_list('id', flat=True)
+        )
+        to_grade = [a for a in attempts if a.id in open_ids]
+
+        answers = defaultdict(dict)
+        for student_id, schedule_id, question_id, option in ExamAnswer.objects.filter(
+            student_id__in={a.student_id for a in to_grade},
+            exam_schedule_id__in={a.exam_schedule_id for a in to_grade},
+        ).values_list('student_id', 'exam_schedule_id', 'question_id', 'selected_option'):
+            answers[(student_id, schedule_id)][question_id] = option
+
+        papers = _paper_ids(to_grade, pool)
+        answer_key = load_answer_key(
+            list({qid for saved in answers.values() for qid in saved}),
+            pool
+        )
+
+        results = []
+        for attempt in to_grade:
+            key = (attempt.student_id, attempt.exam_schedule_id)
+            paper = papers.get(key)
+            score = sum(
+                1
+                for qid, option in answers.get(key, {}).items()
+                if paper is not None and qid in paper and answer_key.get(qid) == option
+            )
+            results.append(Result(
+                student_id=attempt.student_id,
+                exam_schedule_id=attempt.exam_schedule_id,
+                quiz_date=attempt.exam_schedule.quiz_date,
+                score=score,
+                total_questions=TOTAL_QUESTIONS,
+            ))
+
+        # ignore_conflicts covers a submit that lands between the two queries
+        Result.objects.bulk_create(results, ignore_conflicts=True)
+        ExamAttempt.objects.filter(id__in=[a.id for a in attempts]).update(closed_at=now)
+        created += len(results)
+
+        # bulk_create(ignore_conflicts) returns no ids on MySQL: add the
+        # entries per schedule from the Results just written
+        swept_schedules = {a.exam_schedule_id for a in to_grade}
+        for schedule_id in swept_schedules:
+            rebuild_leaderboard(schedule_id)
+        refresh_counters(swept_schedules)
@@ -0,0 +1,51 @@
+# tests/fragments.py
+"""
+Pre-rendered HTML for exam questions.
+
+The option labels of a question only change when the bank changes, so
+each (question, option order) block is rendered once per bank version and
+kept in this worker. The exam page then joins fragments in the student's
+order; numbering, question text and bookmarks stay in exam.html.
+"""
+import threading
+from collections import namedtuple
+
+from django.template.loader import get_template
+from django.utils.safestring import mark_safe
+
+FRAGMENT_TEMPLATE = "tests/includes/question_options.html"
+
+RenderedQuestion = namedtuple("RenderedQuestion", ["id", "question_text", "options_html"])
+
+_fragments = {"version": None, "html": {}}
+_lock = threading.Lock()
+
+
+def render_question(question):
+    return mark_safe(get_template(FRAGMENT_TEMPLATE).render({"q": question}))
+
+
+def question_fragment(question, version):
+    """Return the cached HTML block for a PaperQuestion."""
+    global _fragments
+    key = (question.id, tuple(number for number, _ in question.options))
+
+    cache = _fragments
+    if cache["version"] == version:
+        html = cache["html"].get(key)
+        if html is not None:
+            return html
+
+    html = render_question(question)
+    with _lock:
+        if _fragments["version"] != version:
+            _fragments = {"version": version, "html": {}}
+        _fragments["html"][key] = html
+    return html
+
+
+def render_paper(paper, version):
+    return [
+        RenderedQuestion(q.id, q.question_text, question_fragment(q, version))
+        for q in paper
+    ]
@@ -0,0 +1,154 @@
+# tests/leaderboard.py
+"""
+Per-schedule leaderboard in LeaderboardEntry.
+
+record_result() adds one entry per submit: a single INSERT in the
+transaction that creates the Result, with no lock and no other row
+rewritten, so a submit costs the same during the deadline burst however
+many students are already on the board. Entries
+are read in leaderboard order (score desc, earlier submission, result
+id) straight off the (schedule, -score, submitted_at, result) index.
+
+Position, rank (1, 1, 3), dense rank (1, 1, 2) and percentile are
+computed when reading. rank_page() counts the entries, and the distinct
+scores, ahead of a page's first row with index range counts and numbers
+the page from there; ranked() numbers a full, streamed leaderboard as it
+goes. Percentile is 100 * (N - rank + 1) / N with N the schedule's
+stored submission_count.
+
+The expiry sweeper and repairs call rebuild_leaderboard(), which adds
+the entries of results that have none. ensure_leaderboard() does that
+for a schedule whose entry count doesn't match its submission_count,
+e.g. results from before the leaderboard existed. It only counts when
+submission_count has moved since the schedule's leaderboard was last
+found complete.
+"""
+from django.db.models import Exists, OuterRef, Q
+
+from admin_panel.models import ExamScheduleHistory
+
+from .models import LeaderboardEntry, Result
+
+LEADERBOARD_ORDERING = ['-score', 'submitted_at', 'result_id']
+
+
+def percentile(rank, total):
+    total = max(total, rank)  # a counter that lags the board
+    return 100.0 * (total - rank + 1) / total
+
+
+def leaderboard(schedule_id):
+    """The schedule's entries in leaderboard order."""
+    return LeaderboardEntry.objects.filter(exam_schedule_id=schedule_id).order_by(*LEADERBOARD_ORDERING)
+
+
+def record_result(result):
+    """
+    Add a freshly created Result to its schedule's leaderboard. Call it in
+    the transaction that creates the Result, so both or neither are saved.
+    """
+    if result.exam_schedule_id is None:
+        return
+    LeaderboardEntry.objects.create(
+        result_id=result.id,
+        exam_schedule_id=result.exam_schedule_id,
+        student_id=result.student_id,
+        score=result.score,
+        submitted_at=result.created_at,
+    )
+
+
+def _tied_ahead(entry):
+    return (
+        Q(submitted_at__lt=entry.submitted_at) |
+        Q(submitted_at=entry.submitted_at, result_id__lt=entry.result_id)
+    )
+
+
+def within_top(entries, schedule_id, top_n):
+    """Restrict `entries` to the first top_n places of the leaderboard."""
+    last = leaderboard(schedule_id)[top_n - 1:top_n].first()
+    if last is None:
+        return entries
+    return entries.filter(
+        Q(score__gt=last.score) |
+        Q(score=last.score) & (_tied_ahead(last) | Q(result_id=last.result_id))
+    )
+
+
+def rank_page(entries, total):
+    """
+    Set position, rank, dense_rank and percentile on a page of entries (in
+    leaderboard order, one schedule) out of `total` results.
+    """
+    if not entries:
+        return entries
+    first = entries[0]
+    board = LeaderboardEntry.objects.filter(exam_schedule_id=first.exam_schedule_id)
+    higher = board.filter(score__gt=first.score)
+    higher_count = higher.count()
+    higher_scores = higher.values('score').distinct().count()
+    tied_ahead = board.filter(score=first.score).filter(_tied_ahead(first)).count()
+
+    rank = higher_count + 1
+    dense_rank = higher_scores + 1
+    previous_score = first.score
+    for position, entry in enumerate(entries, start=higher_count + tied_ahead + 1):
+        if entry.score != previous_score:
+            rank = position
+            dense_rank += 1
+            previous_score = entry.score
+        entry.position = position
+        entry.rank = rank
+        entry.dense_rank = dense_rank
+        entry.percentile = percentile(rank, total)
+    return entries
+
+
+def ranked(rows, total, score_index):
+    """
+    Yield (position, rank, dense_rank, percentile, row) for rows of a whole
+    leaderboard in leaderboard order; row[score_index] is the score.
+    """
+    rank = dense_rank = 0
+    previous_score = None
+    for position, row in enumerate(rows, start=1):
+        if row[score_index] != previous_score:
+            rank = position
+            dense_rank += 1
+            previous_score = row[score_index]
+        yield position, rank, dense_rank, percentile(rank, total), row
+
+
+def rebuild_leaderboard(schedule_id):
+    """Add entries for the schedule's results that have none. Returns entries added."""
+    has_entry = LeaderboardEntry.objects.filter(result_id=OuterRef('id'))
+    missing = [
+        LeaderboardEntry(
+            result_id=result_id,
+            exam_schedule_id=schedule_id,
+            student_id=student_id,
+            score=score,
+            submitted_at=created_at,
+        )
+        for result_id, student_id, score, created_at in
+        Result.objects
+        .filter(exam_schedule_id=schedule_id)
+        .exclude(Exists(has_entry))
+        .values_list('id', 'student_id', 'score', 'created_at')
+    ]
+    # ignore_conflicts: a submit may add its own entry meanwhile
+    LeaderboardEntry.objects.bulk_create(missing, batch_size=1000, ignore_conflicts=True)
+    return len(missing)
+
+
+def ensure_leaderboard(schedule):
+    """Add missing entries if the board doesn't hold all of the schedule's results."""
+    submissions = schedule.submission_count
+    if schedule.leaderboard_checked_count == submissions:
+        return
+    entries = LeaderboardEntry.objects.filter(exam_schedule_id=schedule.id).count()
+    if entries != submissions:
+        rebuild_leaderboard(schedule.id)
+    ExamScheduleHistory.objects.filter(pk=schedule.id).update(leaderboard_checked_count=submissions)
+    schedule.leaderboard_checked_count = submissions
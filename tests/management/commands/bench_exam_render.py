@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.template import Context, Template
+
+from tests.fragments import render_paper
+from tests.papers import PaperQuestion, shuffled_options
+from tests.question_pool import PooledQuestion
+
+# The per-question markup exam.html used before fragments were cached
+LEGACY_TEMPLATE = """{% load question_extras %}{% for q in questions %}
+<div class="question-block" id="question-{{ forloop.counter }}" data-qnum="{{ forloop.counter }}">
+    <h2 class="section-title">Question {{ forloop.counter }}</h2>
+    <h3 class="question-text">{{ q.question_text }}</h3>
+    {% for i in "1234" %}{% with option_value=q|get_option:i %}{% if option_value %}
+    <label class="option">
+        <input type="radio" name="q{{ q.id }}" value="{{ i }}" id="q{{ q.id }}{{ i }}">
+        <span class="radio"></span>
+        <span class="option-text">{{ option_value }}</span>
+    </label>
+    {% endif %}{% endwith %}{% endfor %}
+</div>
+{% endfor %}"""
+
+FRAGMENT_TEMPLATE = """{% for q in questions %}
+<div class="question-block" id="question-{{ forloop.counter }}" data-qnum="{{ forloop.counter }}">
+    <h2 class="section-title">Question {{ forloop.counter }}</h2>
+    <h3 class="question-text">{{ q.question_text }}</h3>
+    {{ q.options_html }}
+</div>
+{% endfor %}"""
+
+
+class Command(BaseCommand):
+    help = 'Benchmark rendering a 20-question exam page with and without cached fragments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=2000)
+        parser.add_argument('--questions', type=int, default=20)
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+        questions = [
+            PooledQuestion(
+                i, 'TECH', f'Sample question {i} <with markup>?',
+                f'Option A{i}', f'Option B{i}', f'Option C{i}', f'Option D{i}', 1
+            )
+            for i in range(1, options['questions'] + 1)
+        ]
+        paper = [
+            PaperQuestion(q.id, q.question_text, shuffled_options(q, seed=0))
+            for q in questions
+        ]
+
+        legacy = Template(LEGACY_TEMPLATE)
+        fragments = Template(FRAGMENT_TEMPLATE)
+        render_paper(paper, version='bench')  # warm the fragment cache
+
+        def timed(render):
+            start = time.perf_counter()
+            for _ in range(iterations):
+                render()
+            return (time.perf_counter() - start) / iterations * 1000
+
+        before = timed(lambda: legacy.render(Context({'questions': questions})))
+        after = timed(lambda: fragments.render(Context({'questions': render_paper(paper, version='bench')})))
+
+        self.stdout.write(f'{len(questions)} questions, {iterations} renders each')
+        self.stdout.write(f'get_option loop:   {before:.3f} ms/page')
+        self.stdout.write(f'cached fragments:  {after:.3f} ms/page')
+        self.stdout.write(self.style.SUCCESS(f'Speed-up: {before / after:.1f}x'))
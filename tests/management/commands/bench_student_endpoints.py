@@ -0,0 +1,202 @@
+import asyncio
+import re
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from admin_panel.models import College, ExamSchedule, ExamScheduleHistory
+from students.models import Student
+from tests.models import Question
+
+PASSWORD = 'bench-password'
+QUESTION_ID_RE = re.compile(rb'name="q(\d+)"')
+
+SYNC_URLS = {
+    'login': '/login/',
+    'start_exam': '/quiz/start-exam/',
+    'quiz': '/quiz/start_quiz/',
+    'submit': '/quiz/submit/',
+}
+ASYNC_URLS = {
+    'login': '/async/login/?next=/quiz/async/start_quiz/',
+    'start_exam': '/quiz/async/start-exam/',
+    'quiz': '/quiz/async/start_quiz/',
+    'submit': '/quiz/async/submit/',
+}
+
+
+def answers_from_page(content):
+    return {f'q{qid.decode()}': '1' for qid in QUESTION_ID_RE.findall(content)}
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark login -> start-exam -> quiz -> submit for N simulated students, '
+        'through the sync (WSGI) views and the async (ASGI) views, on a throwaway test database'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--students', type=int, default=1000,
+                            help='Simulated students per run')
+        parser.add_argument('--concurrency', type=int, default=1000,
+                            help='Students in flight at once')
+        parser.add_argument('--wsgi-workers', type=int, default=32,
+                            help='Threads standing in for sync workers on the WSGI run')
+
+    def handle(self, *args, **options):
+        students = options['students']
+        concurrency = options['concurrency']
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            # Cheap hashing keeps the comparison about request handling, not PBKDF2
+            with override_settings(
+                PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'],
+                ALLOWED_HOSTS=['*'],
+            ):
+                cache.clear()
+                sync_emails, async_emails = self.seed(students)
+
+                self.stdout.write(
+                    f'{students} students, concurrency {concurrency}, '
+                    f'{options["wsgi_workers"]} WSGI threads'
+                )
+                wsgi = self.run_wsgi(sync_emails, min(concurrency, options['wsgi_workers']))
+                self.report('WSGI (sync views)', wsgi)
+                asgi = asyncio.run(self.run_asgi(async_emails, concurrency))
+                self.report('ASGI (async views)', asgi)
+        finally:
+            connections.close_all()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    # -----------------------------
+    # Fixtures
+    # -----------------------------
+    def seed(self, count):
+        Question.objects.bulk_create([
+            Question(
+                category=category,
+                question_text=f'{category} benchmark question {i}',
+                option_1='A', option_2='B', option_3='C', option_4='D',
+                correct_option=1 + i % 4,
+            )
+            for category in ('TECH', 'REAS')
+            for i in range(30)
+        ])
+
+        # Past the admission window so nobody waits in the countdown page
+        quiz_date = timezone.now() - timedelta(hours=1)
+        college = College.objects.create(name='Benchmark College')
+        ExamSchedule.objects.create(college=college, quiz_date=quiz_date, quiz_enabled=True)
+        history = ExamScheduleHistory.objects.create(college=college, quiz_date=quiz_date)
+
+        password = make_password(PASSWORD)
+        emails = {'sync': [], 'async': []}
+        students = []
+        for run in emails:
+            for i in range(count):
+                email = f'{run}{i}@bench.invalid'
+                emails[run].append(email)
+                students.append(Student(
+                    name=f'{run} student {i}',
+                    email=email,
+                    password=password,
+                    exam_schedule=history,
+                    mobile_number='9000000000',
+                    hall_ticket=f'BENCH{run[0].upper()}{i}',
+                    is_active=True,
+                ))
+        Student.objects.bulk_create(students, batch_size=500)
+        return emails['sync'], emails['async']
+
+    # -----------------------------
+    # Runs
+    # -----------------------------
+    def run_wsgi(self, emails, workers):
+        def student_flow(email):
+            client = Client()
+            timings, failures = [], 0
+            try:
+                steps = [
+                    lambda: client.post(SYNC_URLS['login'], {'email': email, 'password': PASSWORD}),
+                    lambda: client.get(SYNC_URLS['start_exam']),
+                    lambda: client.get(SYNC_URLS['quiz']),
+                ]
+                page = None
+                for step in steps:
+                    start = time.perf_counter()
+                    page = step()
+                    timings.append(time.perf_counter() - start)
+                    failures += page.status_code >= 400
+
+                start = time.perf_counter()
+                response = client.post(SYNC_URLS['submit'], answers_from_page(page.content))
+                timings.append(time.perf_counter() - start)
+                failures += response.status_code >= 400
+            except Exception:
+                failures += 1
+            finally:
+                connections.close_all()
+            return timings, failures
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(student_flow, emails))
+        return time.perf_counter() - start, outcomes
+
+    async def run_asgi(self, emails, concurrency):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def student_flow(email):
+            async with semaphore:
+                client = AsyncClient()
+                timings, failures = [], 0
+                try:
+                    start = time.perf_counter()
+                    response = await client.post(ASYNC_URLS['login'], {'email': email, 'password': PASSWORD})
+                    timings.append(time.perf_counter() - start)
+                    failures += response.status_code >= 400
+
+                    for url in (ASYNC_URLS['start_exam'], ASYNC_URLS['quiz']):
+                        start = time.perf_counter()
+                        response = await client.get(url)
+                        timings.append(time.perf_counter() - start)
+                        failures += response.status_code >= 400
+
+                    start = time.perf_counter()
+                    response = await client.post(ASYNC_URLS['submit'], answers_from_page(response.content))
+                    timings.append(time.perf_counter() - start)
+                    failures += response.status_code >= 400
+                except Exception:
+                    failures += 1
+                return timings, failures
+
+        start = time.perf_counter()
+        outcomes = await asyncio.gather(*(student_flow(email) for email in emails))
+        return time.perf_counter() - start, outcomes
+
+    # -----------------------------
+    # Output
+    # -----------------------------
+    def report(self, label, run):
+        elapsed, outcomes = run
+        latencies = sorted(t * 1000 for timings, _ in outcomes for t in timings)
+        failures = sum(f for _, f in outcomes)
+        if len(latencies) < 2:
+            self.stdout.write(self.style.ERROR(f'{label}: no completed requests ({failures} failures)'))
+            return
+        cuts = statistics.quantiles(latencies, n=100)
+        self.stdout.write(
+            f'{label:<20} {elapsed:7.2f} s  {len(latencies) / elapsed:8.1f} req/s  '
+            f'p50 {cuts[49]:7.1f} ms  p95 {cuts[94]:7.1f} ms  failures {failures}'
+        )
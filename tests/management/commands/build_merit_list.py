@@ -0,0 +1,47 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from tests.merit import build_merit_list
+from tests.models import MeritList
+
+
+class Command(BaseCommand):
+    help = 'Build or update a cross-college merit list with scores normalized per sitting'
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', help='Merit list name, e.g. "2025 Scholarship"')
+        parser.add_argument('--from-date', help='YYYY-MM-DD, first day of the season')
+        parser.add_argument('--to-date', help='YYYY-MM-DD, last day of the season')
+        parser.add_argument('--method', choices=[MeritList.PERCENTILE, MeritList.ZSCORE])
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Re-normalize every sitting, not just new or changed ones'
+        )
+
+    def handle(self, *args, **options):
+        changes = {}
+        for option in ('from_date', 'to_date'):
+            if options[option]:
+                changes[option] = parse_date(options[option])
+                if changes[option] is None:
+                    raise CommandError(f"Invalid date: {options[option]}")
+        if options['method']:
+            changes['method'] = options['method']
+
+        merit_list = MeritList.objects.filter(name=options['name']).first()
+        full = options['full']
+        if merit_list is None:
+            if 'from_date' not in changes or 'to_date' not in changes:
+                raise CommandError('A new merit list needs --from-date and --to-date.')
+            merit_list = MeritList.objects.create(name=options['name'], **changes)
+        elif any(getattr(merit_list, field) != value for field, value in changes.items()):
+            for field, value in changes.items():
+                setattr(merit_list, field, value)
+            merit_list.save()
+            full = full or 'method' in changes  # new method: every sitting changes
+
+        sittings, renumbered = build_merit_list(merit_list, full=full)
+        self.stdout.write(self.style.SUCCESS(
+            f"{merit_list}: {sittings} sittings normalized, "
+            f"{renumbered} entries renumbered, {merit_list.entries.count()} in the list."
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from admin_panel.models import ExamScheduleHistory
+from tests.papers import NotEnoughQuestions, generate_papers
+
+
+class Command(BaseCommand):
+    help = 'Pre-generate question papers for every student registered to an exam schedule'
+
+    def add_arguments(self, parser):
+        parser.add_argument('schedule_ids', nargs='+', type=int, help='ExamScheduleHistory ids')
+
+    def handle(self, *args, **options):
+        for schedule_id in options['schedule_ids']:
+            try:
+                schedule = ExamScheduleHistory.objects.select_related('college').get(pk=schedule_id)
+            except ExamScheduleHistory.DoesNotExist:
+                raise CommandError(f'Exam schedule {schedule_id} does not exist.')
+
+            try:
+                created = generate_papers(schedule)
+            except NotEnoughQuestions as e:
+                raise CommandError(str(e))
+
+            self.stdout.write(self.style.SUCCESS(f'{created} papers generated for {schedule}.'))
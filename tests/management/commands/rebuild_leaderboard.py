@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from admin_panel.models import ExamScheduleHistory
+from tests.leaderboard import rebuild_leaderboard
+
+
+class Command(BaseCommand):
+    help = 'Add leaderboard entries for Results that have none'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'schedule_ids', nargs='*', type=int,
+            help='ExamScheduleHistory ids (default: all)'
+        )
+
+    def handle(self, *args, **options):
+        schedule_ids = options['schedule_ids'] or list(
+            ExamScheduleHistory.objects.order_by('id').values_list('id', flat=True)
+        )
+        entries = 0
+        for schedule_id in schedule_ids:
+            entries += rebuild_leaderboard(schedule_id)
+        self.stdout.write(self.style.SUCCESS(
+            f'{entries} leaderboard entries added across {len(schedule_ids)} schedules.'
+        ))
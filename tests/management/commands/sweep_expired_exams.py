@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tests.exam_clock import sweep_expired_attempts
+
+
+class Command(BaseCommand):
+    help = 'Grade exam attempts whose time ran out without a submit, from their saved answers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--loop', type=int, metavar='SECONDS', default=0,
+            help='Keep sweeping every SECONDS instead of running once'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            graded = sweep_expired_attempts(batch_size=options['batch_size'])
+            if graded or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(f'{graded} expired attempts graded.'))
+            if not options['loop']:
+                return
+            close_old_connections()
+            time.sleep(options['loop'])
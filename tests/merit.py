@@ -0,0 +1,164 @@
+# tests/merit.py
+"""
+Cross-college merit lists.
+
+A season's sittings (ExamScheduleHistory in the merit list's date range)
+are normalized one at a time. Each sitting's Results are read in chunks
+and every score is turned into its percentile or z-score within that
+sitting, so a hard paper at one college doesn't count against its
+students. The entries of all sittings are then numbered into one list:
+normalized score, then raw score, then earlier submission, then result
+id, which keeps the order deterministic.
+
+Each sitting records how many results it had and the last result id.
+Re-running only re-normalizes sittings whose results changed, plus new
+ones, then renumbers the list. Only rows whose position or rank moved
+are written.
+"""
+import math
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from admin_panel.models import ExamScheduleHistory
+
+from .leaderboard import percentile
+from .models import MeritList, MeritListEntry, MeritListSitting, Result
+
+CHUNK_SIZE = 2000
+
+
+def season_schedule_ids(merit_list):
+    start = timezone.make_aware(datetime.combine(merit_list.from_date, datetime.min.time()))
+    end = timezone.make_aware(datetime.combine(merit_list.to_date, datetime.max.time()))
+    return list(
+        ExamScheduleHistory.objects
+        .filter(quiz_date__gte=start, quiz_date__lte=end)
+        .values_list('id', flat=True)
+    )
+
+
+def normalize(scores, method):
+    """
+    (normalized values, mean, std) for one sitting's scores. Percentile is
+    100 * (N - rank + 1) / N, as on the leaderboard; the z-score uses the
+    population standard deviation and is 0 when everyone scored the same.
+    """
+    total = len(scores)
+    mean = sum(scores) / total
+    std = math.sqrt(sum((score - mean) ** 2 for score in scores) / total)
+
+    if method == MeritList.ZSCORE:
+        values = [(score - mean) / std if std else 0.0 for score in scores]
+    else:
+        rank_of = {}
+        for position, score in enumerate(sorted(scores, reverse=True), start=1):
+            rank_of.setdefault(score, position)
+        values = [percentile(rank_of[score], total) for score in scores]
+
+    # Rounded so that equal standings compare equal across sittings
+    return [round(value, 6) for value in values], mean, std
+
+
+def _sitting_results(schedule_id):
+    return list(
+        Result.objects
+        .filter(exam_schedule_id=schedule_id)
+        .values_list('id', 'student_id', 'score', 'created_at')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+
+
+def _add_sitting(merit_list, schedule_id):
+    results = _sitting_results(schedule_id)
+    if not results:
+        return 0
+    values, mean, std = normalize([score for _, _, score, _ in results], merit_list.method)
+    MeritListEntry.objects.bulk_create(
+        [
+            MeritListEntry(
+                merit_list=merit_list,
+                result_id=result_id,
+                exam_schedule_id=schedule_id,
+                student_id=student_id,
+                score=score,
+                submitted_at=created_at,
+                normalized=value,
+                position=0,  # numbered by _renumber()
+                rank=0,
+            )
+            for (result_id, student_id, score, created_at), value in zip(results, values)
+        ],
+        batch_size=1000,
+    )
+    MeritListSitting.objects.create(
+        merit_list=merit_list,
+        exam_schedule_id=schedule_id,
+        result_count=len(results),
+        last_result_id=max(result_id for result_id, _, _, _ in results),
+        mean=mean,
+        std=std,
+    )
+    return len(results)
+
+
+def _renumber(merit_list):
+    """Give every entry its position and rank; returns rows rewritten."""
+    entries = (
+        MeritListEntry.objects
+        .filter(merit_list=merit_list)
+        .order_by('-normalized', '-score', 'submitted_at', 'result_id')
+        .values_list('id', 'position', 'rank', 'normalized')
+        .iterator(chunk_size=CHUNK_SIZE)
+    )
+    changed = []
+    rank = 0
+    previous = None
+    for position, (entry_id, old_position, old_rank, normalized) in enumerate(entries, start=1):
+        if normalized != previous:
+            rank = position
+            previous = normalized
+        if (position, rank) != (old_position, old_rank):
+            changed.append(MeritListEntry(id=entry_id, position=position, rank=rank))
+    MeritListEntry.objects.bulk_update(changed, ['position', 'rank'], batch_size=1000)
+    return len(changed)
+
+
+def build_merit_list(merit_list, full=False):
+    """
+    Bring the merit list up to date with its season's results. Returns
+    (sittings normalized, entries renumbered).
+    """
+    schedule_ids = season_schedule_ids(merit_list)
+    current = {
+        row['exam_schedule_id']: (row['count'], row['last'])
+        for row in Result.objects
+        .filter(exam_schedule_id__in=schedule_ids)
+        .values('exam_schedule_id')
+        .annotate(count=Count('id'), last=Max('id'))
+    }
+
+    with transaction.atomic():
+        recorded = {
+            sitting.exam_schedule_id: (sitting.result_count, sitting.last_result_id)
+            for sitting in MeritListSitting.objects.filter(merit_list=merit_list)
+        }
+        stale = [
+            schedule_id
+            for schedule_id in set(current) | set(recorded)
+            if full or current.get(schedule_id) != recorded.get(schedule_id)
+        ]
+
+        MeritListEntry.objects.filter(merit_list=merit_list, exam_schedule_id__in=stale).delete()
+        MeritListSitting.objects.filter(merit_list=merit_list, exam_schedule_id__in=stale).delete()
+        for schedule_id in sorted(stale):
+            if schedule_id in current:  # others left the season or lost their results
+                _add_sitting(merit_list, schedule_id)
+
+        renumbered = _renumber(merit_list) if stale else 0
+        merit_list.updated_at = timezone.now()
+        merit_list.save(update_fields=['updated_at'])
+
+    return len(stale), renumbered
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:13
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_results(apps, schema_editor):
+    """Keep each student's first Result per schedule so the constraint can be added."""
+    Result = apps.get_model('tests', 'Result')
+    duplicates = (
+        Result.objects
+        .filter(exam_schedule__isnull=False)
+        .values('student_id', 'exam_schedule_id')
+        .annotate(first_id=Min('id'), results=Count('id'))
+        .filter(results__gt=1)
+        .order_by()
+    )
+    for row in duplicates:
+        Result.objects.filter(
+            student_id=row['student_id'],
+            exam_schedule_id=row['exam_schedule_id'],
+        ).exclude(id=row['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0004_alter_question_option_3_alter_question_option_4'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_results, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='result',
+            constraint=models.UniqueConstraint(fields=('student', 'exam_schedule'), name='unique_result_per_student_schedule'),
+        ),
+    ]
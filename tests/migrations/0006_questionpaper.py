@@ -0,0 +1,30 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:14
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0006_alter_student_mobile_number'),
+        ('admin_panel', '0004_examschedulehistory'),
+        ('tests', '0005_result_unique_student_schedule'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionPaper',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_ids', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('exam_schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_papers', to='admin_panel.examschedulehistory')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='question_papers', to='students.student')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='questionpaper',
+            constraint=models.UniqueConstraint(fields=('student', 'exam_schedule'), name='unique_paper_per_student_schedule'),
+        ),
+    ]
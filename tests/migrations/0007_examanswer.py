@@ -0,0 +1,31 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0004_examschedulehistory'),
+        ('students', '0008_studentsessionlease'),
+        ('tests', '0006_questionpaper'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamAnswer',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('selected_option', models.PositiveSmallIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exam_schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_answers', to='admin_panel.examschedulehistory')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_answers', to='tests.question')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_answers', to='students.student')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='examanswer',
+            constraint=models.UniqueConstraint(fields=('student', 'exam_schedule', 'question'), name='unique_answer_per_student_question'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:32
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0008_studentsessionlease'),
+        ('admin_panel', '0004_examschedulehistory'),
+        ('tests', '0007_examanswer'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExamAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('paper_version', models.BigIntegerField(blank=True, null=True)),
+                ('started_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField(db_index=True)),
+                ('closed_at', models.DateTimeField(blank=True, null=True)),
+                ('exam_schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_attempts', to='admin_panel.examschedulehistory')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exam_attempts', to='students.student')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='examattempt',
+            constraint=models.UniqueConstraint(fields=('student', 'exam_schedule'), name='unique_attempt_per_student_schedule'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:49
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('admin_panel', '0006_mailjob'),
+        ('students', '0009_hallticketsequence'),
+        ('tests', '0008_examattempt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField()),
+                ('submitted_at', models.DateTimeField()),
+                ('position', models.PositiveIntegerField()),
+                ('rank', models.PositiveIntegerField()),
+                ('dense_rank', models.PositiveIntegerField()),
+                ('percentile', models.FloatField()),
+                ('exam_schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard', to='admin_panel.examschedulehistory')),
+                ('result', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entry', to='tests.result')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='students.student')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['exam_schedule', 'position'], name='leaderboard_position_idx'), models.Index(fields=['exam_schedule', 'score'], name='leaderboard_score_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.23 on 2026-10-18 11:51
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0009_hallticketsequence'),
+        ('admin_panel', '0006_mailjob'),
+        ('tests', '0009_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MeritList',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('from_date', models.DateField()),
+                ('to_date', models.DateField()),
+                ('method', models.CharField(choices=[('percentile', 'Percentile within sitting'), ('zscore', 'Z-score within sitting')], default='percentile', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MeritListSitting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('result_count', models.PositiveIntegerField()),
+                ('last_result_id', models.BigIntegerField()),
+                ('mean', models.FloatField()),
+                ('std', models.FloatField()),
+                ('exam_schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_panel.examschedulehistory')),
+                ('merit_list', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sittings', to='tests.meritlist')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='MeritListEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.IntegerField()),
+                ('submitted_at', models.DateTimeField()),
+                ('normalized', models.FloatField()),
+                ('position', models.PositiveIntegerField()),
+                ('rank', models.PositiveIntegerField()),
+                ('exam_schedule', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='admin_panel.examschedulehistory')),
+                ('merit_list', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='entries', to='tests.meritlist')),
+                ('result', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='tests.result')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='students.student')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='meritlistsitting',
+            constraint=models.UniqueConstraint(fields=('merit_list', 'exam_schedule'), name='unique_merit_sitting'),
+        ),
+        migrations.AddIndex(
+            model_name='meritlistentry',
+            index=models.Index(fields=['merit_list', 'position'], name='merit_position_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='meritlistentry',
+            constraint=models.UniqueConstraint(fields=('merit_list', 'result'), name='unique_merit_entry_per_result'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0011_questionbankversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='examattempt',
+            name='question_ids',
+            field=models.JSONField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0012_examattempt_question_ids'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='leaderboardentry',
+            name='leaderboard_position_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='leaderboardentry',
+            name='leaderboard_score_idx',
+        ),
+        migrations.RemoveField(
+            model_name='leaderboardentry',
+            name='dense_rank',
+        ),
+        migrations.RemoveField(
+            model_name='leaderboardentry',
+            name='percentile',
+        ),
+        migrations.RemoveField(
+            model_name='leaderboardentry',
+            name='position',
+        ),
+        migrations.RemoveField(
+            model_name='leaderboardentry',
+            name='rank',
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['exam_schedule', '-score', 'submitted_at', 'result'], name='leaderboard_order_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.23 on 2026-10-18 12:49
+
+from django.db import migrations
+
+
+def move_attempt_papers(apps, schema_editor):
+    """Keep the papers saved on attempts as the students' QuestionPapers."""
+    ExamAttempt = apps.get_model('tests', 'ExamAttempt')
+    QuestionPaper = apps.get_model('tests', 'QuestionPaper')
+    attempts = (
+        ExamAttempt.objects
+        .filter(question_ids__isnull=False)
+        .values_list('student_id', 'exam_schedule_id', 'question_ids')
+    )
+    QuestionPaper.objects.bulk_create(
+        (
+            QuestionPaper(student_id=student_id, exam_schedule_id=schedule_id, question_ids=question_ids)
+            for student_id, schedule_id, question_ids in attempts.iterator()
+        ),
+        batch_size=1000,
+        ignore_conflicts=True,  # a pre-generated paper was the one shown
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tests', '0013_leaderboard_read_time_ranks'),
+    ]
+
+    operations = [
+        migrations.RunPython(move_attempt_papers, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='examattempt',
+            name='question_ids',
+        ),
+    ]
@@ -21,6 +21,17 @@ class Question(models.Model):
     def __str__(self):
         return f"{self.category} - {self.question_text[:50]}"
 
+class QuestionBankVersion(models.Model):
+    """
+    Durable copy of the question bank version (a single row). The cache
+    holds the live value; this row is read when the cache entry is
+    missing, so an evicted key never starts a new version mid-exam.
+    """
+    version = models.BigIntegerField()
+
+    def __str__(self):
+        return str(self.version)
+
 class Result(models.Model):
     student = models.ForeignKey(Student, on_delete=models.CASCADE)
     exam_schedule = models.ForeignKey(ExamScheduleHistory, on_delete=models.SET_NULL, null=True, blank=True)
@@ -29,5 +40,172 @@ class Result(models.Model):
     total_questions = models.IntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'exam_schedule'],
+                name='unique_result_per_student_schedule'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.score}/{self.total_questions}"
+
+class QuestionPaper(models.Model):
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='question_papers')
+    exam_schedule = models.ForeignKey(ExamScheduleHistory, on_delete=models.CASCADE, related_name='question_papers')
+    question_ids = models.JSONField(default=list)  # in display order
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'exam_schedule'],
+                name='unique_paper_per_student_schedule'
+            )
+        ]
+
+    def __str__(self):
+        return f"Paper for {self.student_id} - {self.exam_schedule_id}"
+
+
+class ExamAnswer(models.Model):
+    """
+    Autosaved answer, one row per question per attempt. Written in batches
+    by tests.autosave; submit grades from these rows.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='exam_answers')
+    exam_schedule = models.ForeignKey(ExamScheduleHistory, on_delete=models.CASCADE, related_name='exam_answers')
+    question = models.ForeignKey(Question, on_delete=models.CASCADE, related_name='exam_answers')
+    selected_option = models.PositiveSmallIntegerField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'exam_schedule', 'question'],
+                name='unique_answer_per_student_question'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} - Q{self.question_id}: {self.selected_option}"
+
+
+class ExamAttempt(models.Model):
+    """
+    Server-side exam clock, created when the student starts the exam.
+    The sweep_expired_exams command grades attempts that ran out without
+    a submit.
+    """
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name='exam_attempts')
+    exam_schedule = models.ForeignKey(ExamScheduleHistory, on_delete=models.CASCADE, related_name='exam_attempts')
+    paper_version = models.BigIntegerField(null=True, blank=True)  # question bank version at start
+    started_at = models.DateTimeField()
+    ends_at = models.DateTimeField(db_index=True)
+    closed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['student', 'exam_schedule'],
+                name='unique_attempt_per_student_schedule'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} - {self.exam_schedule_id} until {self.ends_at}"
+
+
+class LeaderboardEntry(models.Model):
+    """
+    A Result on its schedule's leaderboard, added on each submit (see
+    tests/leaderboard.py). Entries are read in leaderboard order, score
+    then earlier submission, from the index below; position, rank and
+    percentile are computed when reading, so a submit never rewrites
+    other entries.
+    """
+    result = models.OneToOneField(Result, on_delete=models.CASCADE, related_name='leaderboard_entry')
+    exam_schedule = models.ForeignKey(ExamScheduleHistory, on_delete=models.CASCADE, related_name='leaderboard')
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    score = models.IntegerField()
+    submitted_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['exam_schedule', '-score', 'submitted_at', 'result'],
+                name='leaderboard_order_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.exam_schedule_id}: {self.student_id} ({self.score})"
+
+
+class MeritList(models.Model):
+    """
+    Cross-college merit list for a season: every Result of the schedules
+    held between from_date and to_date, scores normalized per sitting.
+    Built by the build_merit_list command (see tests/merit.py).
+    """
+    PERCENTILE = 'percentile'
+    ZSCORE = 'zscore'
+    METHOD_CHOICES = [
+        (PERCENTILE, 'Percentile within sitting'),
+        (ZSCORE, 'Z-score within sitting'),
+    ]
+
+    name = models.CharField(max_length=100, unique=True)
+    from_date = models.DateField()
+    to_date = models.DateField()
+    method = models.CharField(max_length=10, choices=METHOD_CHOICES, default=PERCENTILE)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.name} ({self.from_date} - {self.to_date})"
+
+
+class MeritListSitting(models.Model):
+    """Which results of a sitting went into the merit list, to spot new ones."""
+    merit_list = models.ForeignKey(MeritList, on_delete=models.CASCADE, related_name='sittings')
+    exam_schedule = models.ForeignKey(ExamScheduleHistory, on_delete=models.CASCADE)
+    result_count = models.PositiveIntegerField()
+    last_result_id = models.BigIntegerField()
+    mean = models.FloatField()
+    std = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['merit_list', 'exam_schedule'],
+                name='unique_merit_sitting'
+            )
+        ]
+
+
+class MeritListEntry(models.Model):
+    merit_list = models.ForeignKey(MeritList, on_delete=models.CASCADE, related_name='entries')
+    result = models.ForeignKey(Result, on_delete=models.CASCADE)
+    exam_schedule = models.ForeignKey(ExamScheduleHistory, on_delete=models.CASCADE)
+    student = models.ForeignKey(Student, on_delete=models.CASCADE)
+    score = models.IntegerField()
+    submitted_at = models.DateTimeField()
+    normalized = models.FloatField()            # percentile or z-score within the sitting
+    position = models.PositiveIntegerField()    # 1..N across all colleges
+    rank = models.PositiveIntegerField()        # shared on equal normalized scores
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['merit_list', 'result'],
+                name='unique_merit_entry_per_result'
+            )
+        ]
+        indexes = [
+            models.Index(fields=['merit_list', 'position'], name='merit_position_idx'),
+        ]
+
     def __str__(self):
-        return f"{self.student} - {self.score}/{self.total_questions}"
\ No newline at end of file
+        return f"{self.merit_list_id} #{self.position}: {self.student_id} ({self.normalized})"
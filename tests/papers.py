@@ -0,0 +1,226 @@
+# tests/papers.py
+"""
+Question paper selection.
+
+A paper is 10 technical + 10 reasoning question ids in display order,
+drawn with a random.Random seeded with (student id, exam schedule id,
+question bank version): any worker derives the same paper - and the same
+option order - from the pool. Papers generated for a whole schedule ahead
+of the exam are those same derived papers, so quiz_view only has to read
+the stored row.
+
+The derivation depends on the pool, so once the bank changes it gives
+another paper. start_exam therefore stores the paper as the student's
+QuestionPaper if it isn't stored yet, and grading reads it back with the
+ExamAttempt in one query.
+"""
+import random
+from collections import namedtuple
+
+from django.db.models import JSONField, OuterRef, Subquery
+from django.utils.crypto import salted_hmac
+
+from students.models import Student
+
+from .models import ExamAttempt, Question, QuestionPaper
+from .question_pool import get_question_pool
+
+QUESTIONS_PER_CATEGORY = 10
+
+# What the exam template renders: options are (option_number, text) pairs in
+# display order, so the submitted value is still the original option number.
+PaperQuestion = namedtuple("PaperQuestion", ["id", "question_text", "options"])
+
+
+class NotEnoughQuestions(Exception):
+    pass
+
+
+def draw_paper(pool, rng):
+    """Sample one paper's question ids from the pool."""
+    technical = pool.ids(Question.TECHNICAL)
+    reasoning = pool.ids(Question.REASONING)
+
+    if len(technical) < QUESTIONS_PER_CATEGORY or len(reasoning) < QUESTIONS_PER_CATEGORY:
+        raise NotEnoughQuestions(
+            'Not enough active questions available. Contact admin.'
+        )
+
+    question_ids = (
+        rng.sample(technical, QUESTIONS_PER_CATEGORY) +
+        rng.sample(reasoning, QUESTIONS_PER_CATEGORY)
+    )
+    rng.shuffle(question_ids)
+    return question_ids
+
+
+def generate_papers(exam_schedule, batch_size=1000):
+    """
+    Create a QuestionPaper for every registered student of an
+    ExamScheduleHistory that does not have one yet. Returns the number of
+    papers created.
+    """
+    pool = get_question_pool()
+
+    existing = set(
+        QuestionPaper.objects.filter(exam_schedule=exam_schedule)
+        .values_list('student_id', flat=True)
+    )
+    student_ids = (
+        Student.objects.filter(exam_schedule=exam_schedule)
+        .values_list('id', flat=True)
+        .order_by('id')
+    )
+
+    # The same papers the students would otherwise get derived
+    papers = [
+        QuestionPaper(
+            student_id=student_id,
+            exam_schedule=exam_schedule,
+            question_ids=derive_paper(pool, student_id, exam_schedule.id),
+        )
+        for student_id in student_ids
+        if student_id not in existing
+    ]
+
+    QuestionPaper.objects.bulk_create(
+        papers,
+        batch_size=batch_size,
+        ignore_conflicts=True
+    )
+    return len(papers)
+
+
+def get_stored_paper(student):
+    """Return the pre-generated question ids for the student, or None."""
+    if not student.exam_schedule_id:
+        return None
+    return (
+        QuestionPaper.objects
+        .filter(student_id=student.id, exam_schedule_id=student.exam_schedule_id)
+        .values_list('question_ids', flat=True)
+        .first()
+    )
+
+
+def load_attempt(student):
+    """
+    The student's ExamAttempt, or None, with the pre-generated paper's
+    question ids as `stored_paper` (None if there is none): one query.
+    """
+    if not student.exam_schedule_id:
+        return None
+    stored = QuestionPaper.objects.filter(
+        student_id=OuterRef('student_id'),
+        exam_schedule_id=OuterRef('exam_schedule_id'),
+    ).values('question_ids')[:1]
+    return (
+        ExamAttempt.objects
+        .filter(student_id=student.id, exam_schedule_id=student.exam_schedule_id)
+        .annotate(stored_paper=Subquery(stored, output_field=JSONField()))
+        .first()
+    )
+
+
+def saved_paper(student):
+    """The stored question ids, read with the attempt if there is one, or None."""
+    attempt = load_attempt(student)
+    if attempt is None:
+        return get_stored_paper(student)  # not started yet
+    return attempt.stored_paper
+
+
+def store_paper(student, pool):
+    """Store the student's derived paper unless one is stored already."""
+    try:
+        question_ids = derive_paper(pool, student.id, student.exam_schedule_id)
+    except NotEnoughQuestions:
+        return  # the exam page shows the error
+    QuestionPaper.objects.bulk_create(
+        [QuestionPaper(
+            student_id=student.id,
+            exam_schedule_id=student.exam_schedule_id,
+            question_ids=question_ids,
+        )],
+        ignore_conflicts=True
+    )
+
+
+def paper_seed(student_id, exam_schedule_id, version):
+    # Keyed with SECRET_KEY so students cannot precompute each other's papers
+    digest = salted_hmac(
+        "tests.papers.paper_seed",
+        f"{student_id}:{exam_schedule_id}:{version}",
+    ).hexdigest()
+    return int(digest, 16)
+
+
+def derive_paper(pool, student_id, exam_schedule_id, version=None):
+    """Rebuild the student's question ids from the seeded PRNG."""
+    seed = paper_seed(student_id, exam_schedule_id, version or pool.version)
+    return draw_paper(pool, random.Random(seed))
+
+
+def student_question_ids(student, pool, version=None):
+    saved = saved_paper(student)
+    if saved is not None:
+        return saved
+    return derive_paper(pool, student.id, student.exam_schedule_id, version)
+
+
+def grading_question_ids(student, pool, version=None):
+    """
+    The question ids to grade the student against, or None when the paper
+    can't be known: no stored paper, and the bank changed since the exam
+    started, so deriving it again would give another paper.
+    """
+    saved = saved_paper(student)
+    if saved is not None:
+        return saved
+    if version not in (None, pool.version):
+        return None
+    try:
+        return derive_paper(pool, student.id, student.exam_schedule_id, version)
+    except NotEnoughQuestions:
+        return None
+
+
+def shuffled_options(question, seed):
+    options = [
+        (number, getattr(question, f"option_{number}"))
+        for number in (1, 2, 3, 4)
+        if getattr(question, f"option_{number}")
+    ]
+    random.Random(f"{seed}:{question.id}").shuffle(options)
+    return options
+
+
+def build_paper(student, pool, version=None):
+    """Return the student's paper as a list of PaperQuestion."""
+    version = version or pool.version
+    question_ids = student_question_ids(student, pool, version)
+
+    question_map = {
+        qid: pool.get(qid)
+        for qid in question_ids
+        if pool.get(qid) is not None
+    }
+
+    # Questions disabled after the paper was drawn are no longer pooled
+    missing_ids = [qid for qid in question_ids if qid not in question_map]
+    if missing_ids:
+        question_map.update({
+            q.id: q
+            for q in Question.objects.filter(id__in=missing_ids)
+        })
+
+    seed = paper_seed(student.id, student.exam_schedule_id, version)
+    return [
+        PaperQuestion(
+            id=qid,
+            question_text=question_map[qid].question_text,
+            options=shuffled_options(question_map[qid], seed),
+        )
+        for qid in question_ids
+        if qid in question_map
+    ]
@@ -0,0 +1,134 @@
+# tests/question_pool.py
+"""
+Per-worker cache of the active question bank.
+
+Every gunicorn worker keeps one compact copy of the active questions:
+an ``array`` of ids per category plus a dict of lightweight
+``PooledQuestion`` tuples. The copy is tagged with the bank version stored
+in the shared cache, backed by the QuestionBankVersion row so that a
+cache eviction doesn't change it; admin views call
+``bump_question_bank_version()`` whenever the bank changes and each
+worker reloads on its next read.
+"""
+import threading
+import time
+from array import array
+from collections import namedtuple
+
+from django.core.cache import cache
+
+from .models import Question, QuestionBankVersion
+
+QUESTION_BANK_VERSION_KEY = "question_bank_version"
+
+# Same attribute names as Question so templates and the get_option filter
+# work unchanged.
+PooledQuestion = namedtuple(
+    "PooledQuestion",
+    [
+        "id",
+        "category",
+        "question_text",
+        "option_1",
+        "option_2",
+        "option_3",
+        "option_4",
+        "correct_option",
+    ],
+)
+
+
+class QuestionPool:
+    def __init__(self, version, questions):
+        self.version = version
+        self.questions = questions
+        self.ids_by_category = {
+            Question.TECHNICAL: array("q"),
+            Question.REASONING: array("q"),
+        }
+        for q in questions.values():
+            self.ids_by_category.setdefault(q.category, array("q")).append(q.id)
+
+    def ids(self, category):
+        return self.ids_by_category.get(category, array("q"))
+
+    def get(self, question_id):
+        return self.questions.get(question_id)
+
+    def answer_key(self, question_ids):
+        """Return {question_id: correct_option} for ids found in the pool."""
+        key = {}
+        for qid in question_ids:
+            q = self.questions.get(qid)
+            if q is not None:
+                key[qid] = q.correct_option
+        return key
+
+
+_pool = None
+_lock = threading.Lock()
+
+
+def get_question_bank_version():
+    version = cache.get(QUESTION_BANK_VERSION_KEY)
+    if version is None:
+        # Cache was cleared or culled: reload the durable version, so
+        # workers keep agreeing on it and pools stay valid
+        row, _ = QuestionBankVersion.objects.get_or_create(
+            pk=1, defaults={'version': time.time_ns()}
+        )
+        version = row.version
+        cache.set(QUESTION_BANK_VERSION_KEY, version, timeout=None)
+    return version
+
+
+def bump_question_bank_version():
+    """Invalidate every worker's pool. Call after any change to Question rows."""
+    version = time.time_ns()
+    QuestionBankVersion.objects.update_or_create(pk=1, defaults={'version': version})
+    cache.set(QUESTION_BANK_VERSION_KEY, version, timeout=None)
+
+
+def _load_pool(version):
+    rows = Question.objects.filter(is_active=True).values_list(
+        "id",
+        "category",
+        "question_text",
+        "option_1",
+        "option_2",
+        "option_3",
+        "option_4",
+        "correct_option",
+    ).order_by("id")
+    questions = {row[0]: PooledQuestion(*row) for row in rows}
+    return QuestionPool(version, questions)
+
+
+def get_question_pool():
+    """Return this worker's pool, reloading it if the bank version moved."""
+    global _pool
+    version = get_question_bank_version()
+    pool = _pool
+    if pool is not None and pool.version == version:
+        return pool
+    with _lock:
+        if _pool is None or _pool.version != version:
+            _pool = _load_pool(version)
+        return _pool
+
+
+def load_answer_key(question_ids, pool=None):
+    """
+    {question_id: correct_option} from the pool, with a single id__in fetch
+    for questions no longer in it (disabled mid-exam).
+    """
+    pool = pool or get_question_pool()
+    answer_key = pool.answer_key(question_ids)
+
+    missing_ids = [qid for qid in question_ids if qid not in answer_key]
+    if missing_ids:
+        answer_key.update(
+            Question.objects.filter(id__in=missing_ids)
+            .values_list("id", "correct_option")
+        )
+    return answer_key
@@ -0,0 +1,274 @@
+// =============================
+// OFFLINE EXAM PAPER
+// =============================
+// Loaded before script.js when EXAM_OFFLINE_MODE is on. Fetches the
+// paper payload once, keeps it and the student's picks in localStorage,
+// builds the question blocks and submits bit-packed answers
+// (see tests/compact.py for the wire format).
+
+(function () {
+
+const config = window.examConfig;
+
+if (!config || !config.paperUrl) return;
+
+const PAPER_KEY = "examPaper";
+const COMPACT_CONTENT_TYPE = "application/x-exam-answers";
+
+let paper = null;
+
+function answersKey() {
+    return "examAnswers:" + paper.hash;
+}
+
+function readStorage(key) {
+
+    try {
+        return JSON.parse(localStorage.getItem(key));
+    } catch (e) {
+        return null;
+    }
+}
+
+function writeStorage(key, value) {
+
+    try {
+        localStorage.setItem(key, JSON.stringify(value));
+    } catch (e) {
+        // Storage full or disabled: the page still works online
+    }
+}
+
+async function fetchPaper() {
+
+    const stored = readStorage(PAPER_KEY);
+    const headers = {};
+
+    if (stored && stored.hash) {
+        headers["If-None-Match"] = '"' + stored.hash + '"';
+    }
+
+    let response;
+
+    try {
+        response = await fetch(config.paperUrl, {
+            method: "GET",
+            credentials: "same-origin",
+            headers: headers
+        });
+    } catch (e) {
+        // Offline: carry on with the copy we already have
+        if (stored) return stored;
+        throw e;
+    }
+
+    if (response.status === 304 && stored) {
+        return stored;
+    }
+
+    const data = await response.json();
+
+    if (!response.ok) {
+        throw new Error(data.error || "Could not load the exam paper.");
+    }
+
+    writeStorage(PAPER_KEY, data);
+
+    return data;
+}
+
+function buildQuestions() {
+
+    const form = document.getElementById("exam-form");
+    const divider = form.querySelector(".divider");
+    const saved = readStorage(answersKey()) || {};
+
+    paper.questions.forEach(([qid, text, options], index) => {
+
+        const n = index + 1;
+
+        const block = document.createElement("div");
+        block.className = "question-block";
+        block.id = "question-" + n;
+        block.dataset.qnum = n;
+        block.style.display = "none";
+
+        const title = document.createElement("h2");
+        title.className = "section-title";
+        title.textContent = "Question " + n;
+
+        const question = document.createElement("h3");
+        question.className = "question-text";
+        question.textContent = text;
+
+        const bookmark = document.createElement("button");
+        bookmark.type = "button";
+        bookmark.className = "bookmark-btn";
+        bookmark.id = "bookmark-btn-" + n;
+        bookmark.textContent = "☆ Bookmark";
+        bookmark.addEventListener("click", () => toggleBookmark(n));
+
+        block.append(title, question, bookmark);
+
+        for (const [number, optionText] of options) {
+
+            const label = document.createElement("label");
+            label.className = "option";
+
+            const radio = document.createElement("input");
+            radio.type = "radio";
+            radio.name = "q" + qid;
+            radio.value = number;
+            radio.id = "q" + qid + number;
+
+            if (String(saved[qid]) === String(number)) {
+                radio.checked = true;
+                label.classList.add("selected");
+            }
+
+            const mark = document.createElement("span");
+            mark.className = "radio";
+
+            const span = document.createElement("span");
+            span.className = "option-text";
+            span.textContent = optionText;
+
+            label.append(radio, mark, span);
+            block.append(label);
+        }
+
+        form.insertBefore(block, divider);
+    });
+}
+
+function showPaperError(message) {
+
+    const form = document.getElementById("exam-form");
+    const error = document.createElement("p");
+
+    error.className = "confirm-text";
+    error.textContent = message;
+
+    form.prepend(error);
+}
+
+// Remember picks locally so a reload without network keeps them
+document.addEventListener(
+    "change",
+    function (e) {
+
+        if (!paper || !e.target.matches('input[type="radio"]')) return;
+
+        const saved = readStorage(answersKey()) || {};
+        saved[e.target.name.slice(1)] = e.target.value;
+        writeStorage(answersKey(), saved);
+    }
+);
+
+// =============================
+// COMPACT SUBMISSION
+// =============================
+
+function base64url(bytes) {
+
+    let binary = "";
+
+    for (const b of bytes) {
+        binary += String.fromCharCode(b);
+    }
+
+    return btoa(binary)
+        .replace(/\+/g, "-")
+        .replace(/\//g, "_")
+        .replace(/=+$/, "");
+}
+
+function packAnswers(form) {
+
+    const n = paper.questions.length;
+    const answered = new Uint8Array(Math.ceil(n / 8));
+    const choices = new Uint8Array(Math.ceil(n / 4));
+
+    paper.questions.forEach(([qid], i) => {
+
+        const checked =
+            form.querySelector('input[name="q' + qid + '"]:checked');
+
+        if (!checked) return;
+
+        answered[i >> 3] |= 1 << (i & 7);
+        choices[i >> 2] |= (parseInt(checked.value) - 1) << ((i & 3) * 2);
+    });
+
+    return paper.hash + "." + base64url(answered) + "." + base64url(choices);
+}
+
+async function submitCompactExam(form, attempt = 0) {
+
+    if (!paper) {
+        form.submit();
+        return;
+    }
+
+    const token =
+        form.querySelector('input[name="csrfmiddlewaretoken"]').value;
+
+    const retry = () => setTimeout(
+        () => submitCompactExam(form, attempt + 1),
+        Math.min(30000, 1000 * 2 ** attempt)
+    );
+
+    let response;
+
+    try {
+        response = await fetch(form.action, {
+            method: "POST",
+            credentials: "same-origin",
+            headers: {
+                "Content-Type": COMPACT_CONTENT_TYPE,
+                "X-CSRFToken": token
+            },
+            body: packAnswers(form)
+        });
+    } catch (e) {
+        // Flaky Wi-Fi: answers are kept locally, try again with backoff
+        retry();
+        return;
+    }
+
+    if (response.status >= 500) {
+        retry();
+        return;
+    }
+
+    if (response.status === 400 || response.status === 409) {
+        // Paper changed on the server: post the regular q<id> form
+        form.submit();
+        return;
+    }
+
+    const html = await response.text();
+
+    localStorage.removeItem(answersKey());
+    localStorage.removeItem(PAPER_KEY);
+
+    document.open();
+    document.write(html);
+    document.close();
+}
+
+window.submitCompactExam = submitCompactExam;
+
+window.examPaperReady = new Promise(resolve => {
+    document.addEventListener("DOMContentLoaded", resolve);
+})
+    .then(fetchPaper)
+    .then(data => {
+        paper = data;
+        buildQuestions();
+    })
+    .catch(e => {
+        showPaperError(e.message);
+    });
+
+})();
@@ -34,7 +34,7 @@ function updateTimer() {
         document.getElementById("timer").textContent =
             "00:00";
         autoSubmitting = true;
-        document.getElementById("exam-form").submit();
+        submitExamForm();
 
         return false;
     }
@@ -295,16 +295,165 @@ document.addEventListener(
         e.target
             .closest(".option")
             .classList.add("selected");
+
+        queueAutosave(e.target);
+    }
+);
+
+// =============================
+// ANSWER AUTOSAVE
+// =============================
+
+const AUTOSAVE_DELAY = 3000;
+
+let pendingAnswers = {};
+let autosaveTimer = null;
+
+function csrfToken() {
+
+    const input =
+        document.querySelector(
+            '#exam-form input[name="csrfmiddlewaretoken"]'
+        );
+
+    return input ? input.value : "";
+}
+
+function queueAutosave(radio) {
+
+    if (!window.examConfig.autosaveUrl) return;
+
+    // radio name is "q<question id>"
+    pendingAnswers[radio.name.slice(1)] = radio.value;
+
+    if (!autosaveTimer) {
+        autosaveTimer =
+            setTimeout(flushAutosave, AUTOSAVE_DELAY);
+    }
+}
+
+function flushAutosave(keepalive = false) {
+
+    autosaveTimer = null;
+
+    const batch = pendingAnswers;
+
+    if (Object.keys(batch).length === 0) return;
+
+    pendingAnswers = {};
+
+    fetch(window.examConfig.autosaveUrl, {
+        method: "POST",
+        credentials: "same-origin",
+        keepalive: keepalive,
+        headers: {
+            "Content-Type": "application/json",
+            "X-CSRFToken": csrfToken()
+        },
+        body: JSON.stringify({ answers: batch })
+    })
+    .then(response => {
+        if (!response.ok && response.status >= 500) {
+            throw new Error("autosave failed");
+        }
+    })
+    .catch(() => {
+        // Keep newer picks made while this request was in flight
+        pendingAnswers =
+            Object.assign(batch, pendingAnswers);
+
+        if (!autosaveTimer) {
+            autosaveTimer =
+                setTimeout(flushAutosave, AUTOSAVE_DELAY);
+        }
+    });
+}
+
+function restoreSavedAnswers() {
+
+    const script =
+        document.getElementById("saved-answers");
+
+    if (!script) return;
+
+    const saved = JSON.parse(script.textContent);
+
+    for (const [qid, option] of Object.entries(saved)) {
+
+        const radio =
+            document.querySelector(
+                'input[name="q' + qid + '"][value="' + option + '"]'
+            );
+
+        if (!radio) continue;
+
+        radio.checked = true;
+        radio.closest(".option").classList.add("selected");
+    }
+
+    // Also counts picks restored by offline-exam.js
+    document
+        .querySelectorAll('.question-block input[type="radio"]:checked')
+        .forEach(radio => {
+            const block = radio.closest(".question-block");
+            attempted[parseInt(block.dataset.qnum)] = true;
+        });
+}
+
+window.addEventListener(
+    "pagehide",
+    function () {
+        if (!finalSubmission) {
+            flushAutosave(true);
+        }
     }
 );
 
+// =============================
+// SESSION HEARTBEAT
+// =============================
+
+function startHeartbeat() {
+
+    if (!window.examConfig.heartbeatUrl) return;
+
+    setInterval(() => {
+
+        fetch(window.examConfig.heartbeatUrl, {
+            method: "GET",
+            credentials: "same-origin"
+        }).catch(() => {});
+
+    }, 60000);
+}
+
 // =============================
 // PAGE LOAD
 // =============================
 
+function submitExamForm() {
+
+    const form =
+        document.getElementById("exam-form");
+
+    // Offline mode sends bit-packed answers instead
+    if (window.submitCompactExam) {
+        window.submitCompactExam(form);
+    } else {
+        form.submit();
+    }
+}
+
 window.addEventListener(
     "DOMContentLoaded",
-    function () {
+    async function () {
+
+        // Offline mode builds the questions from the paper payload first
+        if (window.examPaperReady) {
+            await window.examPaperReady;
+        }
+
+        restoreSavedAnswers();
 
         updateProgress();
 
@@ -316,6 +465,8 @@ window.addEventListener(
             startTimer();
         }
 
+        startHeartbeat();
+
     }
 );
 function openSubmitConfirmation() {
@@ -454,9 +605,7 @@ document.addEventListener(
 
                     finalSubmission = true;
 
-                    document.getElementById(
-                        "exam-form"
-                    ).submit();
+                    submitExamForm();
                 }
             );
         }
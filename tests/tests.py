@@ -1,3 +1,168 @@
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from admin_panel.models import College, ExamSchedule, ExamScheduleHistory
+from admin_panel.schedule_counters import count_submission
+from students.models import Student, StudentSessionLease
+
+from .leaderboard import ensure_leaderboard, leaderboard, rank_page, ranked, record_result
+from .models import ExamAttempt, LeaderboardEntry, Question, QuestionPaper, Result
+from .papers import QUESTIONS_PER_CATEGORY, derive_paper, generate_papers, student_question_ids
+from .question_pool import bump_question_bank_version, get_question_pool
+
+
+class LeaderboardTests(TestCase):
+    SCORES = [5, 5, 3, 3, 3, 1]
+
+    @classmethod
+    def setUpTestData(cls):
+        college = College.objects.create(name='Leaderboard college')
+        cls.schedule = ExamScheduleHistory.objects.create(college=college, quiz_date=timezone.now())
+        for i, score in enumerate(cls.SCORES):
+            student = Student.objects.create(
+                name=f'Student {i}', email=f'lb{i}@example.com', password='!',
+                exam_schedule=cls.schedule, mobile_number='9000000000',
+            )
+            result = Result.objects.create(
+                student=student, exam_schedule=cls.schedule, score=score, total_questions=20
+            )
+            record_result(result)
+            count_submission(cls.schedule.id, score)
+        cls.schedule.refresh_from_db()
+
+    def test_ranks_of_a_page_match_the_whole_board(self):
+        whole = [
+            (position, rank, dense_rank)
+            for position, rank, dense_rank, _, _ in ranked(
+                leaderboard(self.schedule.id).values_list('score'), len(self.SCORES), score_index=0
+            )
+        ]
+        self.assertEqual(whole, [(1, 1, 1), (2, 1, 1), (3, 3, 2), (4, 3, 2), (5, 3, 2), (6, 6, 3)])
+
+        page = rank_page(list(leaderboard(self.schedule.id)[3:6]), len(self.SCORES))
+        self.assertEqual([(e.position, e.rank, e.dense_rank) for e in page], whole[3:6])
+        self.assertEqual(page[-1].percentile, 100.0 / len(self.SCORES))
+
+    def test_ensure_leaderboard_counts_only_after_new_submissions(self):
+        with self.assertNumQueries(2):  # count the entries, mark the schedule checked
+            ensure_leaderboard(self.schedule)
+        schedule = ExamScheduleHistory.objects.get(pk=self.schedule.pk)
+        with self.assertNumQueries(0):
+            ensure_leaderboard(schedule)
+
+        # A submit whose leaderboard insert was lost: the next view repairs it
+        student = Student.objects.create(
+            name='Late', email='late@example.com', password='!',
+            exam_schedule=schedule, mobile_number='9000000000',
+        )
+        Result.objects.create(student=student, exam_schedule=schedule, score=4, total_questions=20)
+        count_submission(schedule.id, 4)
+        schedule.refresh_from_db()
+        ensure_leaderboard(schedule)
+        self.assertEqual(leaderboard(schedule.id).count(), len(self.SCORES) + 1)
+
+    def test_results_page_shows_dense_rank(self):
+        admin = User.objects.create_superuser('admin', 'admin@example.com', '!')
+        self.client.force_login(admin)
+        response = self.client.get(reverse('college_results', args=[self.schedule.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([e.dense_rank for e in response.context['page_obj']], [1, 1, 2, 2, 2, 3])
+        self.assertContains(response, '<th>Dense Rank</th>', html=True)
+
+
+class SubmitQuizTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for category in (Question.TECHNICAL, Question.REASONING):
+            for i in range(QUESTIONS_PER_CATEGORY + 5):
+                Question.objects.create(
+                    category=category, question_text=f'{category} {i}',
+                    option_1='a', option_2='b', option_3='c', option_4='d', correct_option=1,
+                )
+        college = College.objects.create(name='Submit college')
+        quiz_date = timezone.now() - timedelta(minutes=1)
+        ExamSchedule.objects.create(college=college, quiz_date=quiz_date, quiz_enabled=True)
+        cls.schedule = ExamScheduleHistory.objects.create(college=college, quiz_date=quiz_date)
+        cls.student = Student.objects.create(
+            name='Submitter', email='submit@example.com', password=make_password('Passw0rd!'),
+            exam_schedule=cls.schedule, mobile_number='9000000000', is_active=True,
+        )
+
+    def setUp(self):
+        cache.clear()  # login leases and the question pool
+        self.client.post(reverse('login'), {'email': 'submit@example.com', 'password': 'Passw0rd!'})
+        self.client.get(reverse('start_exam'))
+
+    def test_submit_saves_result_entry_and_lease_in_one_transaction(self):
+        paper = student_question_ids(self.student, get_question_pool())
+        answers = {f'q{qid}': '1' for qid in paper}
+
+        # session, saved answers, attempt with its paper, then the
+        # transaction: result, leaderboard entry, counters, lease; logout
+        with self.assertNumQueries(11):
+            response = self.client.post(reverse('submit_quiz'), answers)
+
+        self.assertContains(response, 'Successfully Submitted')
+        result = Result.objects.get(student=self.student)
+        self.assertEqual(result.score, 2 * QUESTIONS_PER_CATEGORY)
+        self.assertTrue(LeaderboardEntry.objects.filter(result=result).exists())
+        self.assertFalse(StudentSessionLease.objects.filter(student=self.student).exists())
+        self.schedule.refresh_from_db()
+        self.assertEqual(self.schedule.submission_count, 1)
+
+    def drop_session_end_time(self):
+        # e.g. a new login after the exam started
+        session = self.client.session
+        del session['exam_end_time']
+        session.save()
+
+    def test_session_without_end_time_uses_the_attempts(self):
+        ExamAttempt.objects.update(ends_at=timezone.now() - timedelta(hours=1))
+        self.drop_session_end_time()
+
+        response = self.client.post(reverse('submit_quiz'), {})
+
+        self.assertContains(response, 'The exam time is over.')
+        self.assertFalse(Result.objects.exists())
+
+    def test_submit_and_autosave_without_an_attempt_are_refused(self):
+        ExamAttempt.objects.all().delete()
+        self.drop_session_end_time()
+
+        response = self.client.post(
+            reverse('autosave_answers'), '{"answers": {}}', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 409)
+        response = self.client.post(reverse('submit_quiz'), {})
+        self.assertContains(response, 'You have not started the exam.')
+        self.assertFalse(Result.objects.exists())
+
+    def test_paper_stored_at_start_is_graded_after_a_bank_change(self):
+        pool = get_question_pool()
+        paper = QuestionPaper.objects.get(student=self.student).question_ids
+        self.assertEqual(paper, derive_paper(pool, self.student.id, self.schedule.id))
+
+        bump_question_bank_version()
+        self.assertNotEqual(
+            derive_paper(get_question_pool(), self.student.id, self.schedule.id), paper
+        )
+        self.client.post(reverse('submit_quiz'), {f'q{qid}': '1' for qid in paper})
+
+        self.assertEqual(Result.objects.get(student=self.student).score, len(paper))
 
-# Create your tests here.
+    def test_generated_papers_are_the_derived_papers(self):
+        other = Student.objects.create(
+            name='Other', email='other@example.com', password='!',
+            exam_schedule=self.schedule, mobile_number='9000000000',
+        )
+        self.assertEqual(generate_papers(self.schedule), 1)  # the submitter's is stored already
+        self.assertEqual(
+            QuestionPaper.objects.get(student=other).question_ids,
+            derive_paper(get_question_pool(), other.id, self.schedule.id),
+        )
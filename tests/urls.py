@@ -1,9 +1,22 @@
-from . import views
+from . import views, async_views
+from django.conf import settings
 from django.urls import path
 
+exam_views = async_views if settings.ASYNC_STUDENT_VIEWS else views
+
 urlpatterns = [
-    path('start_quiz/', views.quiz_view, name='start_quiz'),
-    path("submit/", views.submit_quiz, name="submit_quiz"),
+    path('start_quiz/', exam_views.quiz_view, name='start_quiz'),
+    path("submit/", exam_views.submit_quiz, name="submit_quiz"),
     path("submitted/", views.quiz_submitted, name="quiz_submitted"),
-    path("start-exam/", views.start_exam, name="start_exam")
+    path("start-exam/", exam_views.start_exam, name="start_exam"),
+    path("heartbeat/", views.heartbeat, name="exam_heartbeat"),
+    path("autosave/", views.autosave_answers, name="autosave_answers"),
+    path("paper/", views.exam_paper, name="exam_paper"),
+    path("waiting-room/", views.waiting_room, name="waiting_room"),
+    path("events/", views.quiz_events, name="quiz_events"),
+
+    # Async variants, reachable side by side with the sync ones
+    path('async/start_quiz/', async_views.quiz_view, name='async_start_quiz'),
+    path("async/submit/", async_views.submit_quiz, name="async_submit_quiz"),
+    path("async/start-exam/", async_views.start_exam, name="async_start_exam"),
 ]
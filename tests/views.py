@@ -1,4 +1,6 @@
 # quiz/views.py
+import json
+import logging
 import random
 from urllib import request
 from django.contrib import messages
@@ -15,7 +17,31 @@ from django.contrib.auth import logout as auth_logout
 from django.views.decorators.cache import cache_control
 import pytz
 from datetime import timedelta
-from django.http import JsonResponse
+import asyncio
+from asgiref.sync import sync_to_async
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.db import IntegrityError, transaction
+from students.leases import heartbeat_lease, release_lease
+from students.principal import get_principal
+from admin_panel.schedule_state import get_schedule_state
+from .broadcast import broadcaster, format_sse, quiz_events_enabled, quiz_events_max_seconds
+from .admission import admission_time, make_admission_token, read_admission_token
+from .question_pool import get_question_pool, load_answer_key
+from .papers import QUESTIONS_PER_CATEGORY, NotEnoughQuestions, build_paper, grading_question_ids
+from .fragments import render_paper
+from .autosave import answer_buffer, saved_answers, seal_answers
+from .exam_clock import EXAM_DURATION_MINUTES, deadline_passed, exam_end_time, start_attempt
+from .compact import COMPACT_CONTENT_TYPE, PaperChanged, paper_payload, score_compact_submission
+from .leaderboard import record_result
+from admin_panel.schedule_counters import count_submission
+from django.conf import settings
+from django.utils.cache import patch_cache_control
+
+logger = logging.getLogger(__name__)
+
+LATE_SUBMIT_MESSAGE = "The exam time is over. Your saved answers will be graded automatically."
+NOT_STARTED_MESSAGE = "You have not started the exam."
+
 
 
 
@@ -26,17 +52,79 @@ def student_login_required(view_func):
         student_id = request.session.get('student_id')
         if not student_id:
             return redirect('/login/')  # redirect if not logged in
-        # ✅ Attach the student object to the request
-        request.student = get_object_or_404(Student, id=student_id)
+        # ✅ Attach the session-cached student principal to the request
+        try:
+            request.student = get_principal(request.session, student_id)
+        except Student.DoesNotExist:
+            raise Http404("Student not found.")
+
+        # ✅ One browser per student: another session took over the lease
+        if not heartbeat_lease(student_id, request.session.session_key):
+            request.session.flush()
+            messages.error(request, "You are already logged in from another device/browser.")
+            return redirect('/login/')
         return view_func(request, *args, **kwargs)
     return wrapper
 
+def schedule_gate(student, schedule, now, admission_token=None):
+    """
+    Decide whether the student may see the exam page yet. Returns the
+    message.html context to show instead, or None to let them in.
+    """
+    ist = pytz.timezone('Asia/Kolkata')
+
+    if schedule is None:
+        return {'message': 'No active quiz schedule for your college.'}
+
+    if not schedule['quiz_date']:
+        return {'message': 'Quiz date & time not set yet.'}
+
+    quiz_datetime = schedule['quiz_date']
+    quiz_datetime_ist = quiz_datetime.astimezone(ist)
+
+    if now < quiz_datetime:
+        time_diff = (quiz_datetime - now).total_seconds()
+
+        return {
+            'message': (
+                f'Quiz will start at '
+                f'{quiz_datetime_ist.strftime("%Y-%m-%d %H:%M")}.'
+            ),
+            'countdown_seconds': int(time_diff),
+            'quiz_events': quiz_events_enabled(),
+        }
+
+    if not schedule['quiz_enabled']:
+        return {
+            'message': 'Quiz has not been enabled yet.',
+            'listen_for_start': True,
+            'quiz_events': quiz_events_enabled(),
+        }
+
+    # Staggered admission: hold the student until their slot in the window
+    admit_at = read_admission_token(
+        admission_token,
+        student.id,
+        quiz_datetime
+    )
+    if admit_at is None:
+        admit_at = admission_time(student.id, quiz_datetime).timestamp()
+
+    if now.timestamp() < admit_at:
+        return {
+            'message': 'Quiz is starting. You will be admitted shortly.',
+            'countdown_seconds': max(int(admit_at - now.timestamp()), 1),
+            'quiz_events': quiz_events_enabled(),
+        }
+
+    return None
+
+
 @student_login_required
 @cache_control(no_cache=True, must_revalidate=True, no_store=True)
 def quiz_view(request):
     student = request.student
     now = timezone.now()
-    ist = pytz.timezone('Asia/Kolkata')
     guidelines_accepted = request.session.get(
         "guidelines_accepted",
         False
@@ -44,59 +132,24 @@ def quiz_view(request):
     
     if not guidelines_accepted:
         request.session.pop("exam_end_time", None)
-    try:
-        schedule = ExamSchedule.objects.get(
-            college=student.exam_schedule.college
-        )
-    except ExamSchedule.DoesNotExist:
-        return render(
-            request,
-            'tests/message.html',
-            {'message': 'No active quiz schedule for your college.'}
-        )
-
-    if not schedule.quiz_date:
-        return render(
-            request,
-            'tests/message.html',
-            {'message': 'Quiz date & time not set yet.'}
-        )
-
-    quiz_datetime = schedule.quiz_date
-    quiz_datetime_ist = quiz_datetime.astimezone(ist)
-
-    if now < quiz_datetime:
-        time_diff = (quiz_datetime - now).total_seconds()
-
-        return render(
-            request,
-            'tests/message.html',
-            {
-                'message': (
-                    f'Quiz will start at '
-                    f'{quiz_datetime_ist.strftime("%Y-%m-%d %H:%M")}.'
-                ),
-                'countdown_seconds': int(time_diff)
-            }
-        )
-
-    if not schedule.quiz_enabled:
-        return render(
-            request,
-            'tests/message.html',
-            {'message': 'Quiz has not been enabled yet.'}
-        )
+    schedule = get_schedule_state(student.college_id)
+    gate = schedule_gate(
+        student,
+        schedule,
+        now,
+        request.GET.get('admission')
+    )
+    if gate is not None:
+        return render(request, 'tests/message.html', gate)
 
     # Prevent multiple attempts
-    if Result.objects.filter(student=student).exists():
+    if Result.objects.filter(student_id=student.id).exists():
         return render(
             request,
             'tests/message.html',
             {'message': 'You have already attempted the test.'}
         )
 
-    EXAM_DURATION_MINUTES = 20
-
     # -----------------------------
     # Create timer only once
     # -----------------------------
@@ -112,162 +165,216 @@ def quiz_view(request):
         ''
     )
 
+    # ✅ Offline mode: the page fetches the paper itself from exam_paper
+    if settings.EXAM_OFFLINE_MODE:
+        return render(
+            request,
+            "tests/exam.html",
+            {
+                "student": student,
+                "questions": [],
+                "offline_mode": True,
+                "total_questions": 2 * QUESTIONS_PER_CATEGORY,
+                "duration": EXAM_DURATION_MINUTES,
+                "exam_end_time": exam_end_time,
+                "schedule": schedule,
+                "guidelines_accepted": guidelines_accepted,
+                "saved_answers": {}
+            }
+        )
+
     # -----------------------------
     # Create question set only once
     # -----------------------------
-    if 'exam_question_ids' not in request.session:
-
-        technical = list(
-            Question.objects.filter(
-                category="TECH",
-                is_active=True
-            )
-        )
+    pool = get_question_pool()
 
-        reasoning = list(
-            Question.objects.filter(
-                category="REAS",
-                is_active=True
-            )
+    # Same paper on every reload: stored ahead of time or derived from the
+    # seeded PRNG, pinned to the bank version the exam started with.
+    try:
+        selected_questions = build_paper(
+            student,
+            pool,
+            request.session.get('paper_version')
         )
-
-        if len(technical) < 10 or len(reasoning) < 10:
-            return render(
-                request,
-                'tests/message.html',
-                {
-                    'message': (
-                        'Not enough active questions available. '
-                        'Contact admin.'
-                    )
-                }
-            )
-
-        selected_questions = (
-            random.sample(technical, 10) +
-            random.sample(reasoning, 10)
+    except NotEnoughQuestions as e:
+        return render(
+            request,
+            'tests/message.html',
+            {'message': str(e)}
         )
 
-        random.shuffle(selected_questions)
-
-        request.session['exam_question_ids'] = [
-            q.id for q in selected_questions
-        ]
-
-    # -----------------------------
-    # Reload same questions
-    # -----------------------------
-    question_ids = request.session['exam_question_ids']
-
-    question_map = {
-        q.id: q
-        for q in Question.objects.filter(id__in=question_ids)
-    }
-
-    selected_questions = [
-        question_map[qid]
-        for qid in question_ids
-        if qid in question_map
-    ]
-
-    # Save active session
-    request.session['student_id'] = student.id
-
-    if not request.session.session_key:
-        request.session.save()
-
-    student.current_session = request.session.session_key
-    student.save()
-
     return render(
         request,
         "tests/exam.html",
         {
             "student": student,
-            "questions": selected_questions,
+            "questions": render_paper(selected_questions, pool.version),
             "duration": EXAM_DURATION_MINUTES,
             "exam_end_time": request.session.get(
                 "exam_end_time",
                 ""
             ),
             "schedule": schedule,
-            "guidelines_accepted": guidelines_accepted
+            "guidelines_accepted": guidelines_accepted,
+            # ✅ Restore autosaved answers after a reload or crash
+            "saved_answers": {
+                str(qid): option
+                for qid, option in saved_answers(
+                    student.id,
+                    student.exam_schedule_id
+                ).items()
+            } if guidelines_accepted else {}
         }
     )
 
 @student_login_required
 def start_exam(request):
 
-    EXAM_DURATION_MINUTES = 20
-
-    request.session['exam_end_time'] = (
-        timezone.now() +
-        timedelta(minutes=EXAM_DURATION_MINUTES)
-    ).isoformat()
+    # ✅ The attempt's end time is fixed server-side on the first start
+    ends_at, paper_version = start_attempt(
+        request.student,
+        get_question_pool()
+    )
+    request.session['exam_end_time'] = ends_at.isoformat()
 
     request.session['guidelines_accepted'] = True
+    request.session['paper_version'] = paper_version
 
     return JsonResponse({
         "success": True
     })
 
-@student_login_required
-@cache_control(no_cache=True, must_revalidate=True, no_store=True)
-def submit_quiz(request):
-    if request.method == "POST":
-        student = request.student  # assuming OneToOne with User
-        score = 0
-        answered_qids = []
 
-        
+def grade_answers(answers, pool=None):
+    """
+    Score {question_id: selected_option} against the cached answer key.
+    Questions missing from the pool (disabled mid-exam) are graded with a
+    single id__in fetch.
+    """
+    answer_key = load_answer_key(list(answers), pool)
 
-        for key, value in request.POST.items():
-            if key.startswith("q"):  # only process question fields
-                qid = key[1:]  # remove the 'q' prefix
-                try:
-                    q = Question.objects.get(id=int(qid))
-                    answered_qids.append(qid)
-                    if str(value) == str(q.correct_option):
-                        score += 1
-                except Question.DoesNotExist:
-                    continue
+    return sum(
+        1
+        for qid, selected in answers.items()
+        if qid in answer_key and selected == answer_key[qid]
+    )
 
-        # ✅ Get active exam schedule for student’s college
+
+def parse_submitted_answers(post):
+    """Extract {question_id: option} from 'q<id>' form fields."""
+    answers = {}
+    for key, value in post.items():
+        if not key.startswith("q"):  # only process question fields
+            continue
         try:
-            schedule = ExamSchedule.objects.get(college=student.exam_schedule.college)
-        except ExamSchedule.DoesNotExist:
-            return render(request, "tests/message.html", {
-                "message": "No active exam schedule found for your college."
-            })
+            answers[int(key[1:])] = int(value)
+        except ValueError:
+            continue
+    return answers
+
+
+def answers_on_paper(student, answers, pool, paper_version):
+    """
+    Keep only answers to questions on the student's paper. If the paper
+    can't be known (see grading_question_ids) nothing is graded: posted
+    question ids are never trusted on their own.
+    """
+    if not student.exam_schedule_id:
+        return answers
+    paper_ids = grading_question_ids(student, pool, paper_version)
+    if paper_ids is None:
+        logger.warning("No paper to grade student %s against", student.id)
+        return {}
+    paper_ids = set(paper_ids)
+    return {
+        qid: value
+        for qid, value in answers.items()
+        if qid in paper_ids
+    }
 
-        
 
-        # ✅ Store result with exam schedule history
-        history, _ = ExamScheduleHistory.objects.get_or_create(
-            college=student.exam_schedule.college,
-            quiz_date=schedule.quiz_date
+def create_result(student, score, session_key):
+    """
+    The Result, its leaderboard entry, its schedule's counters and the
+    release of the session's login lease, in one transaction. Raises
+    IntegrityError on a double submit.
+    """
+    with transaction.atomic():
+        result = Result.objects.create(
+            student_id=student.id,
+            exam_schedule_id=student.exam_schedule_id,
+            quiz_date=student.quiz_date,
+            score=score,
+            total_questions=20
         )
+        record_result(result)
+        count_submission(student.exam_schedule_id, score)
+        release_lease(student.id, session_key)
+    return result
 
-        if Result.objects.filter(student=student, exam_schedule=history).exists():
-            return render(request, "tests/message.html", {"message": "You have already attempted the test."})
 
-        result = Result.objects.create(
-            student=student,
-            exam_schedule=history,
-            quiz_date=schedule.quiz_date,
-            score=score,
-            total_questions='20'
+@student_login_required
+@cache_control(no_cache=True, must_revalidate=True, no_store=True)
+def submit_quiz(request):
+    if request.method == "POST":
+        student = request.student
+
+        # ✅ Late submits are refused; the sweeper grades the saved answers
+        # of expired attempts. No end time at all: the exam never started
+        ends_at = exam_end_time(request.session, student)
+        if ends_at is None:
+            return render(request, "tests/message.html", {"message": NOT_STARTED_MESSAGE})
+        if deadline_passed(ends_at):
+            release_lease(student.id, request.session.session_key)
+            auth_logout(request)
+            request.session.flush()
+            return render(request, "tests/message.html", {"message": LATE_SUBMIT_MESSAGE})
+
+        pool = get_question_pool()
+
+        if request.content_type == COMPACT_CONTENT_TYPE:
+            # ✅ Offline exam page: bit-packed answers keyed by paper position
+            try:
+                score = score_compact_submission(
+                    student,
+                    request.body,
+                    pool,
+                    request.session.get('paper_version')
+                )
+            except PaperChanged:
+                # The page falls back to posting the q<id> form
+                return JsonResponse({"success": False, "error": "paper_changed"}, status=409)
+            except ValueError:
+                return JsonResponse({"success": False, "error": "Invalid payload."}, status=400)
+        else:
+            # ✅ Seal: autosaved answers, with the posted form taking precedence
+            answers = seal_answers(
+                student.id,
+                student.exam_schedule_id,
+                parse_submitted_answers(request.POST)
+            )
+            answers = answers_on_paper(
+                student,
+                answers,
+                pool,
+                request.session.get('paper_version')
+            )
+            score = grade_answers(answers, pool)
 
-        )
-        
-        # ✅ Clear session info (logout)
-        student.current_session = None
-        student.save()
+        # ✅ The student's registration already points at the schedule history
+        if student.exam_schedule_id is None:
+            return render(request, "tests/message.html", {
+                "message": "No active exam schedule found for your college."
+            })
+
+        # ✅ unique (student, exam_schedule) makes double submits a no-op
+        try:
+            result = create_result(student, score, request.session.session_key)
+        except IntegrityError:
+            return render(request, "tests/message.html", {"message": "You have already attempted the test."})
 
+        # ✅ Clear session info (logout); create_result released the lease
         auth_logout(request)   # from django.contrib.auth import logout as auth_logout
-        request.session.pop('exam_question_ids', None)
-        request.session.pop('guidelines_accepted', None)
-        request.session.pop('exam_end_time', None)
         request.session.flush()  # wipe the session completely
 
         return render(request, "tests/submitted.html", {
@@ -277,6 +384,185 @@ def submit_quiz(request):
     return redirect("exam")  # fallback
 
 
+@student_login_required
+def exam_paper(request):
+    """
+    The student's whole paper as one content-hashed JSON payload for the
+    offline exam page. Answers 304 while the browser's copy is current.
+    """
+    student = request.student
+    gate = schedule_gate(
+        student,
+        get_schedule_state(student.college_id),
+        timezone.now(),
+        request.GET.get('admission')
+    )
+    if gate is not None:
+        return JsonResponse({"success": False, "error": gate['message']}, status=403)
+
+    if Result.objects.filter(student_id=student.id).exists():
+        return JsonResponse({"success": False, "error": "You have already attempted the test."}, status=409)
+
+    pool = get_question_pool()
+    try:
+        paper = build_paper(student, pool, request.session.get('paper_version'))
+    except NotEnoughQuestions as e:
+        return JsonResponse({"success": False, "error": str(e)}, status=409)
+
+    paper_hash, body = paper_payload(paper)
+    etag = f'"{paper_hash}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(body, content_type="application/json")
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@student_login_required
+def autosave_answers(request):
+    """
+    Accept {"answers": {"<question_id>": option}} deltas from the exam page.
+    They are buffered in this worker and written in batches.
+    """
+    if request.method != "POST":
+        return JsonResponse({"success": False, "error": "POST required."}, status=405)
+
+    student = request.student
+    ends_at = exam_end_time(request.session, student)
+    if ends_at is None or student.exam_schedule_id is None:
+        return JsonResponse({"success": False, "error": "Exam not started."}, status=409)
+
+    if deadline_passed(ends_at):
+        return JsonResponse({"success": False, "error": "Exam time is over."}, status=409)
+
+    try:
+        deltas = json.loads(request.body)['answers'].items()
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return JsonResponse({"success": False, "error": "Invalid payload."}, status=400)
+
+    pool = get_question_pool()
+    answers = {}
+    for key, value in deltas:
+        try:
+            qid, option = int(key), int(value)
+        except (TypeError, ValueError):
+            continue
+        # Unknown ids would fail the whole batch on the FK
+        if pool.get(qid) is not None and 1 <= option <= 4:
+            answers[qid] = option
+
+    answer_buffer.add(student.id, student.exam_schedule_id, answers)
+
+    return JsonResponse({
+        "success": True,
+        "saved": len(answers)
+    })
+
+
+@student_login_required
+def waiting_room(request):
+    """
+    Cheap status poll for the countdown page: no DB access beyond the
+    session, schedule state comes from the cache.
+    """
+    student = request.student
+    now = timezone.now()
+    schedule = get_schedule_state(student.college_id)
+
+    if schedule is None:
+        return JsonResponse({"status": "no_schedule"})
+
+    if not schedule['quiz_date']:
+        return JsonResponse({"status": "not_scheduled"})
+
+    quiz_datetime = schedule['quiz_date']
+    admit_at = admission_time(student.id, quiz_datetime)
+
+    return JsonResponse({
+        "status": (
+            "open"
+            if schedule['quiz_enabled'] and now >= quiz_datetime
+            else "waiting"
+        ),
+        "quiz_enabled": schedule['quiz_enabled'],
+        "quiz_date": quiz_datetime.isoformat(),
+        "server_time": now.isoformat(),
+        "admit_at": admit_at.isoformat(),
+        "admit_in": max((admit_at - now).total_seconds(), 0),
+        "admission_token": make_admission_token(student.id, admit_at),
+    })
+
+
+async def quiz_events(request):
+    """
+    Server-Sent Events stream for the countdown page. Needs the ASGI
+    entry point (asgi.py) and QUIZ_EVENTS_ENABLED; events come from this
+    worker's broadcaster. The stream ends after the first status event or
+    QUIZ_EVENTS_MAX_SECONDS, so no connection is held open for good.
+    """
+    if not quiz_events_enabled():
+        return HttpResponse(status=204)  # tells EventSource not to reconnect
+
+    student_id = await sync_to_async(request.session.get)('student_id')
+    if not student_id:
+        return HttpResponse(status=204)  # tells EventSource not to reconnect
+    try:
+        student = await sync_to_async(get_principal)(request.session, student_id)
+    except Student.DoesNotExist:
+        return HttpResponse(status=204)
+
+    college_id = student.college_id
+
+    async def stream():
+        queue = broadcaster.subscribe(college_id)
+        try:
+            yield "retry: 5000\n\n"
+
+            # Late subscribers still need to hear the quiz already started
+            schedule = await sync_to_async(get_schedule_state)(college_id)
+            if (
+                schedule and
+                schedule['quiz_enabled'] and
+                schedule['quiz_date'] and
+                schedule['quiz_date'] <= timezone.now()
+            ):
+                yield format_sse('quiz_starting', {
+                    'quiz_date': schedule['quiz_date'].isoformat()
+                })
+                return
+
+            loop = asyncio.get_running_loop()
+            close_at = loop.time() + quiz_events_max_seconds()
+            while (remaining := close_at - loop.time()) > 0:
+                try:
+                    event, data, event_id = await asyncio.wait_for(
+                        queue.get(), timeout=min(15, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                # The page acts on the first status change; it reconnects if needed
+                yield format_sse(event, data, event_id)
+                return
+        finally:
+            broadcaster.unsubscribe(college_id, queue)
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@student_login_required
+def heartbeat(request):
+    # The decorator already renewed the lease
+    return JsonResponse({
+        "success": True
+    })
+
+
 @student_login_required
 def quiz_submitted(request):
     return render(request, "tests/submitted.html")
\ No newline at end of file